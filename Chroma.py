@@ -1,224 +1,44 @@
-import cv2
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
-from PIL import Image, ImageTk, ImageDraw
+from PIL import Image, ImageTk
 import numpy as np
 import threading
 import time
 import json
 import os
+import sys
+import queue
+import sqlite3
+from collections import OrderedDict
 from math import cos, sin, pi, sqrt, radians, atan2
-import serial
-import serial.tools.list_ports
+
+# Núcleo sin interfaz (importable sin Tk ni OpenCV); se reexporta aquí
+from conversion import (
+    rgb_to_cmykw, cmykw_to_rgb, rgb_to_hsl, hsl_to_rgb,
+    rgb_to_cmykw_array, cmykw_to_rgb_array, rgb_to_hsl_array, hsl_to_rgb_array,
+    RGBToCMYKWTable, SliderPreviewTable, render_hue_wheel, load_hue_wheel,
+)
+from plc import (
+    MODBUS_AVAILABLE, SERIAL_AVAILABLE, ModbusConnection, ModbusConnectionPool,
+    TANKS, ALARM_CRITICAL, ALARM_WARNING, TelemetryBuffer, PollGroup,
+    DEFAULT_POLL_GROUPS, RegisterPoller, SendResult, PLCManager, plc_manager_from_config,
+)
+from sampling import (
+    CameraCapture, ROI_SHAPES, ROI_MODES, roi_pixels, kmeans_colors, sample_roi,
+    LiveColorTracker,
+)
+from pigment_model import load_recipe_converter
+from color_difference import rgb_to_lab_array, delta_e2000
+from color_index import ColorIndex
+from history_store import HistoryStore
+from ui_scheduler import UpdateScheduler
+from image_pyramid import ImagePyramid
+from color_palette import extract_palette
+from batch import run_batch
 
 # Configuración inicial
 CONFIG_FILE = "color_app_config.json"
 
-# Intentar importar pymodbus
-try:
-    from pymodbus.client import ModbusTcpClient
-    MODBUS_AVAILABLE = True
-except ImportError:
-    MODBUS_AVAILABLE = False
-    print("  pymodbus no está instalado. Ejecuta: pip install pymodbus")
-
-# Intentar importar pyserial
-try:
-    import serial
-    SERIAL_AVAILABLE = True
-except ImportError:
-    SERIAL_AVAILABLE = False
-    print("  pyserial no está instalado. Ejecuta: pip install pyserial")
-
-# COMUNICACIÓN CON PLC (MODBUS TCP o SERIAL)
-class PLCManager:
-    def __init__(self, connection_type='none', ip='192.168.0.10', port=502, serial_port=None, baudrate=9600):
-        self.connection_type = connection_type
-        self.ip = ip
-        self.port = port
-        self.serial_port = serial_port
-        self.baudrate = baudrate
-        self.last_send_time = 0
-        self.min_interval = 0.1  # Mínimo 100ms entre envíos
-        self.enabled = False
-        self.serial_connection = None
-        
-        # Configurar según tipo de conexión
-        if connection_type == 'modbus':
-            self.enabled = MODBUS_AVAILABLE
-        elif connection_type == 'serial':
-            self.enabled = SERIAL_AVAILABLE
-            self.initialize_serial()
-            
-    def initialize_serial(self):
-        """Inicializar conexión serial"""
-        if not SERIAL_AVAILABLE or not self.serial_port:
-            return
-            
-        try:
-            self.serial_connection = serial.Serial(
-                port=self.serial_port,
-                baudrate=self.baudrate,
-                timeout=1
-            )
-            print(f"✅ Conexión serial establecida en {self.serial_port}")
-        except Exception as e:
-            print(f"🛑 Error al conectar serial: {e}")
-            self.serial_connection = None
-            
-    def enviar_a_plc(self, c, m, y, k, w):
-        if not self.enabled:
-            return False
-            
-        # Evitar spam de envíos
-        current_time = time.time()
-        if current_time - self.last_send_time < self.min_interval:
-            return False
-            
-        self.last_send_time = current_time
-        
-        # Enviar en hilo separado para no bloquear la GUI
-        threading.Thread(
-            target=self._enviar_async, 
-            args=(c, m, y, k, w),
-            daemon=True
-        ).start()
-        
-    def _enviar_async(self, c, m, y, k, w):
-        """Enviar datos según el tipo de conexión"""
-        if self.connection_type == 'modbus':
-            self._enviar_modbus(c, m, y, k, w)
-        elif self.connection_type == 'serial':
-            self._enviar_serial(c, m, y, k, w)
-            
-    def _enviar_modbus(self, c, m, y, k, w):
-        """Enviar datos via Modbus TCP"""
-        try:
-            client = ModbusTcpClient(self.ip, port=self.port)
-            if client.connect():
-                valores = [c, m, y, k, w]
-                resultado = client.write_registers(0, valores)
-                if resultado.isError():
-                    print("❌ Error al escribir en el PLC")
-                else:
-                    print(f"✅ CMYKW enviado al PLC (Modbus): {valores}")
-                client.close()
-            else:
-                print("🚫 No se pudo conectar al PLC (Modbus)")
-        except Exception as e:
-            print(f"🛑 Error de comunicación PLC (Modbus): {e}")
-            
-    def _enviar_serial(self, c, m, y, k, w):
-        """Enviar datos via Serial"""
-        if not self.serial_connection:
-            print("🚫 No hay conexión serial establecida")
-            return
-            
-        try:
-            # Formato: "C:xxx M:xxx Y:xxx K:xxx W:xxx\n"
-            data_str = f"C:{c:03d} M:{m:03d} Y:{y:03d} K:{k:03d} W:{w:03d}\n"
-            self.serial_connection.write(data_str.encode('ascii'))
-            print(f"✅ CMYKW enviado por Serial: {data_str.strip()}")
-        except Exception as e:
-            print(f"🛑 Error de comunicación Serial: {e}")
-            
-    def close(self):
-        """Cerrar conexiones"""
-        if self.serial_connection and self.serial_connection.is_open:
-            self.serial_connection.close()
-
-# ---------- FUNCIONES DE CONVERSIÓN ----------
-def rgb_to_cmykw(r, g, b):
-    """Convierte RGB a CMYKW"""
-    if r == 255 and g == 255 and b == 255:
-        return 0, 0, 0, 0, 100  # Solo blanco
-    if (r, g, b) == (0, 0, 0):
-        return 0, 0, 0, 100, 0  # Solo negro
-    
-    c = 1 - r / 255
-    m = 1 - g / 255
-    y = 1 - b / 255
-    k = min(c, m, y)
-    
-    if k < 1:
-        c = (c - k) / (1 - k)
-        m = (m - k) / (1 - k)
-        y = (y - k) / (1 - k)
-    else:
-        c = m = y = 0
-    
-    return round(c * 100), round(m * 100), round(y * 100), round(k * 100), 0
-
-def cmykw_to_rgb(c, m, y, k, w):
-    """Convierte CMYKW a RGB"""
-    if w > 0:
-        return 255, 255, 255
-    
-    c /= 100
-    m /= 100
-    y /= 100
-    k /= 100
-    
-    r = round(255 * (1 - c) * (1 - k))
-    g = round(255 * (1 - m) * (1 - k))
-    b = round(255 * (1 - y) * (1 - k))
-    
-    return max(0, min(255, r)), max(0, min(255, g)), max(0, min(255, b))
-
-def rgb_to_hsl(r, g, b):
-    """Convierte RGB a HSL"""
-    r, g, b = r/255.0, g/255.0, b/255.0
-    max_val = max(r, g, b)
-    min_val = min(r, g, b)
-    
-    # Luminosidad
-    l = (max_val + min_val) / 2.0
-    
-    if max_val == min_val:
-        h = s = 0.0
-    else:
-        # Saturación
-        if l <= 0.5:
-            s = (max_val - min_val) / (max_val + min_val)
-        else:
-            s = (max_val - min_val) / (2.0 - max_val - min_val)
-        
-        # Matiz
-        delta = max_val - min_val
-        if max_val == r:
-            h = (g - b) / delta + (6.0 if g < b else 0.0)
-        elif max_val == g:
-            h = (b - r) / delta + 2.0
-        else:
-            h = (r - g) / delta + 4.0
-        h /= 6.0
-    
-    return h * 360, s * 100, l * 100
-
-def hsl_to_rgb(h, s, l):
-    """Convierte HSL a RGB"""
-    h, s, l = h/360.0, s/100.0, l/100.0
-    
-    if s == 0:
-        r = g = b = l
-    else:
-        def hue_to_rgb(p, q, t):
-            if t < 0: t += 1
-            if t > 1: t -= 1
-            if t < 1/6: return p + (q - p) * 6 * t
-            if t < 1/2: return q
-            if t < 2/3: return p + (q - p) * (2/3 - t) * 6
-            return p
-        
-        q = l * (1 + s) if l < 0.5 else l + s - l * s
-        p = 2 * l - q
-        
-        r = hue_to_rgb(p, q, h + 1/3)
-        g = hue_to_rgb(p, q, h)
-        b = hue_to_rgb(p, q, h - 1/3)
-    
-    return round(r * 255), round(g * 255), round(b * 255)
-
 # ---------- APLICACIÓN GUI ----------
 class ColorConverterApp:
     def __init__(self, root):
@@ -228,23 +48,64 @@ class ColorConverterApp:
         self.load_config()
         
         # Variables
-        self.image = None
+        self.pyramid = None  # Imagen cargada, a resolución completa
+        self.view_x = 0.0    # Píxel original en la esquina superior izquierda
+        self.view_y = 0.0
+        self.view_zoom = 1.0  # Píxeles de pantalla por píxel original
+        self.pan_start = None
+        self.image_photo = None
+        self.image_item = None
         self.camera_frame = None
-        self.cap = None
+        self.camera_array = None
+        self.camera_photo = None
+        self.camera_item = None
+        self.camera_image = None  # Image PIL reutilizada para pasar cada frame al PhotoImage
+        self.roi_item = None
+        self.roi_coords = None
+        self.camera = None
         self.running_camera = False
-        self.updating_sliders = False
+        self.camera_seq = 0
+        self.display_interval = self.config.get('display_interval_ms', 30)
+        self.roi_radius = tk.IntVar(value=self.config.get('roi_radius', 2))
+        self.roi_shape = tk.StringVar(value=self.config.get('roi_shape', 'square'))
+        self.roi_mode = tk.StringVar(value=self.config.get('roi_mode', 'median'))
+        self.tracker = None
+        self.tracked_rgb = None
+        self.tracking_var = tk.BooleanVar(value=False)
+        self.scheduler = UpdateScheduler(self.root, self.config.get('ui_frame_ms', 16))
+        self.scale_echoes = {}  # Slider → valor fijado por código (su callback se ignora)
+        self.hue_marker_coords = None
         self.dark_mode = self.config.get('dark_mode', False)
-        self.history = []
-        self.max_history = 10
+        self.history = OrderedDict()  # Ventana LRU en memoria: RGB → CMYKW
+        self.max_history = self.config.get('history_window', 10)
+        self.history_page = 0
+        self.hue_size = self.config.get('hue_wheel_size', 200)
+        self.hue_lightness = 50
+        self.hue_circle_item = None
+        self.hue_circle_photos = {}
+        self.palette_seq = 0  # Análisis de paleta más reciente; los anteriores se descartan
+        self.palette_size = self.config.get('palette_size', 6)
+        self.palette_method = self.config.get('palette_method', 'kmeans')
         
         # Inicializar PLC
-        self.plc = PLCManager(
-            connection_type=self.config.get('connection_type', 'none'),
-            ip=self.config.get('plc_ip', '192.168.0.10'),
-            port=self.config.get('plc_port', 502),
-            serial_port=self.config.get('serial_port'),
-            baudrate=self.config.get('baudrate', 9600)
-        )
+        self.plc = self.create_plc_manager()
+        
+        # Resultados de envíos manuales (los entrega el hilo de envío)
+        self.plc_results = queue.Queue()
+        
+        # Conversor RGB→CMYKW configurado: modelo de pigmentos ('mixing_model'),
+        # tabla precalculada ('cmykw_lut') o fórmula analítica, como el CLI y el servicio
+        self.cmykw_converter = None
+        self.load_cmykw_converter()
+        
+        # Receta objetivo para el control de calidad por ΔE2000
+        self.target = self.config.get('target')
+        self.target_lab = rgb_to_lab_array(self.target['rgb']) if self.target else None
+        self.delta_e_tolerance = self.config.get('delta_e_tolerance', 2.0)
+        
+        # Tablas para la previsualización rápida desde los sliders
+        self.preview_table = SliderPreviewTable()
+        self.load_preview_tables()
         
         # Paleta de colores predefinidos
         self.color_palettes = {
@@ -267,19 +128,24 @@ class ColorConverterApp:
             ]
         }
         
+        # Índice Lab de colores conocidos: paletas y recetas pasadas
+        self.color_index = self.new_color_index()
+        
+        # Historial persistente (SQLite): solo la ventana reciente vive en memoria
+        self.history_store = HistoryStore(self.config.get('history_db', 'color_history.db')).start()
+        self.history_store.migrate_json('color_history.json')
+        for entry in reversed(self.history_store.recent_colors(self.max_history)):
+            self.history[entry.rgb] = entry.cmykw
+            self.color_index.add(entry.rgb, entry.cmykw)
+        self.history_index_results = queue.Queue()
+        self.load_history_index()
+        
         # Crear interfaz
         self.setup_styles()
         self.create_widgets()
         self.update_color_preview()
-        
-        # Cargar historial si existe
-        if os.path.exists('color_history.json'):
-            try:
-                with open('color_history.json', 'r') as f:
-                    self.history = json.load(f)
-                    self.update_history_ui()
-            except:
-                self.history = []
+        self.poll_plc_results()
+        self.update_telemetry_ui()
 
     def load_config(self):
         """Cargar configuración desde archivo"""
@@ -299,6 +165,83 @@ class ColorConverterApp:
         except:
             pass
 
+    def create_plc_manager(self):
+        """Crear el PLCManager según la configuración actual"""
+        return plc_manager_from_config(self.config)
+
+    def load_cmykw_converter(self):
+        """Cargar (o generar en segundo plano) la rejilla o tabla RGB→CMYKW configurada"""
+        if self.config.get('mixing_model', 'naive') != 'kubelka_munk' and \
+                self.config.get('cmykw_lut', 'none') not in RGBToCMYKWTable.FILES:
+            return
+        
+        def worker():
+            self.cmykw_converter = load_recipe_converter(self.config)
+        
+        threading.Thread(target=worker, daemon=True).start()
+
+    def load_preview_tables(self):
+        """Cargar en segundo plano la tabla RGB→HSL si está habilitada"""
+        if not self.config.get('hsl_lut', False):
+            return
+        
+        def worker():
+            try:
+                self.preview_table.load_hsl()
+            except (OSError, ValueError) as e:
+                print(f"🛑 No se pudo cargar la tabla HSL: {e}")
+        
+        threading.Thread(target=worker, daemon=True).start()
+
+    def new_color_index(self):
+        """Índice de colores con las paletas predefinidas"""
+        index = ColorIndex()
+        for palette_name, colors in self.color_palettes.items():
+            index.add_many([rgb for _, rgb in colors],
+                           names=[name for name, _ in colors], source=palette_name)
+        return index
+
+    def load_history_index(self):
+        """Indexar en segundo plano todos los colores del historial persistente"""
+        limit = self.config.get('history_index_limit', 200000)
+        
+        def worker():
+            index = None
+            try:
+                index = self.new_color_index()
+                for chunk in self.history_store.iter_colors(limit):
+                    index.add_many([rgb for rgb, _ in chunk], [cmykw for _, cmykw in chunk])
+                index.rebuild()
+            except sqlite3.Error as e:
+                print(f"🛑 No se pudo indexar el historial: {e}")
+                index = None
+            self.history_index_results.put(index)
+        
+        threading.Thread(target=worker, daemon=True).start()
+        self.root.after(200, self.check_history_index)
+
+    def check_history_index(self):
+        """Reemplazar el índice inicial por el del historial completo cuando esté listo"""
+        try:
+            index = self.history_index_results.get_nowait()
+        except queue.Empty:
+            self.root.after(200, self.check_history_index)
+            return
+        if index is None:
+            return
+        # Colores agregados mientras se construía
+        old = self.color_index
+        for position, rgb in enumerate(old.rgbs):
+            index.add(rgb, old.recipes[position], old.names[position], old.sources[position])
+        self.color_index = index
+
+    def convert_rgb_to_cmykw(self, r, g, b):
+        """RGB→CMYKW con el conversor configurado (la fórmula mientras se carga)"""
+        converter = self.cmykw_converter
+        if converter is not None:
+            return tuple(int(v) for v in converter(np.array((r, g, b), dtype=np.uint8)))
+        return rgb_to_cmykw(r, g, b)
+
     def setup_styles(self):
         """Configurar estilos según modo oscuro/claro"""
         self.style = ttk.Style()
@@ -363,12 +306,23 @@ class ColorConverterApp:
                                relief='sunken', borderwidth=2, cursor="cross")
         self.canvas.grid(row=0, column=0, columnspan=3, pady=(0, 10))
         self.canvas.bind("<Button-1>", self.pick_color)
+        # Zoom con la rueda, desplazamiento arrastrando con el botón derecho
+        self.canvas.bind("<MouseWheel>", self.zoom_image)
+        self.canvas.bind("<Button-4>", self.zoom_image)
+        self.canvas.bind("<Button-5>", self.zoom_image)
+        self.canvas.bind("<ButtonPress-3>", self.start_pan)
+        self.canvas.bind("<B3-Motion>", self.pan_image)
+        self.canvas.bind("<Double-Button-3>", lambda event: self.fit_image_view())
         
         # Instrucciones
         instruction_label = ttk.Label(left_frame, text="Haz clic en la imagen para seleccionar un color",
                                      style='Info.TLabel')
         instruction_label.grid(row=1, column=0, columnspan=3, pady=(0, 10))
         
+        # Estadísticas de la cámara
+        self.camera_stats_label = ttk.Label(left_frame, text="", style='Info.TLabel')
+        self.camera_stats_label.grid(row=3, column=0, columnspan=3, pady=(5, 0))
+        
         # Botones de control
         self.btn_load = ttk.Button(left_frame, text="📁 Cargar Imagen", command=self.load_image)
         self.btn_load.grid(row=2, column=0, padx=(0, 5), pady=5, sticky="ew")
@@ -379,12 +333,44 @@ class ColorConverterApp:
         self.btn_snapshot = ttk.Button(left_frame, text="📸 Tomar Foto", command=self.snapshot)
         self.btn_snapshot.grid(row=2, column=2, padx=(5, 0), pady=5, sticky="ew")
         
+        # Configuración del muestreo (región de interés)
+        roi_frame = ttk.Frame(left_frame)
+        roi_frame.grid(row=5, column=0, columnspan=3, sticky="ew", pady=(10, 0))
+        
+        ttk.Label(roi_frame, text="Muestreo:").pack(side='left')
+        ttk.Combobox(roi_frame, textvariable=self.roi_mode, values=ROI_MODES,
+                     width=8, state='readonly').pack(side='left', padx=5)
+        ttk.Combobox(roi_frame, textvariable=self.roi_shape, values=ROI_SHAPES,
+                     width=7, state='readonly').pack(side='left', padx=5)
+        ttk.Label(roi_frame, text="Radio:").pack(side='left', padx=(5, 0))
+        tk.Spinbox(roi_frame, from_=0, to=50, textvariable=self.roi_radius,
+                   width=4).pack(side='left', padx=5)
+        
+        ttk.Checkbutton(roi_frame, text="🎯 Seguimiento en vivo", variable=self.tracking_var,
+                        command=self.toggle_tracking).pack(side='left', padx=(10, 0))
+        
+        for var in (self.roi_mode, self.roi_shape, self.roi_radius):
+            var.trace_add('write', self.on_roi_change)
+        
+        # Paleta dominante de la imagen o del frame de la cámara
+        image_palette_frame = ttk.LabelFrame(left_frame, text="Paleta de la Imagen", padding="10")
+        image_palette_frame.grid(row=6, column=0, columnspan=3, sticky="ew", pady=(10, 0))
+        
+        palette_bar = ttk.Frame(image_palette_frame)
+        palette_bar.pack(fill='x')
+        ttk.Button(palette_bar, text="🎨 Analizar", command=self.analyze_current_palette).pack(side='left')
+        self.image_palette_label = ttk.Label(palette_bar, text="", style='Info.TLabel')
+        self.image_palette_label.pack(side='left', padx=5)
+        
+        self.image_palette_frame = ttk.Frame(image_palette_frame)
+        self.image_palette_frame.pack(fill='x', pady=(5, 0))
+        
         # Selector HSL
         hsl_frame = ttk.LabelFrame(left_frame, text="Selector HSL", padding="10")
-        hsl_frame.grid(row=3, column=0, columnspan=3, sticky="ew", pady=(10, 0))
+        hsl_frame.grid(row=4, column=0, columnspan=3, sticky="ew", pady=(10, 0))
         
         # Círculo cromático
-        self.hue_circle = tk.Canvas(hsl_frame, width=200, height=200, bg='white')
+        self.hue_circle = tk.Canvas(hsl_frame, width=self.hue_size, height=self.hue_size, bg='white')
         self.hue_circle.grid(row=0, column=0, rowspan=3, padx=(0, 10))
         self.draw_hue_circle()
         self.hue_circle.bind("<B1-Motion>", self.pick_hue)
@@ -476,6 +462,13 @@ class ColorConverterApp:
         
         self.history_frame = ttk.Frame(history_frame)
         self.history_frame.pack(fill='x')
+        
+        history_nav = ttk.Frame(history_frame)
+        history_nav.pack(fill='x')
+        ttk.Button(history_nav, text="◀", width=3, command=self.history_older).pack(side='left')
+        self.history_page_label = ttk.Label(history_nav, text="")
+        self.history_page_label.pack(side='left', padx=5)
+        ttk.Button(history_nav, text="▶", width=3, command=self.history_newer).pack(side='left')
         self.update_history_ui()
         
         # Información de valores
@@ -491,6 +484,17 @@ class ColorConverterApp:
         self.hsl_label = ttk.Label(info_frame, text="HSL: 0°, 0%, 100%", style='Info.TLabel')
         self.hsl_label.grid(row=2, column=0, sticky='w', pady=2)
         
+        self.telemetry_label = ttk.Label(info_frame, text="", style='Info.TLabel', justify='left')
+        self.telemetry_label.grid(row=3, column=0, sticky='w', pady=2)
+        
+        self.delta_e_label = ttk.Label(info_frame, text="", style='Info.TLabel')
+        self.delta_e_label.grid(row=4, column=0, sticky='w', pady=2)
+        self.match_label = ttk.Label(info_frame, text="", style='Info.TLabel')
+        self.match_label.grid(row=5, column=0, sticky='w', pady=2)
+        
+        if self.target:
+            self.delta_e_label.config(text=f"🎯 Objetivo: CMYKW{tuple(self.target['cmykw'])}")
+        
         # Botones de acción
         action_frame = ttk.Frame(right_frame)
         action_frame.grid(row=9, column=0, columnspan=3, pady=(10, 0))
@@ -498,6 +502,7 @@ class ColorConverterApp:
         ttk.Button(action_frame, text="🔄 Resetear", command=self.reset_values).pack(side='left', padx=(0, 5))
         ttk.Button(action_frame, text="📋 Copiar RGB", command=self.copy_rgb).pack(side='left', padx=5)
         ttk.Button(action_frame, text="📋 Copiar CMYKW", command=self.copy_cmykw).pack(side='left', padx=5)
+        ttk.Button(action_frame, text="🎯 Fijar Objetivo", command=self.set_target).pack(side='left', padx=5)
         ttk.Button(action_frame, text="🔧 Config System", command=self.config_plc).pack(side='left', padx=5)
         ttk.Button(action_frame, text="🚀 Enviar Datos", command=self.send_to_plc).pack(side='left', padx=5)
 
@@ -523,42 +528,34 @@ class ColorConverterApp:
         
         self.root.config(menu=menubar)
 
-    def draw_hue_circle(self):
-        """Dibuja el círculo cromático HSL"""
-        size = 200
-        center = size // 2
-        radius = size // 2 - 10
-        
-        # Crear imagen PIL
-        img = Image.new("RGB", (size, size), "white")
-        draw = ImageDraw.Draw(img)
-        
-        # Dibujar círculo cromático
-        for y in range(size):
-            for x in range(size):
-                dx = x - center
-                dy = y - center
-                distance = sqrt(dx*dx + dy*dy)
-                
-                if distance <= radius:
-                    angle = (180 + (180 / pi) * -atan2(dy, dx)) % 360
-                    saturation = distance / radius
-                    r, g, b = hsl_to_rgb(angle, saturation * 100, 50)
-                    draw.point((x, y), fill=(r, g, b))
-        
-        # Convertir a PhotoImage y mostrar
-        self.hue_circle_img = ImageTk.PhotoImage(img)
-        self.hue_circle.create_image(0, 0, anchor="nw", image=self.hue_circle_img)
-        
-        # Dibujar marcador
-        self.hue_marker = self.hue_circle.create_oval(
-            center-5, center-5, center+5, center+5,
-            outline="black", width=2, fill=""
-        )
+    def draw_hue_circle(self, lightness=None):
+        """Dibuja el círculo cromático HSL (imagen cacheada por tamaño y luminosidad)"""
+        if lightness is not None:
+            self.hue_lightness = int(round(float(lightness)))
+        key = (self.hue_size, self.hue_lightness)
+        
+        # Reutilizar el PhotoImage si ya se generó (cambio de tema, slider L)
+        photo = self.hue_circle_photos.get(key)
+        if photo is None:
+            photo = ImageTk.PhotoImage(load_hue_wheel(*key))
+            self.hue_circle_photos[key] = photo
+        self.hue_circle_img = photo
+        
+        if self.hue_circle_item is None:
+            self.hue_circle_item = self.hue_circle.create_image(0, 0, anchor="nw", image=photo)
+            
+            # Dibujar marcador
+            center = self.hue_size // 2
+            self.hue_marker = self.hue_circle.create_oval(
+                center-5, center-5, center+5, center+5,
+                outline="black", width=2, fill=""
+            )
+        else:
+            self.hue_circle.itemconfig(self.hue_circle_item, image=photo)
 
     def pick_hue(self, event):
         """Seleccionar matiz y saturación del círculo cromático"""
-        size = 200
+        size = self.hue_size
         center = size // 2
         radius = size // 2 - 10
         
@@ -570,77 +567,72 @@ class ColorConverterApp:
             # Calcular HSL
             angle = (180 + (180 / pi) * -atan2(dy, dx)) % 360
             saturation = distance / radius * 100
-            lightness = self.hsl_sliders['L']['slider'].get()
             
             # Actualizar controles
-            self.updating_sliders = True
-            self.hsl_sliders['H']['slider'].set(angle)
-            self.hsl_sliders['S']['slider'].set(saturation)
-            self.updating_sliders = False
-            
-            # Mover marcador
-            self.hue_circle.coords(
-                self.hue_marker,
-                event.x-5, event.y-5,
-                event.x+5, event.y+5
-            )
+            self.set_scale(self.hsl_sliders['H']['slider'], angle)
+            self.set_scale(self.hsl_sliders['S']['slider'], saturation)
             
-            # Convertir a RGB y actualizar
-            self.update_from_hsl()
+            # Convertir a RGB y actualizar en el próximo cuadro
+            self.scheduler.schedule('color', self.update_from_hsl)
 
     def on_hsl_change(self, channel, value):
-        """Manejar cambios en los sliders HSL"""
-        if self.updating_sliders:
+        """Manejar cambios en los sliders HSL (se agrupan por cuadro)"""
+        if self.is_echo(self.hsl_sliders[channel]['slider'], value):
             return
-            
-        # Actualizar etiqueta
-        self.hsl_sliders[channel]['label'].config(text=str(round(float(value))))
-        
-        # Actualizar marcador en círculo cromático
-        if channel == 'H' or channel == 'S':
-            h = self.hsl_sliders['H']['slider'].get()
-            s = self.hsl_sliders['S']['slider'].get() / 100.0
-            size = 200
-            center = size // 2
-            radius = size // 2 - 10
-            
-            angle = radians(-h + 180)
-            distance = s * radius
-            
-            x = center + distance * cos(angle)
-            y = center + distance * sin(angle)
-            
-            self.hue_circle.coords(
-                self.hue_marker,
-                x-5, y-5,
-                x+5, y+5
-            )
         
-        self.update_from_hsl()
+        # Redibujar el círculo con la nueva luminosidad
+        if channel == 'L':
+            self.scheduler.schedule('hue_wheel', self.redraw_hue_lightness)
+        
+        self.scheduler.schedule('color', self.update_from_hsl)
+
+    def redraw_hue_lightness(self):
+        """Redibujar el círculo con la luminosidad del slider L"""
+        self.draw_hue_circle(self.hsl_sliders['L']['slider'].get())
+
+    def set_scale(self, scale, value):
+        """Mover un slider sin que su callback repita la conversión"""
+        value = int(round(float(value)))
+        if scale.get() != value:
+            self.scale_echoes[str(scale)] = value
+            scale.set(value)
+
+    def is_echo(self, scale, value):
+        """True si el callback del slider responde a set_scale y no al usuario"""
+        expected = self.scale_echoes.pop(str(scale), None)
+        return expected is not None and expected == int(round(float(value)))
+
+    def current_cmykw(self):
+        """Valores actuales de los sliders CMYKW"""
+        return tuple(self.sliders[letter]['slider'].get() for letter in 'CMYKW')
+
+    def move_hue_marker(self, h, s):
+        """Colocar el marcador del círculo cromático (solo si se movió)"""
+        center = self.hue_size // 2
+        radius = self.hue_size // 2 - 10
+        angle = radians(-h + 180)
+        distance = (s / 100.0) * radius
+        x = center + distance * cos(angle)
+        y = center + distance * sin(angle)
+        coords = (round(x - 5), round(y - 5), round(x + 5), round(y + 5))
+        if coords != self.hue_marker_coords:
+            self.hue_marker_coords = coords
+            self.hue_circle.coords(self.hue_marker, *coords)
 
     def update_from_hsl(self):
         """Actualizar todo desde valores HSL"""
-        h = self.hsl_sliders['H']['slider'].get()
-        s = self.hsl_sliders['S']['slider'].get()
-        l = self.hsl_sliders['L']['slider'].get()
+        h, s, l = (self.hsl_sliders[letter]['slider'].get() for letter in 'HSL')
         
-        # Convertir a RGB
+        # Convertir a RGB y a CMYKW
         r, g, b = hsl_to_rgb(h, s, l)
-        
-        # Convertir a CMYKW
-        c, m, y, k, w = rgb_to_cmykw(r, g, b)
+        cmykw = self.convert_rgb_to_cmykw(r, g, b)
         
         # Actualizar sliders CMYKW
-        self.updating_sliders = True
-        self.sliders['C']['slider'].set(c)
-        self.sliders['M']['slider'].set(m)
-        self.sliders['Y']['slider'].set(y)
-        self.sliders['K']['slider'].set(k)
-        self.sliders['W']['slider'].set(w)
-        self.updating_sliders = False
-        
-        # Actualizar vista
-        self.update_color_preview()
+        for letter, value in zip('CMYKW', cmykw):
+            self.set_scale(self.sliders[letter]['slider'], value)
+        
+        self.move_hue_marker(h, s)
+        self.render_preview()
 
     def update_palette_colors(self, event=None):
         """Actualizar los colores mostrados en la paleta"""
@@ -664,45 +656,19 @@ class ColorConverterApp:
 
     def set_color_from_rgb(self, r, g, b):
         """Establecer color desde valores RGB"""
-        # Convertir a CMYKW
-        c, m, y, k, w = rgb_to_cmykw(r, g, b)
+        # Convertir a CMYKW y HSL
+        cmykw = self.convert_rgb_to_cmykw(r, g, b)
+        h, s, l = rgb_to_hsl(r, g, b)
         
         # Actualizar sliders
-        self.updating_sliders = True
-        self.sliders['C']['slider'].set(c)
-        self.sliders['M']['slider'].set(m)
-        self.sliders['Y']['slider'].set(y)
-        self.sliders['K']['slider'].set(k)
-        self.sliders['W']['slider'].set(w)
-        self.updating_sliders = False
-        
-        # Actualizar HSL
-        h, s, l = rgb_to_hsl(r, g, b)
-        self.updating_sliders = True
-        self.hsl_sliders['H']['slider'].set(h)
-        self.hsl_sliders['S']['slider'].set(s)
-        self.hsl_sliders['L']['slider'].set(l)
-        self.updating_sliders = False
+        for letter, value in zip('CMYKW', cmykw):
+            self.set_scale(self.sliders[letter]['slider'], value)
+        for letter, value in zip('HSL', (h, s, l)):
+            self.set_scale(self.hsl_sliders[letter]['slider'], value)
         
-        # Actualizar vista
+        # Actualizar marcador y vista
+        self.move_hue_marker(h, s)
         self.update_color_preview()
-        
-        # Actualizar marcador en círculo cromático
-        size = 200
-        center = size // 2
-        radius = size // 2 - 10
-        
-        angle = radians(-h + 180)
-        distance = (s / 100.0) * radius
-        
-        x = center + distance * cos(angle)
-        y = center + distance * sin(angle)
-        
-        self.hue_circle.coords(
-            self.hue_marker,
-            x-5, y-5,
-            x+5, y+5
-        )
 
     def update_history_ui(self):
         """Actualizar la interfaz del historial"""
@@ -710,8 +676,18 @@ class ColorConverterApp:
         for widget in self.history_frame.winfo_children():
             widget.destroy()
         
+        # Página 0: ventana en memoria; anteriores: consulta paginada a SQLite
+        if self.history_page == 0:
+            colors = list(self.history.items())
+        else:
+            self.history_store.flush()
+            entries = self.history_store.recent_colors(self.max_history,
+                                                       self.history_page * self.max_history)
+            colors = [(entry.rgb, entry.cmykw) for entry in reversed(entries)]
+        self.history_page_label.config(text=f"Página {self.history_page + 1}")
+        
         # Mostrar miniaturas
-        for i, (rgb, _) in enumerate(self.history[-self.max_history:]):
+        for rgb, _ in colors:
             color_hex = f'#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}'
             btn = tk.Button(
                 self.history_frame,
@@ -725,23 +701,32 @@ class ColorConverterApp:
 
     def add_to_history(self, rgb, cmykw):
         """Agregar color al historial"""
-        # Evitar duplicados
-        if not any(h[0] == rgb for h in self.history):
-            self.history.append((rgb, cmykw))
-            
-            # Mantener tamaño máximo
-            if len(self.history) > self.max_history:
-                self.history.pop(0)
-            
-            # Actualizar UI
+        self.history_store.add(rgb, cmykw)
+        self.color_index.add(rgb, cmykw)
+        
+        # Ventana LRU: un color repetido pasa a ser el más reciente
+        if rgb in self.history:
+            self.history.move_to_end(rgb)
+        self.history[rgb] = cmykw
+        if len(self.history) > self.max_history:
+            self.history.popitem(last=False)
+        
+        # Actualizar UI
+        if self.history_page == 0:
+            self.update_history_ui()
+
+    def history_older(self):
+        """Página anterior (más antigua) del historial"""
+        self.history_store.flush()
+        if (self.history_page + 1) * self.max_history < self.history_store.color_count():
+            self.history_page += 1
+            self.update_history_ui()
+
+    def history_newer(self):
+        """Página siguiente (más reciente) del historial"""
+        if self.history_page > 0:
+            self.history_page -= 1
             self.update_history_ui()
-            
-            # Guardar historial
-            try:
-                with open('color_history.json', 'w') as f:
-                    json.dump(self.history, f)
-            except:
-                pass
 
     def toggle_dark_mode(self):
         """Cambiar entre modo oscuro y claro"""
@@ -763,51 +748,126 @@ class ColorConverterApp:
         file_path = filedialog.askopenfilename(
             title="Seleccionar imagen",
             filetypes=[
-                ("Imágenes", "*.jpg *.jpeg *.png *.bmp *.gif *.tiff"),
+                ("Imágenes", "*.jpg *.jpeg *.png *.bmp *.gif *.tiff *.tif *.ppm"),
                 ("Todos los archivos", "*.*")
             ]
         )
         
         if file_path:
+            self.open_image_file(file_path)
+
+    def open_image_file(self, path):
+        """Abrir una imagen en segundo plano: vista previa y luego resolución completa"""
+        try:
+            pyramid = ImagePyramid(path)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            messagebox.showerror("Error", f"No se pudo cargar la imagen: {str(e)}")
+            return
+        
+        if self.running_camera:
+            self.stop_camera()
+        self.pyramid = pyramid
+        self.canvas.delete("all")
+        self.camera_item = self.roi_item = self.image_item = None
+        width, height = self.canvas_size()
+        self.canvas.create_text(width // 2, height // 2, text="⏳ Cargando imagen...")
+        
+        events = queue.Queue()
+        
+        def worker():
             try:
-                # Cargar imagen
-                img = Image.open(file_path)
-                
-                # Redimensionar manteniendo proporción
-                canvas_width = 450
-                canvas_height = 350
-                img.thumbnail((canvas_width, canvas_height), Image.Resampling.LANCZOS)
-                
-                # Convertir a formato compatible
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                self.image = img
-                self.display_image()
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"No se pudo cargar la imagen: {str(e)}")
+                if pyramid.load_preview():
+                    events.put('preview')
+                pyramid.load_full()
+                events.put('full')
+            except (OSError, ValueError, MemoryError, Image.DecompressionBombError) as e:
+                events.put(e)
+        
+        threading.Thread(target=worker, daemon=True).start()
+        self.root.after(50, self.check_image_loading, pyramid, events)
+
+    def check_image_loading(self, pyramid, events):
+        """Mostrar cada etapa de la carga en el hilo de Tk"""
+        if pyramid is not self.pyramid:
+            return  # Se abrió otra imagen mientras tanto
+        try:
+            while True:
+                event = events.get_nowait()
+                if isinstance(event, Exception):
+                    self.pyramid = None
+                    self.canvas.delete("all")
+                    messagebox.showerror("Error", f"No se pudo cargar la imagen: {str(event)}")
+                    return
+                if event == 'preview' or self.image_item is None:
+                    self.fit_image_view()
+                else:
+                    self.display_image()
+                if event == 'full':
+                    self.analyze_palette(pyramid.base()[0])
+                    return
+        except queue.Empty:
+            pass
+        self.root.after(100, self.check_image_loading, pyramid, events)
+
+    def canvas_size(self):
+        """Tamaño visible del canvas (el configurado si aún no se dibujó)"""
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if width <= 1 or height <= 1:
+            width, height = int(self.canvas['width']), int(self.canvas['height'])
+        return width, height
+
+    def fit_image_view(self):
+        """Encajar la imagen completa en el canvas, centrada y sin ampliar"""
+        if self.pyramid is None:
+            return
+        width, height = self.canvas_size()
+        img_width, img_height = self.pyramid.size
+        self.view_zoom = min(width / img_width, height / img_height, 1.0)
+        self.view_x = (img_width - width / self.view_zoom) / 2
+        self.view_y = (img_height - height / self.view_zoom) / 2
+        self.display_image()
+
+    def zoom_image(self, event):
+        """Zoom con la rueda manteniendo fijo el píxel bajo el cursor"""
+        if self.pyramid is None:
+            return
+        factor = 1.25 if event.num == 4 or event.delta > 0 else 1 / 1.25
+        zoom = min(max(self.view_zoom * factor, 0.01), 32.0)
+        img_x = self.view_x + event.x / self.view_zoom
+        img_y = self.view_y + event.y / self.view_zoom
+        self.view_zoom = zoom
+        self.view_x = img_x - event.x / zoom
+        self.view_y = img_y - event.y / zoom
+        self.scheduler.schedule('image_view', self.display_image)
+
+    def start_pan(self, event):
+        self.pan_start = (event.x, event.y, self.view_x, self.view_y)
+
+    def pan_image(self, event):
+        """Desplazar la vista arrastrando con el botón derecho"""
+        if self.pyramid is None or self.pan_start is None:
+            return
+        x, y, view_x, view_y = self.pan_start
+        self.view_x = view_x - (event.x - x) / self.view_zoom
+        self.view_y = view_y - (event.y - y) / self.view_zoom
+        self.scheduler.schedule('image_view', self.display_image)
 
     def display_image(self):
-        """Mostrar imagen en el canvas"""
-        if self.image:
-            # Convertir a PhotoImage
-            photo = ImageTk.PhotoImage(self.image)
-            
-            # Limpiar canvas
+        """Mostrar la vista actual de la imagen (zoom y desplazamiento)"""
+        if self.pyramid is None or not self.pyramid.levels:
+            return
+        width, height = self.canvas_size()
+        view = self.pyramid.render(self.view_x, self.view_y, self.view_zoom, width, height)
+        
+        # Un solo PhotoImage del tamaño del canvas, actualizado con paste()
+        if self.image_item is None or \
+                (self.image_photo.width(), self.image_photo.height()) != (width, height):
             self.canvas.delete("all")
-            
-            # Centrar imagen
-            canvas_width = self.canvas.winfo_width()
-            canvas_height = self.canvas.winfo_height()
-            img_width, img_height = self.image.size
-            
-            x = (canvas_width - img_width) // 2
-            y = (canvas_height - img_height) // 2
-            
-            # Mostrar imagen
-            self.canvas.create_image(x, y, anchor="nw", image=photo)
-            self.canvas.image = photo  # Mantener referencia
+            self.camera_item = None
+            self.roi_item = None
+            self.image_photo = ImageTk.PhotoImage('RGB', (width, height))
+            self.image_item = self.canvas.create_image(0, 0, anchor="nw", image=self.image_photo)
+        self.image_photo.paste(view)
 
     def toggle_camera(self):
         """Iniciar/detener cámara"""
@@ -820,13 +880,31 @@ class ColorConverterApp:
     def start_camera(self):
         """Iniciar captura de cámara"""
         try:
-            self.cap = cv2.VideoCapture(0)
+            self.camera = CameraCapture(self.config.get('camera_index', 0), (450, 350))
             
-            if not self.cap.isOpened():
+            if not self.camera.start():
+                self.camera = None
                 messagebox.showerror("Error", "No se pudo acceder a la cámara")
                 return
             
+            # Un solo PhotoImage y un ítem fijo del canvas para todos los frames
+            width, height = self.camera.size
+            self.canvas.delete("all")
+            # Sin imagen cargada: zoom, desplazamiento y selección pasan a la cámara
+            self.pyramid = None
+            self.image_item = None
+            self.camera_photo = ImageTk.PhotoImage('RGB', (width, height))
+            self.camera_item = self.canvas.create_image(0, 0, anchor="nw", image=self.camera_photo)
+            self.roi_item = self.canvas.create_rectangle(0, 0, 0, 0, outline="red", width=2, state='hidden')
+            self.roi_coords = None
+            self.camera_image = Image.new('RGB', (width, height))
+            
             self.running_camera = True
+            self.camera_seq = 0
+            self.camera_displayed = 0
+            self.camera_dropped = 0
+            self.display_fps = 0.0
+            self.display_window_start = time.time()
             self.btn_camera.config(text="⏹️ Detener Cámara")
             self.update_camera_frame()
             
@@ -835,124 +913,275 @@ class ColorConverterApp:
 
     def stop_camera(self):
         """Detener captura de cámara"""
+        self.stop_tracking()
         self.running_camera = False
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        if self.camera:
+            self.camera.stop()
+            self.camera = None
+        # El último frame vive en el anillo de la cámara: no seguir usándolo
+        self.camera_frame = None
+        self.camera_array = None
         self.btn_camera.config(text="📷 Iniciar Cámara")
+        self.camera_stats_label.config(text="")
 
     def update_camera_frame(self):
-        """Actualizar frame de cámara"""
-        if self.running_camera and self.cap:
-            ret, frame = self.cap.read()
-            if ret:
-                # Redimensionar frame
-                frame = cv2.resize(frame, (450, 350))
-                
-                # Convertir BGR a RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Convertir a PIL Image
-                img = Image.fromarray(frame_rgb)
-                self.camera_frame = img
-                
-                # Mostrar en canvas
-                photo = ImageTk.PhotoImage(img)
-                self.canvas.delete("all")
-                self.canvas.create_image(0, 0, anchor="nw", image=photo)
-                self.canvas.image = photo
-                
-                # Programar siguiente actualización
-                self.root.after(30, self.update_camera_frame)
+        """Mostrar el frame más reciente del hilo de captura"""
+        if not (self.running_camera and self.camera):
+            return
+        
+        seq, frame = self.camera.latest()
+        if frame is not None and seq != self.camera_seq:
+            # Frames que el productor reemplazó antes de mostrarse
+            self.camera_dropped += seq - self.camera_seq - 1
+            self.camera_seq = seq
+            
+            # PIL copia los píxeles RGB (frombuffer solo comparte memoria en
+            # RGBX/RGBA/L): se refresca una única Image en lugar de crear una
+            img = self.camera_image
+            img.frombytes(frame)
+            self.camera_frame = img
+            self.camera_array = frame
+            
+            # Copiar los píxeles al PhotoImage existente
+            self.camera_photo.paste(img)
+            self.camera_displayed += 1
+            
+            # Mostrar la ROI y el color seguido
+            if self.tracker:
+                x, y = self.tracker.roi_center(frame)
+                radius = self.tracker.radius
+                coords = (x - radius, y - radius, x + radius, y + radius)
+                if coords != self.roi_coords and self.roi_item is not None:
+                    self.roi_coords = coords
+                    self.canvas.coords(self.roi_item, *coords)
+                    self.canvas.itemconfig(self.roi_item, state='normal')
+                rgb = self.tracker.latest_rgb
+                if rgb is not None and rgb != self.tracked_rgb:
+                    self.tracked_rgb = rgb
+                    self.set_color_from_rgb(*rgb)
+        
+        # Actualizar estadísticas una vez por segundo
+        now = time.time()
+        if now - self.display_window_start >= 1.0:
+            self.display_fps = self.camera_displayed / (now - self.display_window_start)
+            self.camera_displayed = 0
+            self.display_window_start = now
+            self.camera_stats_label.config(
+                text=f"Captura: {self.camera.capture_fps:.1f} FPS | "
+                     f"Pantalla: {self.display_fps:.1f} FPS | "
+                     f"Descartados: {self.camera_dropped}"
+                     + (f" | Seguimiento: {self.tracker.sent_count} envíos" if self.tracker else "")
+            )
+        
+        # Programar siguiente actualización
+        self.root.after(self.display_interval, self.update_camera_frame)
+
+    def toggle_tracking(self):
+        """Iniciar/detener el seguimiento de color en vivo"""
+        if not self.tracking_var.get():
+            self.stop_tracking()
+            return
+        
+        if not (self.running_camera and self.camera):
+            self.tracking_var.set(False)
+            messagebox.showinfo("Seguimiento", "Inicia la cámara para usar el seguimiento en vivo")
+            return
+        
+        roi = self.config.get('tracking_roi')
+        self.tracked_rgb = None
+        self.tracker = LiveColorTracker(
+            self.camera, self.plc,
+            convert=self.convert_rgb_to_cmykw,
+            roi=tuple(roi) if roi else None,
+            radius=self.config.get('tracking_radius', 5),
+            shape=self.roi_shape.get(),
+            mode=self.roi_mode.get(),
+            smoothing=self.config.get('tracking_smoothing', 'ema'),
+            alpha=self.config.get('tracking_alpha', 0.3),
+            window=self.config.get('tracking_window', 5),
+            deadband=self.config.get('tracking_deadband', 2)
+        )
+        self.tracker.start()
+
+    def stop_tracking(self):
+        """Detener el seguimiento en vivo si está activo"""
+        if self.tracker:
+            self.tracker.stop()
+            self.tracker = None
+        if self.roi_item is not None:
+            self.canvas.itemconfig(self.roi_item, state='hidden')
+            self.roi_coords = None
+        self.tracking_var.set(False)
 
     def snapshot(self):
         """Tomar foto de la cámara"""
         if self.camera_frame:
-            self.image = self.camera_frame.copy()
+            # Los buffers de la cámara se reutilizan: conservar una copia propia
+            self.pyramid = ImagePyramid.from_array(np.array(self.camera_array))
             self.stop_camera()
-            self.display_image()
+            self.fit_image_view()
+            self.analyze_palette(self.pyramid.base()[0])
 
     def pick_color(self, event):
         """Seleccionar color de la imagen"""
-        if self.image:
-            # Obtener posición en la imagen
-            canvas_width = self.canvas.winfo_width()
-            canvas_height = self.canvas.winfo_height()
-            img_width, img_height = self.image.size
+        if self.pyramid is not None and self.pyramid.levels:
+            # Coordenadas en la imagen original según el zoom y el desplazamiento
+            img_x = self.view_x + event.x / self.view_zoom
+            img_y = self.view_y + event.y / self.view_zoom
+            img_width, img_height = self.pyramid.size
             
-            # Calcular offset de la imagen centrada
-            x_offset = (canvas_width - img_width) // 2
-            y_offset = (canvas_height - img_height) // 2
-            
-            # Coordenadas en la imagen
-            img_x = event.x - x_offset
-            img_y = event.y - y_offset
-            
-            # Verificar que esté dentro de la imagen
+            # Muestrear los píxeles reales (la vista previa solo mientras carga)
             if 0 <= img_x < img_width and 0 <= img_y < img_height:
-                # Obtener color del píxel
-                r, g, b = self.image.getpixel((img_x, img_y))
-                
-                # Establecer color
-                self.set_color_from_rgb(r, g, b)
-                
-                # Agregar al historial
-                c, m, y, k, w = rgb_to_cmykw(r, g, b)
-                self.add_to_history((r, g, b), (c, m, y, k, w))
+                array, scale = self.pyramid.base()
+                self.apply_sampled_color(array, int(img_x / scale), int(img_y / scale))
         
         elif self.camera_frame:
             # Similar para frame de cámara
-            r, g, b = self.camera_frame.getpixel((event.x, event.y))
-            self.set_color_from_rgb(r, g, b)
-            
-            c, m, y, k, w = rgb_to_cmykw(r, g, b)
-            self.add_to_history((r, g, b), (c, m, y, k, w))
+            img_height, img_width = self.camera_array.shape[:2]
+            if 0 <= event.x < img_width and 0 <= event.y < img_height:
+                self.apply_sampled_color(self.camera_array, event.x, event.y)
 
-    def on_slider_change(self, component, value):
-        """Manejar cambios en los sliders CMYKW"""
-        if self.updating_sliders:
+    def analyze_current_palette(self):
+        """Analizar el frame actual de la cámara o la imagen cargada"""
+        if self.camera_frame:
+            # El anillo de la cámara reutiliza sus buffers: analizar una copia
+            self.analyze_palette(np.array(self.camera_array))
+        elif self.pyramid is not None and self.pyramid.levels:
+            self.analyze_palette(self.pyramid.base()[0])
+
+    def analyze_palette(self, image_array):
+        """Extraer la paleta dominante en segundo plano"""
+        self.palette_seq += 1
+        seq = self.palette_seq
+        results = queue.Queue()
+        
+        def worker():
+            start = time.perf_counter()
+            try:
+                palette = extract_palette(image_array, self.palette_size, self.palette_method,
+                                          recipe=self.palette_recipes)
+            except (ValueError, MemoryError) as e:
+                print(f"🛑 No se pudo analizar la paleta: {e}")
+                palette = []
+            results.put((palette, time.perf_counter() - start))
+        
+        self.image_palette_label.config(text="⏳ Analizando...")
+        threading.Thread(target=worker, daemon=True).start()
+        self.root.after(50, self.check_palette, seq, results)
+
+    def palette_recipes(self, rgbs):
+        """Recetas CMYKW de los colores de la paleta con el modelo activo"""
+        return [self.convert_rgb_to_cmykw(*rgb) for rgb in rgbs.tolist()]
+
+    def check_palette(self, seq, results):
+        """Mostrar la paleta cuando el hilo termine (si sigue siendo la última pedida)"""
+        if seq != self.palette_seq:
             return
+        try:
+            palette, elapsed = results.get_nowait()
+        except queue.Empty:
+            self.root.after(50, self.check_palette, seq, results)
+            return
+        self.update_image_palette_ui(palette)
+        self.image_palette_label.config(text=f"{len(palette)} colores en {elapsed * 1000:.0f} ms")
+
+    def update_image_palette_ui(self, palette):
+        """Muestras de la paleta con su proporción de píxeles y receta CMYKW"""
+        for widget in self.image_palette_frame.winfo_children():
+            widget.destroy()
         
-        # Actualizar etiqueta
-        self.sliders[component]['label'].config(text=f"{value}%")
-        
-        # Obtener valores actuales
-        c = self.sliders['C']['slider'].get()
-        m = self.sliders['M']['slider'].get()
-        y = self.sliders['Y']['slider'].get()
-        k = self.sliders['K']['slider'].get()
-        w = self.sliders['W']['slider'].get()
-        
-        # Convertir a RGB
-        r, g, b = cmykw_to_rgb(c, m, y, k, w)
-        
-        # Actualizar HSL
-        h, s, l = rgb_to_hsl(r, g, b)
-        self.updating_sliders = True
-        self.hsl_sliders['H']['slider'].set(h)
-        self.hsl_sliders['S']['slider'].set(s)
-        self.hsl_sliders['L']['slider'].set(l)
-        self.updating_sliders = False
-        
-        # Actualizar marcador en círculo cromático
-        size = 200
-        center = size // 2
-        radius = size // 2 - 10
-        
-        angle = radians(-h + 180)
-        distance = (s / 100.0) * radius
+        for column, color in enumerate(palette):
+            r, g, b = color.rgb
+            tk.Button(
+                self.image_palette_frame,
+                bg=f'#{r:02x}{g:02x}{b:02x}',
+                width=4,
+                height=1,
+                relief='solid',
+                command=lambda r=r, g=g, b=b: self.set_color_from_rgb(r, g, b)
+            ).grid(row=0, column=column, padx=2, pady=2)
+            recipe = "/".join(str(v) for v in color.cmykw)
+            ttk.Label(self.image_palette_frame, text=f"{color.share:.0%}\n{recipe}",
+                      style='Info.TLabel', justify='center').grid(row=1, column=column, padx=2)
+
+    def apply_sampled_color(self, image_array, x, y):
+        """Muestrear la región de interés y usar el color resultante"""
+        try:
+            radius = self.roi_radius.get()
+        except tk.TclError:
+            radius = self.config.get('roi_radius', 2)
+        
+        r, g, b = sample_roi(
+            image_array, x, y,
+            radius=radius,
+            shape=self.roi_shape.get(),
+            mode=self.roi_mode.get()
+        )
         
-        x = center + distance * cos(angle)
-        y = center + distance * sin(angle)
+        # Establecer color
+        self.set_color_from_rgb(r, g, b)
+        self.show_delta_e(r, g, b)
+        self.show_nearest(r, g, b)
         
-        self.hue_circle.coords(
-            self.hue_marker,
-            x-5, y-5,
-            x+5, y+5
+        # Agregar al historial
+        c, m, y, k, w = self.convert_rgb_to_cmykw(r, g, b)
+        self.add_to_history((r, g, b), (c, m, y, k, w))
+
+    def set_target(self):
+        """Usar la receta actual como objetivo del control de calidad"""
+        cmykw = list(self.current_cmykw())
+        rgb = list(self.preview_table.cmykw_to_rgb(*cmykw))
+        self.target = {'rgb': rgb, 'cmykw': cmykw}
+        self.target_lab = rgb_to_lab_array(rgb)
+        self.config['target'] = self.target
+        self.delta_e_label.config(text=f"🎯 Objetivo: CMYKW{tuple(cmykw)}")
+
+    def show_delta_e(self, r, g, b):
+        """Mostrar el ΔE2000 del color muestreado frente a la receta objetivo"""
+        if self.target_lab is None:
+            return
+        delta_e = float(delta_e2000(rgb_to_lab_array((r, g, b)), self.target_lab))
+        status = "✅" if delta_e <= self.delta_e_tolerance else "⚠️"
+        self.delta_e_label.config(
+            text=f"🎯 ΔE00 vs CMYKW{tuple(self.target['cmykw'])}: {delta_e:.2f} {status}"
         )
-        
-        # Actualizar vista
-        self.update_color_preview()
+
+    def show_nearest(self, r, g, b):
+        """Mostrar la receta conocida más cercana al color muestreado"""
+        matches = self.color_index.nearest((r, g, b), exclude_exact=True)
+        if not matches:
+            return
+        match = matches[0]
+        cmykw = match.cmykw or self.convert_rgb_to_cmykw(*match.rgb)
+        name = match.name or f"RGB{match.rgb}"
+        self.match_label.config(
+            text=f"🔎 Más cercano: {name} CMYKW{tuple(cmykw)} (ΔE00 {match.delta_e:.2f})"
+        )
+
+    def on_roi_change(self, *args):
+        """Guardar la configuración de muestreo"""
+        try:
+            self.config['roi_radius'] = self.roi_radius.get()
+        except tk.TclError:
+            return
+        self.config['roi_shape'] = self.roi_shape.get()
+        self.config['roi_mode'] = self.roi_mode.get()
+
+    def on_slider_change(self, component, value):
+        """Manejar cambios en los sliders CMYKW (se agrupan por cuadro)"""
+        if self.is_echo(self.sliders[component]['slider'], value):
+            return
+        self.scheduler.schedule('color', self.update_from_cmykw)
+
+    def update_from_cmykw(self):
+        """Actualizar HSL, marcador y vista desde los sliders CMYKW"""
+        cmykw = self.current_cmykw()
+        r, g, b = self.preview_table.cmykw_to_rgb(*cmykw)
+        h, s, l = self.preview_table.rgb_to_hsl(r, g, b)
+        for letter, value in zip('HSL', (h, s, l)):
+            self.set_scale(self.hsl_sliders[letter]['slider'], value)
+        self.move_hue_marker(h, s)
+        self.render_preview(cmykw, (r, g, b))
 
     def send_to_plc(self):
         """Enviar valores actuales al PLC"""
@@ -961,74 +1190,77 @@ class ColorConverterApp:
         y = self.sliders['Y']['slider'].get()
         k = self.sliders['K']['slider'].get()
         w = self.sliders['W']['slider'].get()
-        self.plc.enviar_a_plc(c, m, y, k, w)
-        messagebox.showinfo("PLC", "Valores enviados al PLC.")
+        future = self.plc.enviar_a_plc(c, m, y, k, w, callback=self.plc_results.put)
+        if future is False:
+            messagebox.showwarning("PLC", "No hay una conexión con el PLC configurada.")
+
+    def update_telemetry_ui(self):
+        """Mostrar la última telemetría del Arduino (sin leer el puerto)"""
+        record = self.plc.telemetry_buffer.latest()
+        if record is not None:
+            temps = " ".join(f"{t}:{v:.1f}°" for t, v in zip(TANKS, record['temps']))
+            levels = " ".join(f"{t}:{v:.0f}%" for t, v in zip(TANKS, record['levels']))
+            alarms = [t for i, t in enumerate(TANKS)
+                      if record['alarms'] & (1 << (ALARM_CRITICAL + i) | 1 << (ALARM_WARNING + i))]
+            text = f"Temp: {temps}\nNivel: {levels}"
+            if alarms:
+                text += f"\n⚠️ Alarma: {', '.join(alarms)}"
+            self.telemetry_label.config(text=text)
+        self.root.after(1000, self.update_telemetry_ui)
+
+    def poll_plc_results(self):
+        """Mostrar en el hilo de Tk los resultados de los envíos manuales"""
+        try:
+            while True:
+                result = self.plc_results.get_nowait().result()
+                if result.ok:
+                    messagebox.showinfo("PLC", f"Valores enviados al PLC ({result.latency * 1000:.1f} ms).")
+                else:
+                    messagebox.showerror("PLC", "No se pudieron enviar los valores al PLC.")
+        except queue.Empty:
+            pass
+        self.root.after(100, self.poll_plc_results)
 
     def update_color_preview(self):
-        """Actualizar previsualización del color"""
-        # Obtener valores actuales
-        c = self.sliders['C']['slider'].get()
-        m = self.sliders['M']['slider'].get()
-        y = self.sliders['Y']['slider'].get()
-        k = self.sliders['K']['slider'].get()
-        w = self.sliders['W']['slider'].get()
+        """Pedir la actualización de la previsualización (una por cuadro)"""
+        self.scheduler.schedule('preview', self.render_preview)
+
+    def render_preview(self, cmykw=None, rgb=None):
+        """Etiquetas y previsualización; solo se tocan los widgets que cambian"""
+        c, m, y, k, w = cmykw or self.current_cmykw()
+        r, g, b = rgb or self.preview_table.cmykw_to_rgb(c, m, y, k, w)
+        set_text = self.scheduler.set_text
         
         # Actualizar etiquetas de valores
-        for letter in ['C', 'M', 'Y', 'K', 'W']:
-            value = self.sliders[letter]['slider'].get()
-            self.sliders[letter]['label'].config(text=f"{value}%")
-        
-        # Actualizar etiquetas HSL
-        for letter in ['H', 'S', 'L']:
-            value = self.hsl_sliders[letter]['slider'].get()
-            self.hsl_sliders[letter]['label'].config(text=str(round(value)))
-        
-        # Convertir a RGB
-        r, g, b = cmykw_to_rgb(c, m, y, k, w)
+        for letter, value in zip('CMYKW', (c, m, y, k, w)):
+            set_text(self.sliders[letter]['label'], f"{value}%")
+        for letter in 'HSL':
+            set_text(self.hsl_sliders[letter]['label'], str(round(self.hsl_sliders[letter]['slider'].get())))
         
         # Actualizar información
-        self.rgb_label.config(text=f"RGB: {r}, {g}, {b}")
-        self.cmykw_label.config(text=f"CMYKW: {c}, {m}, {y}, {k}, {w}")
-        
-        h, s, l = rgb_to_hsl(r, g, b)
-        self.hsl_label.config(text=f"HSL: {h:.0f}°, {s:.0f}%, {l:.0f}%")
+        set_text(self.rgb_label, f"RGB: {r}, {g}, {b}")
+        set_text(self.cmykw_label, f"CMYKW: {c}, {m}, {y}, {k}, {w}")
+        h, s, l = self.preview_table.rgb_to_hsl(r, g, b)
+        set_text(self.hsl_label, f"HSL: {h:.0f}°, {s:.0f}%, {l:.0f}%")
         
-        # Actualizar previsualización
+        # Previsualización con texto contrastante
         color_hex = f'#{r:02x}{g:02x}{b:02x}'
-        self.color_preview.config(bg=color_hex)
-        
-        # Texto contrastante
         brightness = (r * 0.299 + g * 0.587 + b * 0.114)
         text_color = 'white' if brightness < 128 else 'black'
-        self.color_preview.config(fg=text_color, text=color_hex)
+        self.scheduler.configure(self.color_preview, bg=color_hex, fg=text_color, text=color_hex)
 
     def reset_values(self):
         """Resetear todos los valores"""
-        self.updating_sliders = True
-        
-        # Resetear sliders CMYKW
         for letter in ['C', 'M', 'Y', 'K']:
-            self.sliders[letter]['slider'].set(0)
-        self.sliders['W']['slider'].set(100)
-        
-        # Resetear sliders HSL
-        self.hsl_sliders['H']['slider'].set(0)
-        self.hsl_sliders['S']['slider'].set(0)
-        self.hsl_sliders['L']['slider'].set(100)
+            self.set_scale(self.sliders[letter]['slider'], 0)
+        self.set_scale(self.sliders['W']['slider'], 100)
+        self.set_scale(self.hsl_sliders['H']['slider'], 0)
+        self.set_scale(self.hsl_sliders['S']['slider'], 0)
+        self.set_scale(self.hsl_sliders['L']['slider'], 100)
         
-        self.updating_sliders = False
-        
-        # Actualizar vista
+        # Actualizar vista y centrar marcador en círculo cromático
         self.update_color_preview()
-        
-        # Centrar marcador en círculo cromático
-        size = 200
-        center = size // 2
-        self.hue_circle.coords(
-            self.hue_marker,
-            center-5, center-5,
-            center+5, center+5
-        )
+        self.move_hue_marker(0, 0)
 
     def copy_rgb(self):
         """Copiar valores RGB al portapapeles"""
@@ -1071,13 +1303,7 @@ class ColorConverterApp:
                 self.plc.close()
             
             # Actualizar PLC manager con nueva configuración
-            self.plc = PLCManager(
-                connection_type=self.config.get('connection_type', 'none'),
-                ip=self.config.get('plc_ip', '192.168.0.10'),
-                port=self.config.get('plc_port', 502),
-                serial_port=self.config.get('serial_port'),
-                baudrate=self.config.get('baudrate', 9600)
-            )
+            self.plc = self.create_plc_manager()
             
             # Actualizar estado en la UI
             connection_status = "🔴 Sin conexión"
@@ -1097,6 +1323,9 @@ class ColorConverterApp:
         self.stop_camera()
         if hasattr(self, 'plc'):
             self.plc.close()
+        self.history_store.close()
+        if self.config.get('ui_stats', False):
+            print(f"📊 Actualizaciones de la interfaz: {json.dumps(self.scheduler.report())}")
         self.save_config()
         self.root.destroy()
 
@@ -1224,7 +1453,8 @@ class PLCConfigDialog:
         if not SERIAL_AVAILABLE:
             messagebox.showerror("Error", "pyserial no está instalado")
             return
-            
+        
+        import serial.tools.list_ports
         ports = [port.device for port in serial.tools.list_ports.comports()]
         self.serial_combobox['values'] = ports
         if ports and not self.serial_port_var.get():
@@ -1265,6 +1495,7 @@ class PLCConfigDialog:
             messagebox.showerror("Error", "pymodbus no está instalado")
             return
             
+        from pymodbus.client import ModbusTcpClient
         try:
             ip = self.ip_var.get()
             port = int(self.port_var.get())
@@ -1290,7 +1521,8 @@ class PLCConfigDialog:
         if not port:
             messagebox.showerror("Error", "Selecciona un puerto serial")
             return
-            
+        
+        import serial
         try:
             ser = serial.Serial(port, baudrate, timeout=1)
             if ser.is_open:
@@ -1303,6 +1535,10 @@ class PLCConfigDialog:
 
 # ---------- FUNCIÓN PRINCIPAL ----------
 def main():
+    # Modo sin interfaz: python Chroma.py batch <dir>
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        sys.exit(run_batch(sys.argv[2:], prog="Chroma.py batch"))
+    
     root = tk.Tk()
     app = ColorConverterApp(root)
     
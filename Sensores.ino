@@ -50,6 +50,14 @@ unsigned long cLastTime, mLastTime, yLastTime, kLastTime, wLastTime;
 double cLastError, mLastError, yLastError, kLastError, wLastError;
 double cCumError, mCumError, yCumError, kCumError, wCumError;
 
+// ========== Protocolo binario (ver serial_protocol.py) ==========
+// Trama: 0xA5 | seq | C | M | Y | K | W | CRC16 (big-endian, CCITT-FALSE)
+const byte FRAME_START = 0xA5;
+const int FRAME_SIZE = 9;
+int lastFrameSeq = -1;
+unsigned long crcErrors = 0;
+unsigned long lostFrames = 0;
+
 // ========== Constantes para niveles ==========
 const int LEVEL_CRITICAL = 10; // Nivel crítico: bloquea bombas
 const int LEVEL_WARNING = 20;  // Nivel de advertencia: activa LED y buzzer
@@ -173,7 +181,13 @@ void checkAgitatorButton() {
 
 // ========== Funciones Existente (sin cambios) ==========
 void processSerialCommands() {
-  if (Serial.available() > 0) {
+  while (Serial.available() > 0) {
+    // Un primer byte no ASCII indica una trama binaria
+    if (Serial.peek() == FRAME_START) {
+      processBinaryFrame();
+      continue;
+    }
+
     String input = Serial.readStringUntil('\n');
     input.trim();
 
@@ -184,14 +198,10 @@ void processSerialCommands() {
       k = constrain(k, 0, 100);
       w = constrain(w, 0, 100);
 
-      Serial.print("CMYKW Recibido: ");
-      Serial.print("C:"); Serial.print(c);
-      Serial.print(" M:"); Serial.print(m);
-      Serial.print(" Y:"); Serial.print(y);
-      Serial.print(" K:"); Serial.print(k);
-      Serial.print(" W:"); Serial.println(w);
-
-      blinkLED(1);
+      printReceived();
+    } else if (input == "PROTO BIN") {
+      // Negociación: el host pasa a enviar tramas binarias
+      Serial.println("PROTO BIN OK");
     } else if (input.startsWith("TEMP ")) {
       char color = input.charAt(5);
       int temp = input.substring(7).toInt();
@@ -212,6 +222,82 @@ void processSerialCommands() {
   }
 }
 
+void printReceived() {
+  Serial.print("CMYKW Recibido: ");
+  Serial.print("C:"); Serial.print(c);
+  Serial.print(" M:"); Serial.print(m);
+  Serial.print(" Y:"); Serial.print(y);
+  Serial.print(" K:"); Serial.print(k);
+  Serial.print(" W:"); Serial.println(w);
+
+  blinkLED(1);
+}
+
+uint16_t crc16_ccitt(const byte *data, int len) {
+  uint16_t crc = 0xFFFF;
+  for (int i = 0; i < len; i++) {
+    crc ^= (uint16_t)data[i] << 8;
+    for (int bit = 0; bit < 8; bit++) {
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+    }
+  }
+  return crc;
+}
+
+bool checkFrame(const byte *frame) {
+  uint16_t crc = ((uint16_t)frame[7] << 8) | frame[8];
+  if (crc16_ccitt(frame + 1, 6) != crc) {
+    crcErrors++;
+    Serial.print("Error: CRC de trama inválido (total: "); Serial.print(crcErrors); Serial.println(")");
+    return false;
+  }
+  for (int i = 2; i < 7; i++) {
+    if (frame[i] > 100) {
+      Serial.println("Error: Valor CMYKW fuera de rango");
+      return false;
+    }
+  }
+  return true;
+}
+
+void processBinaryFrame() {
+  byte frame[FRAME_SIZE];
+  int length = 0;
+  while (true) {
+    length += Serial.readBytes(frame + length, FRAME_SIZE - length);
+    if (length < FRAME_SIZE) {
+      Serial.println("Error: Trama incompleta");
+      return;
+    }
+    if (checkFrame(frame)) break;
+
+    // Igual que FrameDecoder: descartar solo el byte de inicio y
+    // resincronizar en el siguiente 0xA5 dentro de lo ya leído
+    int next = 1;
+    while (next < FRAME_SIZE && frame[next] != FRAME_START) next++;
+    length = FRAME_SIZE - next;
+    if (length == 0) return;
+    memmove(frame, frame + next, length);
+  }
+
+  // Un salto en la secuencia indica tramas perdidas
+  if (lastFrameSeq >= 0) {
+    int lost = (frame[1] - lastFrameSeq - 1) & 0xFF;
+    if (lost > 0) {
+      lostFrames += lost;
+      Serial.print("Advertencia: tramas perdidas: "); Serial.println(lostFrames);
+    }
+  }
+  lastFrameSeq = frame[1];
+
+  c = frame[2];
+  m = frame[3];
+  y = frame[4];
+  k = frame[5];
+  w = frame[6];
+  printReceived();
+}
+
 void readSensors() {
   static unsigned long lastSend = 0;
   if (millis() - lastSend > 5000) {
@@ -0,0 +1,185 @@
+"""Procesamiento por lotes sin interfaz: recetas CMYKW de carpetas de imágenes
+
+No importa Tk ni OpenCV, así que funciona en servidores sin pantalla:
+
+    python batch.py fotos/ -o recetas.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+from PIL import Image
+
+from conversion import CONFIG_FILE, load_config, rgb_to_hsl_array
+from pigment_model import load_recipe_converter
+from sampling import ROI_MODES, kmeans_colors, sample_roi
+from color_difference import delta_e_rgb
+
+# ---------- PROCESAMIENTO POR LOTES ----------
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.tif')
+BATCH_FIELDS = ['file', 'r', 'g', 'b', 'h', 's', 'l', 'c', 'm', 'y', 'k', 'w']
+KMEANS_MAX_PIXELS = 16384
+
+def find_images(directory, recursive=True):
+    """Rutas de las imágenes de un directorio, en orden"""
+    paths = []
+    for root_dir, dirs, files in os.walk(directory):
+        dirs.sort()
+        paths.extend(os.path.join(root_dir, f) for f in sorted(files)
+                     if f.lower().endswith(IMAGE_EXTENSIONS))
+        if not recursive:
+            break
+    return paths
+
+def analyze_image_file(path, roi=None, mode='kmeans', max_side=256, k=5):
+    """Color representativo de una imagen (se ejecuta en un proceso del pool)
+
+    Sin ROI se usa la imagen reducida (los JPEG se decodifican directamente a
+    escala con draft) y el color dominante por k-means; con ROI (x, y, radio)
+    se muestrea sobre la imagen a resolución completa.
+    """
+    try:
+        with Image.open(path) as img:
+            if roi is None:
+                img.draft('RGB', (max_side, max_side))
+                img = img.convert('RGB')
+                img.thumbnail((max_side, max_side))
+            else:
+                img = img.convert('RGB')
+            pixels = np.asarray(img)
+        
+        if roi is not None:
+            x, y, radius = roi
+            return path, sample_roi(pixels, x, y, radius, mode=mode, k=k), None
+        
+        pixels = pixels.reshape(-1, 3)
+        if mode == 'kmeans':
+            # Submuestreo regular: el color dominante no cambia y k-means es lineal en N
+            step = max(1, len(pixels) // KMEANS_MAX_PIXELS)
+            centers, counts = kmeans_colors(pixels[::step], k)
+            color = centers[counts.argmax()]
+        elif mode == 'median':
+            color = np.median(pixels, axis=0)
+        else:
+            color = pixels.mean(axis=0)
+        return path, tuple(int(v) for v in np.clip(np.round(color), 0, 255)), None
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError) as e:
+        # SyntaxError: PIL la lanza con archivos corruptos; el lote sigue con el resto
+        return path, None, str(e)
+
+def write_batch_results(rows, output, fmt):
+    """Guardar las recetas en CSV, JSON o Parquet"""
+    if fmt == 'csv':
+        with open(output, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else BATCH_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    elif fmt == 'json':
+        with open(output, 'w') as f:
+            json.dump(rows, f, indent=1)
+    elif fmt == 'parquet':
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("pyarrow no está instalado. Ejecuta: pip install pyarrow")
+        pq.write_table(pa.Table.from_pylist(rows), output)
+    else:
+        raise ValueError(f"Formato no válido: {fmt}")
+
+def int_triple(text, what):
+    """Tres enteros separados por comas (tipo de argparse)"""
+    try:
+        values = tuple(int(v) for v in text.split(','))
+    except ValueError:
+        values = ()
+    if len(values) != 3:
+        raise argparse.ArgumentTypeError(f"{what} debe ser tres enteros separados por comas: {text!r}")
+    return values
+
+def roi_arg(text):
+    """--roi x,y,radio"""
+    roi = int_triple(text, "La región")
+    if roi[2] < 0:
+        raise argparse.ArgumentTypeError(f"El radio de la región no puede ser negativo: {text!r}")
+    return roi
+
+def rgb_arg(text):
+    """--target r,g,b"""
+    rgb = int_triple(text, "El color objetivo")
+    if not all(0 <= v <= 255 for v in rgb):
+        raise argparse.ArgumentTypeError(f"Los componentes del color deben estar entre 0 y 255: {text!r}")
+    return rgb
+
+def run_batch(argv=None, prog=None):
+    """CLI: python batch.py <dir> (o python Chroma.py batch <dir>)"""
+    parser = argparse.ArgumentParser(prog=prog,
+                                     description="Extraer recetas CMYKW de todas las imágenes de una carpeta")
+    parser.add_argument('directory')
+    parser.add_argument('-o', '--output', help="Archivo de salida (por defecto recetas.<formato>)")
+    parser.add_argument('-f', '--format', choices=('csv', 'json', 'parquet'), default='csv')
+    parser.add_argument('--roi', type=roi_arg, help="Región x,y,radio en píxeles de la imagen original")
+    parser.add_argument('--mode', choices=ROI_MODES, default='kmeans',
+                        help="Color representativo; 'trimmed' solo con --roi")
+    parser.add_argument('--workers', type=int, default=None, help="Procesos (por defecto, uno por CPU)")
+    parser.add_argument('--no-recursive', action='store_true')
+    parser.add_argument('--config', default=CONFIG_FILE,
+                        help="Configuración de la app: modelo de pigmentos o tabla CMYKW como en la GUI")
+    parser.add_argument('--target', type=rgb_arg, help="Color objetivo r,g,b: añade la columna delta_e (ΔE2000)")
+    args = parser.parse_args(argv)
+    if args.mode == 'trimmed' and args.roi is None:
+        parser.error("--mode trimmed requiere --roi")
+    
+    roi, target = args.roi, args.target
+    output = args.output or f"recetas.{args.format}"
+    paths = find_images(args.directory, recursive=not args.no_recursive)
+    if not paths:
+        print(f"🚫 No se encontraron imágenes en {args.directory}")
+        return 1
+    
+    convert = load_recipe_converter(load_config(args.config))
+    print(f"📁 {len(paths)} imágenes en {args.directory}")
+    start = time.time()
+    colors, errors = [], []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = pool.map(analyze_image_file, paths, repeat(roi), repeat(args.mode), chunksize=8)
+        for done, (path, rgb, error) in enumerate(results, 1):
+            if rgb is None:
+                errors.append((path, error))
+            else:
+                colors.append((path, rgb))
+            if done % 100 == 0 or done == len(paths):
+                rate = done / (time.time() - start)
+                print(f"  {done}/{len(paths)} imágenes ({rate:.1f} img/s)")
+    
+    # Conversión vectorizada de todos los colores a la vez
+    rgb = np.array([c for _, c in colors], dtype=np.uint8).reshape(-1, 3)
+    hsl = rgb_to_hsl_array(rgb)
+    cmykw = convert(rgb)
+    rows = [
+        dict(zip(BATCH_FIELDS, [os.path.relpath(path, args.directory), *map(int, rgb[i]),
+                                *(round(float(v), 2) for v in hsl[i]), *map(int, cmykw[i])]))
+        for i, (path, _) in enumerate(colors)
+    ]
+    if target is not None:
+        # ΔE2000 de todo el lote frente al objetivo en una sola llamada
+        delta_e = delta_e_rgb(rgb, target)
+        for row, value in zip(rows, delta_e):
+            row['delta_e'] = round(float(value), 2)
+    write_batch_results(rows, output, args.format)
+    
+    elapsed = time.time() - start
+    print(f"✅ {len(rows)} recetas guardadas en {output} "
+          f"({elapsed:.1f}s, {len(paths) / elapsed:.1f} img/s)")
+    for path, error in errors:
+        print(f"⚠️ {path}: {error}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(run_batch())
@@ -0,0 +1,89 @@
+"""Tiempo de arranque en frío de los módulos del núcleo
+
+Cada medición corre en un intérprete nuevo (sin caché de módulos) e importa
+un módulo y hace una primera conversión. Registra también qué dependencias
+pesadas quedaron cargadas, para detectar si alguna vuelve a importarse al
+inicio. El resultado se guarda como JSON:
+
+    python benchmarks/bench_cold_start.py --repeat 15
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('cv2', 'tkinter', 'PIL.ImageTk', 'PIL.Image', 'serial', 'pymodbus')
+
+# Escenario -> código que se mide dentro del intérprete nuevo
+SCENARIOS = {
+    'conversion': "import conversion; conversion.rgb_to_cmykw(200, 100, 50)",
+    'plc': "import plc",
+    'sampling': "import sampling",
+    'batch': "import batch",
+    'receta_headless': "import conversion, plc; conversion.rgb_to_cmykw(200, 100, 50)",
+    'gui_completa': "import Chroma",
+}
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def measure(code):
+    """Ejecutar el escenario en un proceso nuevo; devuelve (segundos, módulos, total)"""
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', PROBE.format(code=code, heavy=HEAVY_MODULES)],
+                         cwd=REPO_DIR, capture_output=True, text=True, check=True)
+    total = time.perf_counter() - start
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    return result['seconds'], result['loaded'], total
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Medir el arranque en frío de los módulos")
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('-o', '--output', default=os.path.join(REPO_DIR, 'benchmarks', 'results', 'cold_start.json'))
+    parser.add_argument('scenarios', nargs='*', default=list(SCENARIOS))
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.scenarios:
+        try:
+            samples = [measure(SCENARIOS[name]) for _ in range(args.repeat)]
+        except subprocess.CalledProcessError as e:
+            print(f"⚠️ {name}: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        imports = [s[0] * 1000 for s in samples]
+        process = [s[2] * 1000 for s in samples]
+        results[name] = {
+            'import_ms_median': round(statistics.median(imports), 2),
+            'import_ms_min': round(min(imports), 2),
+            'process_ms_median': round(statistics.median(process), 2),
+            'heavy_modules': samples[-1][1],
+        }
+        print(f"  {name:18s} {results[name]['import_ms_median']:8.1f} ms  "
+              f"(proceso {results[name]['process_ms_median']:.1f} ms)  "
+              f"cargados: {', '.join(samples[-1][1]) or '-'}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'benchmark': 'cold_start',
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'results': results,
+        }, f, indent=2)
+    print(f"✅ Resultados guardados en {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Búsqueda del color conocido más cercano: índice Lab frente a recorrido lineal
+
+- construcción del índice con --colors recetas
+- µs por consulta nearest() (árbol KD propio y cKDTree si scipy está instalado)
+- µs por consulta del recorrido lineal con ΔE2000 sobre todas las entradas
+- µs por inserción incremental y por comprobación de duplicado
+
+    python benchmarks/bench_color_index.py --colors 100000
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import numpy as np
+
+from color_difference import rgb_to_lab_array, delta_e2000
+from color_index import SCIPY_AVAILABLE, ColorIndex
+
+def measure(use_scipy, rgb, queries, inserts):
+    index = ColorIndex(use_scipy=use_scipy)
+    start = time.perf_counter()
+    index.add_many(rgb, source='bench')
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matches = [index.nearest(q)[0] for q in queries]
+    query_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+    start = time.perf_counter()
+    for q in inserts:
+        index.add(q, source='bench')
+    insert_us = (time.perf_counter() - start) / len(inserts) * 1e6
+
+    start = time.perf_counter()
+    for q in queries:
+        q in index
+    dedup_us = (time.perf_counter() - start) / len(queries) * 1e6
+    return matches, {
+        'build_seconds': round(build_seconds, 3),
+        'nearest_us': round(query_us, 1),
+        'insert_us': round(insert_us, 1),
+        'dedup_us': round(dedup_us, 2),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Medir el índice de colores")
+    parser.add_argument('--colors', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--inserts', type=int, default=5000)
+    parser.add_argument('-o', '--output', default=os.path.join(REPO_DIR, 'benchmarks', 'results', 'color_index.json'))
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    rgb = rng.integers(0, 256, (args.colors, 3))
+    queries = rng.integers(0, 256, (args.queries, 3))
+    inserts = rng.integers(0, 256, (args.inserts, 3))
+
+    results = {'colors': args.colors}
+    backends = [('kdtree', False)] + ([('ckdtree', True)] if SCIPY_AVAILABLE else [])
+    for name, use_scipy in backends:
+        matches, results[name] = measure(use_scipy, rgb, queries, inserts)
+        for key, value in results[name].items():
+            print(f"  {name + '.' + key:24s} {value}")
+
+    # Recorrido lineal: ΔE2000 contra todas las entradas, una consulta a la vez
+    lab = rgb_to_lab_array(np.asarray(rgb, dtype=np.uint8))
+    n = min(args.queries, 50)
+    start = time.perf_counter()
+    linear = [float(delta_e2000(lab, rgb_to_lab_array(q.astype(np.uint8))).min()) for q in queries[:n]]
+    results['linear_nearest_us'] = round((time.perf_counter() - start) / n * 1e6, 1)
+    # Reordenar CANDIDATES vecinos por ΔE76 no garantiza el mínimo global de ΔE2000
+    results['exact_match_rate'] = round(float(np.mean(
+        [abs(m.delta_e - d) < 1e-9 for m, d in zip(matches, linear)])), 3)
+    for key in ('linear_nearest_us', 'exact_match_rate'):
+        print(f"  {key:24s} {results[key]}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'benchmark': 'color_index',
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }, f, indent=2)
+    print(f"✅ Resultados guardados en {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
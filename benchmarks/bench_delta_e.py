@@ -0,0 +1,125 @@
+"""ΔE vectorizado frente a un bucle de Python puro
+
+Implementa CIEDE2000 y la conversión RGB→Lab par por par con el módulo
+math (la forma directa de escribirlo) y compara el rendimiento y el
+resultado con color_difference.
+
+    python benchmarks/bench_delta_e.py --pairs 2000000
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import numpy as np
+
+from color_difference import delta_e76, delta_e94, delta_e2000, rgb_to_lab_array
+
+def naive_rgb_to_lab(r, g, b):
+    def linear(v):
+        v /= 255
+        return v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+    rl, gl, bl = linear(r), linear(g), linear(b)
+    x = (0.4124564 * rl + 0.3575761 * gl + 0.1804375 * bl) / 0.95047
+    y = 0.2126729 * rl + 0.7151522 * gl + 0.0721750 * bl
+    z = (0.0193339 * rl + 0.1191920 * gl + 0.9503041 * bl) / 1.08883
+    f = lambda t: t ** (1 / 3) if t > (6 / 29) ** 3 else t / (3 * (6 / 29) ** 2) + 4 / 29
+    fx, fy, fz = f(x), f(y), f(z)
+    return 116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)
+
+def naive_delta_e2000(lab1, lab2):
+    L1, a1, b1 = lab1
+    L2, a2, b2 = lab2
+    C_mean = (math.hypot(a1, b1) + math.hypot(a2, b2)) / 2
+    G = 0.5 * (1 - math.sqrt(C_mean ** 7 / (C_mean ** 7 + 25 ** 7)))
+    a1p, a2p = (1 + G) * a1, (1 + G) * a2
+    C1p, C2p = math.hypot(a1p, b1), math.hypot(a2p, b2)
+    h1p = math.degrees(math.atan2(b1, a1p)) % 360
+    h2p = math.degrees(math.atan2(b2, a2p)) % 360
+    dLp, dCp = L2 - L1, C2p - C1p
+    if C1p * C2p == 0:
+        dhp = 0.0
+    else:
+        dhp = h2p - h1p
+        if dhp > 180:
+            dhp -= 360
+        elif dhp < -180:
+            dhp += 360
+    dHp = 2 * math.sqrt(C1p * C2p) * math.sin(math.radians(dhp) / 2)
+    Lp, Cp = (L1 + L2) / 2, (C1p + C2p) / 2
+    if C1p * C2p == 0:
+        hp = h1p + h2p
+    elif abs(h1p - h2p) > 180:
+        hp = (h1p + h2p + 360) / 2 if h1p + h2p < 360 else (h1p + h2p - 360) / 2
+    else:
+        hp = (h1p + h2p) / 2
+    T = (1 - 0.17 * math.cos(math.radians(hp - 30)) + 0.24 * math.cos(math.radians(2 * hp))
+         + 0.32 * math.cos(math.radians(3 * hp + 6)) - 0.20 * math.cos(math.radians(4 * hp - 63)))
+    SL = 1 + 0.015 * (Lp - 50) ** 2 / math.sqrt(20 + (Lp - 50) ** 2)
+    SC = 1 + 0.045 * Cp
+    SH = 1 + 0.015 * Cp * T
+    RT = -2 * math.sqrt(Cp ** 7 / (Cp ** 7 + 25 ** 7)) * math.sin(math.radians(60 * math.exp(-((hp - 275) / 25) ** 2)))
+    return math.sqrt((dLp / SL) ** 2 + (dCp / SC) ** 2 + (dHp / SH) ** 2 + RT * (dCp / SC) * (dHp / SH))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Comparar ΔE vectorizado con un bucle de Python")
+    parser.add_argument('--pairs', type=int, default=2000000)
+    parser.add_argument('--naive-pairs', type=int, default=20000)
+    parser.add_argument('-o', '--output', default=os.path.join(REPO_DIR, 'benchmarks', 'results', 'delta_e.json'))
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    rgb1 = rng.integers(0, 256, (args.pairs, 3), dtype=np.uint8)
+    rgb2 = rng.integers(0, 256, (args.pairs, 3), dtype=np.uint8)
+
+    start = time.perf_counter()
+    lab1, lab2 = rgb_to_lab_array(rgb1), rgb_to_lab_array(rgb2)
+    lab_seconds = time.perf_counter() - start
+
+    results = {'pairs': args.pairs, 'lab_colors_per_second': round(2 * args.pairs / lab_seconds)}
+    for name, function in (('delta_e76', delta_e76), ('delta_e94', delta_e94), ('delta_e2000', delta_e2000)):
+        start = time.perf_counter()
+        function(lab1, lab2)
+        results[f'{name}_pairs_per_second'] = round(args.pairs / (time.perf_counter() - start))
+
+    # Bucle de Python: RGB→Lab + ΔE2000 par por par
+    n = args.naive_pairs
+    pairs = [(tuple(map(int, a)), tuple(map(int, b))) for a, b in zip(rgb1[:n], rgb2[:n])]
+    start = time.perf_counter()
+    naive = [naive_delta_e2000(naive_rgb_to_lab(*a), naive_rgb_to_lab(*b)) for a, b in pairs]
+    naive_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = delta_e2000(rgb_to_lab_array(rgb1[:n]), rgb_to_lab_array(rgb2[:n]))
+    vector_seconds = time.perf_counter() - start
+
+    results.update({
+        'naive_pairs': n,
+        'naive_rgb_delta_e2000_pairs_per_second': round(n / naive_seconds),
+        'vectorized_rgb_delta_e2000_pairs_per_second': round(n / vector_seconds),
+        'speedup': round(naive_seconds / vector_seconds, 1),
+        'max_difference': float(np.abs(np.array(naive) - vectorized).max()),
+    })
+    for name, value in results.items():
+        print(f"  {name:44s} {value}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'benchmark': 'delta_e',
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }, f, indent=2)
+    print(f"✅ Resultados guardados en {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""Asignaciones por frame del camino cámara → pantalla
+
+Usa una VideoCapture simulada (frames BGR de --width x --height) y ejecuta
+el bucle real de CameraCapture. Cada read() de la cámara simulada hace de
+tick de la GUI: muestra el último frame publicado y anota, con tracemalloc,
+los bytes asignados de forma transitoria desde el tick anterior. Compara:
+
+- anterior: resize/cvtColor que asignan, Image.fromarray y un PhotoImage nuevo
+- anillo: buffers preasignados con dst=, una Image reutilizada (frombytes) y paste()
+
+El PhotoImage solo se mide si hay pantalla; sin ella se mide hasta PIL.
+
+    python benchmarks/bench_frame_path.py --frames 600
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import numpy as np
+from PIL import Image
+
+from sampling import CameraCapture
+
+class FakeVideoCapture:
+    """VideoCapture simulada: rellena el buffer recibido si tiene el tamaño justo"""
+    def __init__(self, frames, on_read):
+        self.frames = frames
+        self.on_read = on_read
+        self.count = 0
+
+    def isOpened(self):
+        return True
+
+    def read(self, image=None):
+        self.on_read()
+        frame = self.frames[self.count % len(self.frames)]
+        self.count += 1
+        if image is None or image.shape != frame.shape:
+            image = frame.copy()
+        else:
+            np.copyto(image, frame)
+        return True, image
+
+    def release(self):
+        pass
+
+class LegacyCapture(CameraCapture):
+    """El bucle de captura anterior: un arreglo nuevo por paso"""
+    def _run(self, cap):
+        import cv2
+        while self.running:
+            ret, frame = cap.read()
+            if not ret:
+                continue
+            frame = cv2.resize(frame, self.size)
+            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            with self._new_frame:
+                self._frame = frame_rgb
+                self._seq += 1
+
+def make_display(mode, tk_root):
+    """Función que muestra un frame RGB como lo hace la GUI en cada modo"""
+    photo = None
+    if tk_root is not None:
+        from PIL import ImageTk
+    if mode == 'anterior':
+        def show(frame):
+            img = Image.fromarray(frame)
+            if tk_root is not None:
+                ImageTk.PhotoImage(img)
+        return show
+
+    img = None
+    def show(frame):
+        nonlocal photo, img
+        if img is None:
+            height, width = frame.shape[:2]
+            img = Image.new('RGB', (width, height))
+        img.frombytes(frame)
+        if tk_root is not None:
+            if photo is None:
+                photo = ImageTk.PhotoImage('RGB', img.size)
+            photo.paste(img)
+    return show
+
+def run(mode, frames, n_frames, size, tk_root):
+    capture_class = LegacyCapture if mode == 'anterior' else CameraCapture
+    show = make_display(mode, tk_root)
+    transient = []
+    collections = [0]
+    state = {'seq': 0, 'warmup': 10}
+
+    def on_read():
+        # Tick de la GUI: mostrar el último frame y medir desde el tick anterior
+        seq, frame = camera.latest()
+        if frame is not None and seq != state['seq']:
+            state['seq'] = seq
+            show(frame)
+        current, peak = tracemalloc.get_traced_memory()
+        if state['warmup'] > 0:
+            state['warmup'] -= 1
+        else:
+            transient.append(peak - state['base'])
+        tracemalloc.reset_peak()
+        state['base'] = tracemalloc.get_traced_memory()[0]
+        if cap.count >= n_frames:
+            camera.running = False
+
+    def on_gc(phase, info):
+        if phase == 'start':
+            collections[0] += 1
+
+    cap = FakeVideoCapture(frames, on_read)
+    camera = capture_class(cap, size)
+    camera.running = True
+    gc.callbacks.append(on_gc)
+    tracemalloc.start()
+    state['base'] = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    try:
+        camera._run(cap)
+    finally:
+        elapsed = time.perf_counter() - start
+        tracemalloc.stop()
+        gc.callbacks.remove(on_gc)
+    measured = np.array(transient)
+    result = {
+        'frames': cap.count,
+        'ms_per_frame': round(elapsed / cap.count * 1000, 3),
+        'transient_bytes_mean': int(measured.mean()),
+        'transient_bytes_max': int(measured.max()),
+        'gc_collections': collections[0],
+    }
+    print(f"  {mode:9s} " + "  ".join(f"{key} {value}" for key, value in result.items()))
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Medir asignaciones por frame de la cámara a la pantalla")
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('-o', '--output', default=os.path.join(REPO_DIR, 'benchmarks', 'results', 'frame_path.json'))
+    args = parser.parse_args(argv)
+
+    try:
+        import tkinter as tk
+        tk_root = tk.Tk()
+        tk_root.withdraw()
+    except Exception as e:  # Sin pantalla (TclError) o sin Tk instalado
+        print(f"⚠️ PhotoImage no medido: {e}")
+        tk_root = None
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8) for _ in range(8)]
+    size = (450, 350)
+    results = {'photoimage': tk_root is not None}
+    for mode in ('anterior', 'anillo'):
+        results[mode] = run(mode, frames, args.frames, size, tk_root)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'benchmark': 'frame_path',
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }, f, indent=2)
+    print(f"✅ Resultados guardados en {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
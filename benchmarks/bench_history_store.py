@@ -0,0 +1,121 @@
+"""Historial en SQLite frente al color_history.json reescrito en cada selección
+
+Con --existing selecciones ya guardadas mide:
+
+- json: costo por selección de reescribir el archivo completo y tiempo de
+  carga al arrancar
+- sqlite: costo por selección de HistoryStore.add (hilo escritor por lotes),
+  tiempo hasta que todo está en disco, apertura + primera página de la tira
+  y consulta de una página antigua
+
+    python benchmarks/bench_history_store.py --existing 100000
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import numpy as np
+
+from history_store import HistoryStore, pack_rgb
+
+def db_size(path):
+    """Bytes de la base y su WAL (al cerrar, el WAL se integra y se borra)"""
+    return sum(os.path.getsize(p) for p in (path, path + '-wal') if os.path.exists(p))
+
+def bench_json(path, history, picks):
+    with open(path, 'w') as f:
+        json.dump(history, f)
+    start = time.perf_counter()
+    for rgb, cmykw in picks:
+        history.append((rgb, cmykw))
+        with open(path, 'w') as f:
+            json.dump(history, f)
+    pick_ms = (time.perf_counter() - start) / len(picks) * 1000
+    start = time.perf_counter()
+    with open(path, 'r') as f:
+        json.load(f)
+    return {
+        'pick_ms': round(pick_ms, 3),
+        'startup_ms': round((time.perf_counter() - start) * 1000, 2),
+        'bytes_per_pick': os.path.getsize(path),
+    }
+
+def bench_sqlite(path, history, picks, page_size):
+    store = HistoryStore(path)
+    # Historial previo en una sola transacción
+    base = time.time() - len(history)
+    rows = [(base + i, pack_rgb(rgb), *cmykw) for i, (rgb, cmykw) in enumerate(history)]
+    with store.lock:
+        store._write(store.reader, rows)
+    store.close()
+
+    start = time.perf_counter()
+    store = HistoryStore(path).start()
+    store.recent_colors(page_size)
+    startup_ms = (time.perf_counter() - start) * 1000
+
+    size = db_size(path)
+    start = time.perf_counter()
+    for rgb, cmykw in picks:
+        store.add(rgb, cmykw)
+    pick_us = (time.perf_counter() - start) / len(picks) * 1e6
+    store.flush()
+    drain_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    store.recent_colors(page_size, offset=store.color_count() // 2)
+    page_ms = (time.perf_counter() - start) * 1000
+    store.close()
+    grown = db_size(path) - size
+    return {
+        'pick_us': round(pick_us, 2),
+        'drain_ms': round(drain_ms, 1),
+        'startup_ms': round(startup_ms, 2),
+        'middle_page_ms': round(page_ms, 2),
+        'bytes_per_pick': round(max(grown, 0) / len(picks)),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Comparar el historial JSON con SQLite")
+    parser.add_argument('--existing', type=int, default=100000)
+    parser.add_argument('--picks', type=int, default=50)
+    parser.add_argument('--page-size', type=int, default=10)
+    parser.add_argument('-o', '--output', default=os.path.join(REPO_DIR, 'benchmarks', 'results', 'history_store.json'))
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    def entries(n):
+        rgb = rng.integers(0, 256, (n, 3)).tolist()
+        cmykw = rng.integers(0, 101, (n, 5)).tolist()
+        return list(zip(map(tuple, rgb), map(tuple, cmykw)))
+    history, picks = entries(args.existing), entries(args.picks)
+
+    results = {'existing': args.existing, 'picks': args.picks}
+    with tempfile.TemporaryDirectory() as tmp:
+        results['json'] = bench_json(os.path.join(tmp, 'history.json'), list(history), picks)
+        results['sqlite'] = bench_sqlite(os.path.join(tmp, 'history.db'), history, picks, args.page_size)
+    for backend in ('json', 'sqlite'):
+        for key, value in results[backend].items():
+            print(f"  {backend + '.' + key:22s} {value}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'benchmark': 'history_store',
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }, f, indent=2)
+    print(f"✅ Resultados guardados en {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
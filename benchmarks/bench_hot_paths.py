@@ -0,0 +1,280 @@
+"""Caminos calientes: conversión, círculo cromático, cámara y envíos al PLC
+
+- conversión: rgb_to_cmykw / hsl_to_rgb escalares (µs por color) frente a
+  las versiones vectorizadas sobre --colors colores
+- círculo cromático: render_hue_wheel, y load_hue_wheel desde el PNG en
+  disco y desde la caché en memoria (más el PhotoImage si hay pantalla)
+- cámara: frames por segundo del hilo de CameraCapture con una
+  VideoCapture simulada, con y sin redimensionar
+- PLC: latencia de PLCManager.enviar_a_plc contra un servidor Modbus TCP
+  local (pymodbus) y contra un firmware simulado en un pty (pyserial),
+  desde el encolado hasta la confirmación o hasta que llega la trama (el
+  pty no limita los baudios: se mide el software, no el cable)
+
+Las partes cuyas dependencias no están instaladas se omiten con un aviso.
+
+    python benchmarks/bench_hot_paths.py --sends 200
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import queue
+import socket
+import statistics
+import sys
+import threading
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import numpy as np
+
+import conversion
+from conversion import (
+    rgb_to_cmykw, rgb_to_cmykw_array, hsl_to_rgb, hsl_to_rgb_array,
+    render_hue_wheel, load_hue_wheel,
+)
+from plc import MODBUS_AVAILABLE, SERIAL_AVAILABLE, PLCManager
+from sampling import CameraCapture
+from serial_protocol import NEGOTIATE_REQUEST, NEGOTIATE_REPLY, FrameDecoder
+from bench_frame_path import FakeVideoCapture
+
+def per_call_us(function, repeat, rounds=5):
+    """µs por llamada: mediana de `rounds` rondas de `repeat` llamadas"""
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        times.append((time.perf_counter() - start) / repeat)
+    return round(statistics.median(times) * 1e6, 2)
+
+def latency_summary(latencies):
+    """Mediana, p95 y máximo en ms"""
+    ordered = sorted(latencies)
+    return {
+        'sends': len(ordered),
+        'p50_ms': round(statistics.median(ordered) * 1000, 3),
+        'p95_ms': round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+# ---------- CONVERSIÓN ----------
+def bench_conversion(n_colors, n_scalar):
+    rng = np.random.default_rng(0)
+    rgb = rng.integers(0, 256, (n_colors, 3), dtype=np.uint8)
+    hsl = np.column_stack([rng.uniform(0, 360, n_colors), rng.uniform(0, 100, n_colors),
+                           rng.uniform(0, 100, n_colors)])
+    rgb_list = rgb[:n_scalar].tolist()
+    hsl_list = hsl[:n_scalar].tolist()
+    results = {}
+    for name, scalar, vectorized, colors, values in (
+            ('rgb_to_cmykw', rgb_to_cmykw, rgb_to_cmykw_array, rgb_list, rgb),
+            ('hsl_to_rgb', hsl_to_rgb, hsl_to_rgb_array, hsl_list, hsl)):
+        start = time.perf_counter()
+        for color in colors:
+            scalar(*color)
+        scalar_us = (time.perf_counter() - start) / len(colors) * 1e6
+        start = time.perf_counter()
+        vectorized(values)
+        vector_us = (time.perf_counter() - start) / len(values) * 1e6
+        results[name] = {
+            'scalar_us_per_color': round(scalar_us, 3),
+            'vectorized_us_per_color': round(vector_us, 4),
+            'speedup': round(scalar_us / vector_us, 1),
+        }
+    return results
+
+# ---------- CÍRCULO CROMÁTICO ----------
+def bench_hue_wheel(size, repeat):
+    results = {'render_ms': round(per_call_us(lambda: render_hue_wheel(size, 50), repeat) / 1000, 3)}
+    load_hue_wheel(size, 50)  # Asegura el PNG en disco
+
+    def from_disk():
+        conversion._hue_wheel_images.clear()
+        load_hue_wheel(size, 50)
+    results['load_png_ms'] = round(per_call_us(from_disk, repeat) / 1000, 3)
+    results['load_cached_us'] = per_call_us(lambda: load_hue_wheel(size, 50), repeat * 100)
+
+    try:
+        import tkinter as tk
+        from PIL import ImageTk
+        root = tk.Tk()
+        root.withdraw()
+    except Exception as e:  # Sin pantalla (TclError) o sin Tk instalado
+        print(f"⚠️ PhotoImage no medido: {e}")
+        return results
+    img = load_hue_wheel(size, 50)
+    results['photoimage_ms'] = round(per_call_us(lambda: ImageTk.PhotoImage(img), repeat) / 1000, 3)
+    root.destroy()
+    return results
+
+# ---------- CÁMARA ----------
+def bench_camera(n_frames, source_size, size=(450, 350)):
+    """Frames por segundo del hilo productor (sin límite de la cámara)"""
+    width, height = source_size
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(4)]
+    done = threading.Event()
+    cap = FakeVideoCapture(frames, lambda: cap.count >= n_frames and done.set())
+    camera = CameraCapture(cap, size)
+    start = time.perf_counter()
+    camera.start()
+    done.wait()
+    elapsed = time.perf_counter() - start
+    camera.stop()
+    return {
+        'frames': cap.count,
+        'fps': round(cap.count / elapsed, 1),
+        'ms_per_frame': round(elapsed / cap.count * 1000, 3),
+    }
+
+# ---------- PLC ----------
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def start_modbus_server(port):
+    """Servidor Modbus TCP local con 100 registros holding (dirección 0 del cliente = bloque 1)"""
+    from pymodbus.datastore import ModbusSequentialDataBlock, ModbusServerContext
+    from pymodbus.server import StartAsyncTcpServer
+    try:
+        from pymodbus.datastore import ModbusDeviceContext as DeviceContext
+        context = ModbusServerContext(devices=DeviceContext(hr=ModbusSequentialDataBlock(1, [0] * 100)),
+                                      single=True)
+    except ImportError:  # pymodbus < 3.10
+        from pymodbus.datastore import ModbusSlaveContext as DeviceContext
+        context = ModbusServerContext(slaves=DeviceContext(hr=ModbusSequentialDataBlock(1, [0] * 100)),
+                                      single=True)
+    loop = asyncio.new_event_loop()
+    server = StartAsyncTcpServer(context=context, address=('127.0.0.1', port))
+    threading.Thread(target=loop.run_until_complete, args=(server,), daemon=True).start()
+    deadline = time.time() + 5.0
+    while time.time() < deadline:
+        with contextlib.suppress(OSError), socket.create_connection(('127.0.0.1', port), 0.1):
+            return
+        time.sleep(0.05)
+    raise RuntimeError("El servidor Modbus local no arrancó")
+
+def timed_sends(manager, n_sends, delivered=None):
+    """Latencia de cada envío: hasta el resultado o hasta que el otro extremo lo recibe"""
+    manager.min_interval = 0.0
+    rng = np.random.default_rng(0)
+    latencies = []
+    failures = 0
+    with contextlib.redirect_stdout(io.StringIO()):  # Un mensaje por envío
+        for values in rng.integers(0, 101, (n_sends, 5)).tolist():
+            start = time.perf_counter()
+            result = manager.enviar_a_plc(*values).result(timeout=5.0)
+            if not result.ok:
+                failures += 1
+                continue
+            received = delivered.get(timeout=5.0) if delivered is not None else time.perf_counter()
+            latencies.append(received - start)
+    summary = latency_summary(latencies) if latencies else {}
+    summary['failures'] = failures
+    return summary
+
+def bench_modbus(n_sends):
+    if not MODBUS_AVAILABLE:
+        print("⚠️ Modbus no medido: pymodbus no está instalado")
+        return None
+    port = free_port()
+    start_modbus_server(port)
+    manager = PLCManager('modbus', ip='127.0.0.1', port=port, telemetry=False)
+    try:
+        return timed_sends(manager, n_sends)
+    finally:
+        manager.close()
+
+class SerialLoopback:
+    """Firmware simulado en el extremo maestro de un pty
+
+    Responde a la negociación del protocolo binario y entrega el instante en
+    que se decodifica cada trama completa.
+    """
+    def __init__(self):
+        self.master, self.slave = os.openpty()
+        self.port = os.ttyname(self.slave)
+        self.delivered = queue.Queue()
+        self.decoder = FrameDecoder()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        pending = b""
+        while self.running:
+            try:
+                data = os.read(self.master, 1024)
+            except OSError:
+                return
+            if NEGOTIATE_REQUEST in pending + data:
+                os.write(self.master, NEGOTIATE_REPLY + b"\n")
+                pending, data = b"", (pending + data).split(NEGOTIATE_REQUEST, 1)[1]
+            else:
+                pending = (pending + data)[-len(NEGOTIATE_REQUEST):]
+            for _ in self.decoder.feed(data):
+                self.delivered.put(time.perf_counter())
+
+    def close(self):
+        self.running = False
+        os.close(self.master)
+        os.close(self.slave)
+
+def bench_serial(n_sends):
+    if not SERIAL_AVAILABLE or not hasattr(os, 'openpty'):
+        print("⚠️ Serial no medido: falta pyserial o pty")
+        return None
+    loopback = SerialLoopback()
+    with contextlib.redirect_stdout(io.StringIO()):
+        manager = PLCManager('serial', serial_port=loopback.port, baudrate=115200)
+    try:
+        return timed_sends(manager, n_sends, loopback.delivered)
+    finally:
+        manager.close()
+        loopback.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Medir los caminos calientes de conversión, render y E/S del PLC")
+    parser.add_argument('--colors', type=int, default=1000000, help="Colores para las versiones vectorizadas")
+    parser.add_argument('--scalar-colors', type=int, default=20000)
+    parser.add_argument('--hue-size', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--frames', type=int, default=2000)
+    parser.add_argument('--sends', type=int, default=200)
+    parser.add_argument('-o', '--output', default=os.path.join(REPO_DIR, 'benchmarks', 'results', 'hot_paths.json'))
+    args = parser.parse_args(argv)
+
+    results = {
+        'conversion': bench_conversion(args.colors, args.scalar_colors),
+        'hue_wheel': bench_hue_wheel(args.hue_size, args.repeat),
+        'camera_resize': bench_camera(args.frames, (640, 480)),
+        'camera_same_size': bench_camera(args.frames, (450, 350)),
+        'plc_modbus': bench_modbus(args.sends),
+        'plc_serial': bench_serial(args.sends),
+    }
+
+    for name, value in results.items():
+        print(f"  {name:17s} {value}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'benchmark': 'hot_paths',
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }, f, indent=2)
+    print(f"✅ Resultados guardados en {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Carga de imágenes grandes: miniatura síncrona frente a la pirámide
+
+Genera una foto sintética de --megapixels MP (gradiente con ruido fino) como
+JPEG y BMP y mide:
+
+- anterior: Image.open + thumbnail(450x350, LANCZOS), lo que bloqueaba la GUI
+- pirámide: vista previa JPEG con draft(), carga completa y niveles, y BMP
+  mapeado en memoria; ms por render() de la vista a distintos zooms
+- error de color al muestrear la miniatura frente a los píxeles reales
+
+    python benchmarks/bench_image_pyramid.py --megapixels 50
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import numpy as np
+from PIL import Image
+
+from image_pyramid import ImagePyramid, open_image
+
+def synthetic_image(megapixels, seed=0):
+    """Gradiente suave con ruido de alta frecuencia (como la textura de una pintura)"""
+    width = int(np.sqrt(megapixels * 1e6 * 4 / 3))
+    height = int(width * 3 / 4)
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    for channel, base in enumerate((x + 0 * y, y + 0 * x, (x + y) / 2)):
+        noise = rng.integers(-40, 41, (height, width), dtype=np.int16)
+        image[..., channel] = np.clip(base + noise, 0, 255)
+    return image
+
+def timed(function):
+    start = time.perf_counter()
+    value = function()
+    return value, round((time.perf_counter() - start) * 1000, 1)
+
+def old_thumbnail(path):
+    img = open_image(path)
+    img.thumbnail((450, 350), Image.Resampling.LANCZOS)
+    return img.convert('RGB')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Medir la carga de imágenes grandes")
+    parser.add_argument('--megapixels', type=float, default=24)
+    parser.add_argument('--picks', type=int, default=2000)
+    parser.add_argument('-o', '--output', default=os.path.join(REPO_DIR, 'benchmarks', 'results', 'image_pyramid.json'))
+    args = parser.parse_args(argv)
+
+    image = synthetic_image(args.megapixels)
+    height, width = image.shape[:2]
+    results = {'size': [width, height]}
+    with tempfile.TemporaryDirectory() as tmp:
+        jpeg, bmp = os.path.join(tmp, 'foto.jpg'), os.path.join(tmp, 'foto.bmp')
+        Image.fromarray(image).save(jpeg, quality=95)
+        Image.fromarray(image).save(bmp)
+
+        thumbnail, results['old_thumbnail_ms'] = timed(lambda: old_thumbnail(jpeg))
+
+        pyramid = ImagePyramid(jpeg)
+        _, results['jpeg_preview_ms'] = timed(pyramid.load_preview)
+        _, results['jpeg_full_ms'] = timed(pyramid.load_full)
+        results['levels'] = [list(level.shape[1::-1]) for level, _ in pyramid.levels]
+
+        mapped = ImagePyramid(bmp)
+        _, results['bmp_mapped_full_ms'] = timed(mapped.load_full)
+
+        # Vistas: encajada, 1:1 y 4x en el centro
+        fit = min(450 / width, 350 / height)
+        for name, zoom in (('fit', fit), ('1x', 1.0), ('4x', 4.0)):
+            x0 = width / 2 - 225 / zoom
+            y0 = height / 2 - 175 / zoom
+            start = time.perf_counter()
+            for _ in range(20):
+                pyramid.render(x0, y0, zoom, 450, 350)
+            results[f'render_{name}_ms'] = round((time.perf_counter() - start) / 20 * 1000, 2)
+
+        # Precisión del muestreo: píxel de la miniatura frente al píxel real
+        rng = np.random.default_rng(1)
+        xs = rng.integers(0, width, args.picks)
+        ys = rng.integers(0, height, args.picks)
+        thumb = np.asarray(thumbnail)
+        tx = np.minimum(xs * thumb.shape[1] // width, thumb.shape[1] - 1)
+        ty = np.minimum(ys * thumb.shape[0] // height, thumb.shape[0] - 1)
+        truth = image[ys, xs].astype(np.int16)
+        full = mapped.base()[0][ys, xs].astype(np.int16)
+        results['thumbnail_pick_error'] = round(float(np.abs(thumb[ty, tx] - truth).mean()), 2)
+        results['pyramid_pick_error'] = round(float(np.abs(full - truth).mean()), 2)
+        del mapped, pyramid
+
+    for name, value in results.items():
+        print(f"  {name:22s} {value}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'benchmark': 'image_pyramid',
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }, f, indent=2)
+    print(f"✅ Resultados guardados en {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
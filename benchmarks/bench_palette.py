@@ -0,0 +1,108 @@
+"""Paleta dominante e histograma 3D de una foto grande
+
+Genera una imagen sintética de --megapixels MP con franjas de colores
+conocidos (proporciones fijas) y ruido fino, y mide:
+
+- anterior: sampling.kmeans_colors sobre todos los píxeles
+- median_cut y kmeans (minilotes) de color_palette sobre la submuestra
+- histogramas RGB y Lab de 16³ celdas
+- exactitud: ΔE2000 de cada color verdadero a su color de paleta más
+  cercano y error absoluto de la proporción asignada
+
+    python benchmarks/bench_palette.py --megapixels 12
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import numpy as np
+
+from color_difference import rgb_to_lab_array, delta_e2000
+from color_palette import PALETTE_METHODS, color_histogram, extract_palette, subsample_pixels
+from sampling import kmeans_colors
+
+COLORS = [(200, 30, 30), (20, 120, 220), (240, 235, 220), (30, 160, 60), (250, 200, 20), (60, 40, 90)]
+SHARES = [0.35, 0.25, 0.15, 0.12, 0.08, 0.05]
+
+def synthetic_image(megapixels, seed=0):
+    """Franjas verticales de COLORS con anchos según SHARES y ruido ±12"""
+    width = int(np.sqrt(megapixels * 1e6 * 4 / 3))
+    height = int(width * 3 / 4)
+    rng = np.random.default_rng(seed)
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    edges = np.round(np.cumsum([0] + SHARES) * width).astype(int)
+    for color, x0, x1 in zip(COLORS, edges[:-1], edges[1:]):
+        noise = rng.integers(-12, 13, (height, x1 - x0, 3), dtype=np.int16)
+        image[:, x0:x1] = np.clip(np.array(color) + noise, 0, 255)
+    return image
+
+def timed(function, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        value = function()
+    return value, round((time.perf_counter() - start) / repeat * 1000, 1)
+
+def accuracy(rgbs, shares):
+    """ΔE2000 medio/máximo al color más cercano y error medio de proporción"""
+    found = rgb_to_lab_array(np.array(rgbs, dtype=np.float64))
+    truth = rgb_to_lab_array(np.array(COLORS, dtype=np.float64))
+    distances = delta_e2000(truth[:, None, :], found[None, :, :])
+    nearest = distances.argmin(axis=1)
+    # Proporción de cada color verdadero: suma de los colores de paleta que le tocan
+    assigned = distances.argmin(axis=0)
+    found_shares = np.bincount(assigned, weights=shares, minlength=len(COLORS))
+    return {
+        'delta_e_mean': round(float(distances[np.arange(len(COLORS)), nearest].mean()), 2),
+        'delta_e_max': round(float(distances[np.arange(len(COLORS)), nearest].max()), 2),
+        'share_error': round(float(np.abs(found_shares - SHARES).mean()), 4),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Medir la extracción de paleta e histogramas")
+    parser.add_argument('--megapixels', type=float, default=12)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--skip-baseline', action='store_true',
+                        help="No medir k-means sobre todos los píxeles (tarda segundos)")
+    parser.add_argument('-o', '--output', default=os.path.join(REPO_DIR, 'benchmarks', 'results', 'palette.json'))
+    args = parser.parse_args(argv)
+
+    image = synthetic_image(args.megapixels)
+    n = len(COLORS)
+    results = {'size': [image.shape[1], image.shape[0]]}
+
+    if not args.skip_baseline:
+        (centers, counts), elapsed = timed(lambda: kmeans_colors(image.reshape(-1, 3), n))
+        results['anterior'] = {'ms': elapsed, **accuracy(centers, counts / counts.sum())}
+
+    for method in PALETTE_METHODS:
+        palette, elapsed = timed(lambda: extract_palette(image, n, method), args.repeat)
+        results[method] = {'ms': elapsed, **accuracy([c.rgb for c in palette], [c.share for c in palette])}
+
+    pixels = subsample_pixels(image)
+    _, results['subsample_ms'] = timed(lambda: subsample_pixels(image), args.repeat)
+    for space in ('rgb', 'lab'):
+        _, results[f'histogram_{space}_ms'] = timed(lambda: color_histogram(pixels, 16, space), args.repeat)
+
+    for name, value in results.items():
+        print(f"  {name:18s} {value}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'benchmark': 'palette',
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }, f, indent=2)
+    print(f"✅ Resultados guardados en {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
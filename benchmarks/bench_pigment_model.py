@@ -0,0 +1,96 @@
+"""Rendimiento y precisión del modelo de pigmentos Kubelka-Munk
+
+- solve: colores/s del NNLS exacto vectorizado
+- rejilla: tiempo de construcción, µs por consulta interactiva (recipe_one)
+  y error de color de la interpolación frente al NNLS exacto
+- comprobación opcional contra scipy.optimize.nnls si scipy está instalado
+
+    python benchmarks/bench_pigment_model.py
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import numpy as np
+
+from pigment_model import PigmentModel, PigmentRecipeGrid, reflectance_to_ks, srgb_to_linear
+
+def check_scipy(model, rgb):
+    """Diferencia máxima de proporciones contra scipy.optimize.nnls (None sin scipy)"""
+    try:
+        from scipy.optimize import nnls
+    except ImportError:
+        return None
+    ours, _ = model.solve(rgb)
+    t = np.clip(reflectance_to_ks(srgb_to_linear(rgb)), model.ks_min, model.ks_max)
+    worst = 0.0
+    for i in range(len(rgb)):
+        # Mismo sistema que PigmentModel.solve, con la regularización como filas extra
+        A = (model.K.T - t[i][:, None] * model.S.T) / (t[i][:, None] + model.ks_offset)
+        A = np.vstack([A, np.full((1, 5), np.sqrt(model.sum_weight)), np.sqrt(model.ridge) * np.eye(5)])
+        b = np.zeros(len(A))
+        b[3] = np.sqrt(model.sum_weight)
+        x, _ = nnls(A, b)
+        worst = max(worst, float(np.abs(x / x.sum() - ours[i]).max()))
+    return worst
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Medir el modelo de pigmentos")
+    parser.add_argument('--colors', type=int, default=50000)
+    parser.add_argument('--nodes', type=int, default=PigmentRecipeGrid.NODES)
+    parser.add_argument('-o', '--output', default=os.path.join(REPO_DIR, 'benchmarks', 'results', 'pigment_model.json'))
+    args = parser.parse_args(argv)
+
+    model = PigmentModel()
+    rng = np.random.default_rng(0)
+    rgb = rng.integers(0, 256, (args.colors, 3))
+
+    start = time.perf_counter()
+    exact, _ = model.solve(rgb)
+    solve_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        grid = PigmentRecipeGrid(model, args.nodes, path=os.path.join(tmp, 'grid.npy'))
+        start = time.perf_counter()
+        grid.load()
+        build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for r, g, b in rgb[:2000]:
+        grid.recipe_one(r, g, b)
+    query_us = (time.perf_counter() - start) / 2000 * 1e6
+
+    error = np.abs(model.mix(grid.lookup(rgb)) - model.mix(exact)).max(axis=-1)
+    results = {
+        'solve_colors_per_second': round(args.colors / solve_seconds),
+        'grid_nodes': args.nodes,
+        'grid_build_seconds': round(build_seconds, 3),
+        'recipe_one_us': round(query_us, 1),
+        'grid_rgb_error_mean': round(float(error.mean()), 3),
+        'grid_rgb_error_p99': round(float(np.percentile(error, 99)), 3),
+        'scipy_max_difference': check_scipy(model, rgb[:500]),
+    }
+    for name, value in results.items():
+        print(f"  {name:26s} {value}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'benchmark': 'pigment_model',
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }, f, indent=2)
+    print(f"✅ Resultados guardados en {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Prueba de carga local del servicio de recetas con el PLC simulado
+
+Levanta recipe_service.RecipeService en este mismo proceso (FakePLCManager
+como backend) y lo ataca con clientes HTTP keep-alive concurrentes:
+
+- convert: peticiones de --colors colores, con y sin micro-lotes
+- dispatch: envíos con espera de confirmación (coalescidos por el PLCManager)
+
+    python benchmarks/bench_recipe_service.py --clients 32 --requests 200
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import numpy as np
+
+from recipe_service import FakePLCManager, RecipeService
+
+async def request(reader, writer, method, path, payload=None):
+    """Petición HTTP/1.1 por una conexión abierta; devuelve (estado, json)"""
+    body = json.dumps(payload).encode() if payload is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: bench\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    length = next(int(l.split(':', 1)[1]) for l in lines if l.lower().startswith('content-length'))
+    return int(lines[0].split(' ')[1]), json.loads(await reader.readexactly(length))
+
+async def client(port, n_requests, make_payload, path, latencies, statuses):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        for i in range(n_requests):
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, 'POST', path, make_payload(i))
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+async def run_scenario(name, service, path, clients, n_requests, make_payload):
+    server = await service.start('127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    async with server:
+        await asyncio.gather(*(client(port, n_requests, make_payload, path, latencies, statuses)
+                               for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        _, metrics = await request(reader, writer, 'GET', '/metrics')
+        writer.close()
+        await writer.wait_closed()
+        await asyncio.sleep(0.01)  # Dejar que el servidor cierre sus conexiones
+
+    ms = sorted(l * 1000 for l in latencies)
+    result = {
+        'requests': len(ms),
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(ms) / elapsed, 1),
+        'p50_ms': round(statistics.median(ms), 3),
+        'p99_ms': round(ms[int(len(ms) * 0.99) - 1], 3),
+        'statuses': {str(k): v for k, v in statuses.items()},
+        'server': metrics['endpoints'].get(path, {}),
+        'batcher': metrics['batcher'],
+        'dispatch': metrics['dispatch'],
+    }
+    result['server'].pop('buckets', None)
+    print(f"  {name:22s} {result['requests_per_second']:9.1f} req/s  "
+          f"p50 {result['p50_ms']:.2f} ms  p99 {result['p99_ms']:.2f} ms")
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio de recetas")
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=200, help="Peticiones por cliente")
+    parser.add_argument('--colors', type=int, default=16, help="Colores por petición /convert")
+    parser.add_argument('--fake-latency', type=float, default=0.005)
+    parser.add_argument('-o', '--output', default=os.path.join(REPO_DIR, 'benchmarks', 'results', 'recipe_service.json'))
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    colors = rng.integers(0, 256, (1024, args.colors, 3)).tolist()
+    convert_payload = lambda i: {'rgb': colors[i % len(colors)]}
+    # Cada envío con un color distinto, para ver cuántos reemplaza la cola del PLC
+    sequence = itertools.count()
+    dispatch_payload = lambda i: {'rgb': colors[next(sequence) % len(colors)][0]}
+
+    results = {}
+    for name, window in (('convert_sin_lotes', None), ('convert_mismo_ciclo', 0.0),
+                         ('convert_ventana_2ms', 0.002)):
+        service = RecipeService(batch_window=window)
+        results[name] = asyncio.run(run_scenario(name, service, '/convert', args.clients,
+                                                 args.requests, convert_payload))
+
+    plc = FakePLCManager(latency=args.fake_latency, telemetry=False)
+    service = RecipeService(plc)
+    results['dispatch'] = asyncio.run(run_scenario('dispatch', service, '/dispatch', args.clients,
+                                                   max(1, args.requests // 10), dispatch_payload))
+    plc.close()
+    results['dispatch']['plc_writes'] = len(plc.writes)
+    print(f"  {'':22s} {results['dispatch']['requests']} envíos -> {len(plc.writes)} escrituras al PLC")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'benchmark': 'recipe_service',
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'clients': args.clients,
+            'requests_per_client': args.requests,
+            'colors_per_request': args.colors,
+            'results': results,
+        }, f, indent=2)
+    print(f"✅ Resultados guardados en {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""Costo de la interfaz por evento de arrastre de sliders (sin pantalla)
+
+Ejecuta los manejadores reales de ColorConverterApp sobre widgets simulados
+(sliders, etiquetas y lienzo que cuentan sus reconfiguraciones) y un reloj
+simulado que entrega los after() de Tk. Compara:
+
+- por_evento: el planificador con frame_ms=0, una actualización por evento
+- por_cuadro: el planificador con un cuadro de 16 ms (60 Hz)
+
+    python benchmarks/bench_ui_updates.py --rate 500 --seconds 2
+"""
+import argparse
+import heapq
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import numpy as np
+
+from Chroma import ColorConverterApp
+from conversion import SliderPreviewTable
+from ui_scheduler import UpdateScheduler
+
+class FakeRoot:
+    """Reloj simulado: after() encola, advance() ejecuta lo vencido"""
+    def __init__(self):
+        self.now = 0.0
+        self.queue = []
+        self.ids = itertools.count()
+
+    def after(self, ms, function):
+        after_id = next(self.ids)
+        heapq.heappush(self.queue, (self.now + ms / 1000, after_id, function))
+        return after_id
+
+    def after_cancel(self, after_id):
+        self.queue = [item for item in self.queue if item[1] != after_id]
+        heapq.heapify(self.queue)
+
+    def advance(self, until):
+        while self.queue and self.queue[0][0] <= until:
+            self.now, _, function = heapq.heappop(self.queue)
+            function()
+        self.now = until
+
+class FakeWidget:
+    def __init__(self, counter):
+        self.counter = counter
+
+    def config(self, **options):
+        self.counter['config'] += 1
+
+    def coords(self, *args):
+        self.counter['coords'] += 1
+
+class FakeScale(FakeWidget):
+    """Como tk.Scale: set() dispara el callback en el próximo ciclo ocioso"""
+    names = itertools.count()
+
+    def __init__(self, counter, root, command, value=0):
+        super().__init__(counter)
+        self.root = root
+        self.command = command
+        self.value = value
+        self.name = f".scale{next(self.names)}"
+
+    def __str__(self):
+        return self.name
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        value = int(round(float(value)))
+        if value != self.value:
+            self.value = value
+            self.counter['scale_set'] += 1
+            self.root.after(0, lambda: self.command(str(value)))
+
+    def drag(self, value):
+        self.value = value
+        self.command(str(value))
+
+def make_app(frame_ms, counter):
+    app = ColorConverterApp.__new__(ColorConverterApp)
+    root = FakeRoot()
+    app.root = root
+    app.config = {}
+    app.scheduler = UpdateScheduler(root, frame_ms)
+    app.scale_echoes = {}
+    app.hue_marker_coords = None
+    app.hue_size = 200
+    app.hue_marker = 1
+    app.hue_circle = FakeWidget(counter)
+    app.cmykw_converter = None
+    app.preview_table = SliderPreviewTable()
+    app.sliders = {
+        letter: {'slider': FakeScale(counter, root, lambda v, l=letter: app.on_slider_change(l, v)),
+                 'label': FakeWidget(counter)}
+        for letter in 'CMYKW'
+    }
+    app.hsl_sliders = {
+        letter: {'slider': FakeScale(counter, root, lambda v, l=letter: app.on_hsl_change(l, v)),
+                 'label': FakeWidget(counter)}
+        for letter in 'HSL'
+    }
+    app.draw_hue_circle = lambda lightness=None: counter.__setitem__('wheel', counter['wheel'] + 1)
+    for name in ('rgb_label', 'cmykw_label', 'hsl_label', 'color_preview'):
+        setattr(app, name, FakeWidget(counter))
+    return app, root
+
+def run(mode, frame_ms, rate, seconds):
+    counter = {'config': 0, 'coords': 0, 'scale_set': 0, 'wheel': 0}
+    app, root = make_app(frame_ms, counter)
+    rng = np.random.default_rng(0)
+    events = int(rate * seconds)
+    # Arrastre alternando un slider CMYKW y el de matiz, con pasos pequeños
+    c_values = np.clip(np.cumsum(rng.integers(-2, 3, events)) + 50, 0, 100)
+    h_values = np.clip(np.cumsum(rng.integers(-3, 4, events)) + 180, 0, 360)
+    start = time.perf_counter()
+    for i in range(events):
+        if (i // 50) % 2 == 0:
+            app.sliders['C']['slider'].drag(int(c_values[i]))
+        else:
+            app.hsl_sliders['H']['slider'].drag(int(h_values[i]))
+        root.advance((i + 1) / rate)
+    root.advance(events / rate + 1.0)
+    elapsed = time.perf_counter() - start
+    report = app.scheduler.report()
+    result = {
+        'events': events,
+        'us_per_event': round(elapsed / events * 1e6, 1),
+        'frames': report['frames'],
+        'color_updates': report['keys'].get('color', {}).get('runs', 0),
+        'widget_configs': counter['config'],
+        'widget_skips': report['widget_skips'],
+        'marker_moves': counter['coords'],
+        'scale_sets': counter['scale_set'],
+        'color_mean_ms': report['keys'].get('color', {}).get('mean_ms', 0.0),
+    }
+    print(f"  {mode:10s} " + "  ".join(f"{key} {value}" for key, value in result.items()))
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Medir el costo de la interfaz por evento de slider")
+    parser.add_argument('--rate', type=float, default=500, help="Eventos de arrastre por segundo")
+    parser.add_argument('--seconds', type=float, default=2.0)
+    parser.add_argument('-o', '--output', default=os.path.join(REPO_DIR, 'benchmarks', 'results', 'ui_updates.json'))
+    args = parser.parse_args(argv)
+
+    results = {
+        'por_evento': run('por_evento', 0, args.rate, args.seconds),
+        'por_cuadro': run('por_cuadro', 16, args.rate, args.seconds),
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'benchmark': 'ui_updates',
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'rate': args.rate,
+            'results': results,
+        }, f, indent=2)
+    print(f"✅ Resultados guardados en {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
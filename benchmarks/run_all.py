@@ -0,0 +1,126 @@
+"""Ejecutar los benchmarks y comparar con una corrida anterior
+
+Cada benchmarks/bench_<nombre>.py corre en un intérprete nuevo y guarda
+<nombre>.json en --dir. Con --baseline se comparan las métricas de tiempo
+(las claves con 'ms', 'us' o 's' como parte del nombre, p. ej. p95_ms o
+us_per_event) contra los JSON de otra carpeta; un aumento mayor que
+--threshold cuenta como regresión y el proceso termina con código 1. Los
+máximos (max_ms, worst...) dependen de un solo caso y no se comparan.
+
+    python benchmarks/run_all.py --dir benchmarks/results/v1
+    python benchmarks/run_all.py --dir benchmarks/results/v2 --baseline benchmarks/results/v1
+    python benchmarks/run_all.py palette hot_paths --no-run --dir ... --baseline ...
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(REPO_DIR, 'benchmarks')
+TIME_UNITS = {'ms', 'us', 's'}
+NOISY = {'max', 'worst'}
+
+def discover():
+    """Nombre → ruta de cada script bench_<nombre>.py"""
+    paths = sorted(glob.glob(os.path.join(BENCH_DIR, 'bench_*.py')))
+    return {os.path.basename(path)[len('bench_'):-len('.py')]: path for path in paths}
+
+def run(name, path, output_dir):
+    """Correr un benchmark; devuelve (código de salida, segundos)"""
+    print(f"📊 {name}")
+    start = time.perf_counter()
+    code = subprocess.call([sys.executable, path, '-o', os.path.join(output_dir, f"{name}.json")],
+                           cwd=REPO_DIR)
+    return code, time.perf_counter() - start
+
+def timing_metrics(results, prefix=''):
+    """Métricas de tiempo anidadas como {'a.b.p95_ms': valor}"""
+    metrics = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            metrics.update(timing_metrics(value, name + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) \
+                and TIME_UNITS & set(str(key).split('_')) and not NOISY & set(str(key).split('_')):
+            metrics[name] = value
+    return metrics
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f).get('results', {})
+
+def compare(names, output_dir, baseline_dir, threshold):
+    """Comparar cada <nombre>.json con el de la línea base
+
+    Devuelve (regresiones, cantidad de métricas comparadas).
+    """
+    regressions = []
+    compared = 0
+    for name in names:
+        new_path = os.path.join(output_dir, f"{name}.json")
+        old_path = os.path.join(baseline_dir, f"{name}.json")
+        missing = [path for path in (new_path, old_path) if not os.path.exists(path)]
+        if missing:
+            print(f"⚠️ {name}: falta {', '.join(missing)}")
+            continue
+        new = timing_metrics(load_results(new_path))
+        old = timing_metrics(load_results(old_path))
+        for metric in sorted(new.keys() & old.keys()):
+            if old[metric] <= 0:
+                continue
+            compared += 1
+            change = new[metric] / old[metric] - 1
+            status = "⚠️" if change > threshold else "  "
+            print(f"{status} {name}.{metric:48s} {old[metric]:>12} → {new[metric]:<12} {change:+.0%}")
+            if change > threshold:
+                regressions.append({'benchmark': name, 'metric': metric, 'baseline': old[metric],
+                                    'value': new[metric], 'change': round(change, 4)})
+    return regressions, compared
+
+def main(argv=None):
+    benchmarks = discover()
+    parser = argparse.ArgumentParser(description="Ejecutar los benchmarks y detectar regresiones")
+    parser.add_argument('names', nargs='*', default=list(benchmarks),
+                        help=f"Benchmarks a ejecutar ({', '.join(benchmarks)})")
+    parser.add_argument('--dir', default=os.path.join(BENCH_DIR, 'results'), help="Carpeta de resultados")
+    parser.add_argument('--baseline', help="Carpeta de resultados de la versión anterior")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Aumento tolerado (0.25 = 25%%)")
+    parser.add_argument('--no-run', action='store_true', help="Solo comparar resultados existentes")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.names if name not in benchmarks]
+    if unknown:
+        parser.error(f"Benchmarks desconocidos: {', '.join(unknown)}")
+    os.makedirs(args.dir, exist_ok=True)
+
+    failed = []
+    if not args.no_run:
+        for name in args.names:
+            code, elapsed = run(name, benchmarks[name], args.dir)
+            if code != 0:
+                failed.append(name)
+                print(f"🛑 {name} terminó con código {code}")
+            else:
+                print(f"✅ {name} en {elapsed:.1f} s")
+
+    if args.baseline:
+        regressions, compared = compare(args.names, args.dir, args.baseline, args.threshold)
+        with open(os.path.join(args.dir, 'comparison.json'), 'w') as f:
+            json.dump({
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'baseline': os.path.abspath(args.baseline),
+                'threshold': args.threshold,
+                'regressions': regressions,
+            }, f, indent=2)
+        if regressions:
+            print(f"⚠️ {len(regressions)} métricas empeoraron más de {args.threshold:.0%}")
+            return 1
+        print(f"✅ Sin regresiones en {compared} métricas")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Diferencia de color perceptual: CIELAB y ΔE76 / ΔE94 / ΔE2000
+
+Todas las funciones son vectorizadas: reciben arreglos (..., 3) y devuelven
+(...,), así el control de calidad de un lote de fotos compara millones de
+pares en una sola llamada. Iluminante D65, observador 2°.
+"""
+import numpy as np
+
+from conversion import srgb_to_linear
+
+# sRGB lineal → XYZ (D65)
+RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+WHITE_D65 = np.array([0.95047, 1.0, 1.08883])
+
+_LAB_EPSILON = (6 / 29) ** 3
+_LAB_KAPPA = 1 / (3 * (6 / 29) ** 2)
+
+# Constantes de CIEDE2000 (ángulos en radianes)
+_TAU = 2 * np.pi
+_25_POW_7 = 25.0 ** 7
+_DEG_6, _DEG_25, _DEG_30, _DEG_60, _DEG_63, _DEG_275 = np.radians([6, 25, 30, 60, 63, 275])
+
+def rgb_to_xyz_array(rgb):
+    """sRGB 0–255 (..., 3) a XYZ (..., 3), Y del blanco = 1"""
+    return srgb_to_linear(rgb) @ RGB_TO_XYZ.T
+
+def xyz_to_lab_array(xyz, white=WHITE_D65):
+    """XYZ (..., 3) a CIELAB (..., 3)"""
+    t = np.asarray(xyz, dtype=np.float64) / white
+    f = np.where(t > _LAB_EPSILON, np.cbrt(t), t * _LAB_KAPPA + 4 / 29)
+    lab = np.empty_like(f)
+    lab[..., 0] = 116 * f[..., 1] - 16
+    lab[..., 1] = 500 * (f[..., 0] - f[..., 1])
+    lab[..., 2] = 200 * (f[..., 1] - f[..., 2])
+    return lab
+
+def rgb_to_lab_array(rgb):
+    """sRGB 0–255 (..., 3) a CIELAB (..., 3)"""
+    return xyz_to_lab_array(rgb_to_xyz_array(rgb))
+
+def rgb_to_lab(r, g, b):
+    """Convierte un color RGB a (L, a, b)"""
+    return tuple(float(v) for v in rgb_to_lab_array((r, g, b)))
+
+def delta_e76(lab1, lab2):
+    """ΔE*ab (CIE76): distancia euclídea en Lab"""
+    diff = np.asarray(lab1, dtype=np.float64) - lab2
+    return np.sqrt((diff * diff).sum(axis=-1))
+
+def delta_e94(lab1, lab2, textiles=False):
+    """ΔE*94 (CIE94), con las constantes de artes gráficas o de textiles"""
+    kL, K1, K2 = (2.0, 0.048, 0.014) if textiles else (1.0, 0.045, 0.015)
+    lab1 = np.asarray(lab1, dtype=np.float64)
+    lab2 = np.asarray(lab2, dtype=np.float64)
+    dL = lab1[..., 0] - lab2[..., 0]
+    C1 = np.hypot(lab1[..., 1], lab1[..., 2])
+    C2 = np.hypot(lab2[..., 1], lab2[..., 2])
+    dC = C1 - C2
+    da = lab1[..., 1] - lab2[..., 1]
+    db = lab1[..., 2] - lab2[..., 2]
+    dH2 = np.maximum(da * da + db * db - dC * dC, 0.0)
+    SC = 1 + K1 * C1
+    SH = 1 + K2 * C1
+    return np.sqrt((dL / kL) ** 2 + (dC / SC) ** 2 + dH2 / (SH * SH))
+
+def delta_e2000(lab1, lab2, kL=1.0, kC=1.0, kH=1.0):
+    """ΔE00 (CIEDE2000), según Sharma, Wu y Dalal (2005)"""
+    lab1, lab2 = np.broadcast_arrays(np.asarray(lab1, dtype=np.float64), np.asarray(lab2, dtype=np.float64))
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    # Corrección de a* para colores poco saturados
+    C_mean = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    C7 = C_mean ** 7
+    G = 0.5 * (1 - np.sqrt(C7 / (C7 + _25_POW_7)))
+    a1p = (1 + G) * a1
+    a2p = (1 + G) * a2
+    C1p = np.hypot(a1p, b1)
+    C2p = np.hypot(a2p, b2)
+    # Ángulos en radianes en [0, 2π)
+    h1p = np.arctan2(b1, a1p) % _TAU
+    h2p = np.arctan2(b2, a2p) % _TAU
+
+    dLp = L2 - L1
+    dCp = C2p - C1p
+    chroma_zero = (C1p * C2p) == 0
+    dhp = h2p - h1p
+    dhp = np.where(chroma_zero, 0.0, dhp - _TAU * (dhp > np.pi) + _TAU * (dhp < -np.pi))
+    dHp = 2 * np.sqrt(C1p * C2p) * np.sin(dhp / 2)
+
+    Lp_mean = (L1 + L2) / 2
+    Cp_mean = (C1p + C2p) / 2
+    h_sum = h1p + h2p
+    wrap = (np.abs(h1p - h2p) > np.pi) & ~chroma_zero
+    hp_mean = np.where(chroma_zero, h_sum, (h_sum + _TAU * wrap * np.where(h_sum < _TAU, 1, -1)) / 2)
+
+    T = (1 - 0.17 * np.cos(hp_mean - _DEG_30)
+         + 0.24 * np.cos(2 * hp_mean)
+         + 0.32 * np.cos(3 * hp_mean + _DEG_6)
+         - 0.20 * np.cos(4 * hp_mean - _DEG_63))
+    L50 = (Lp_mean - 50) ** 2
+    SL = 1 + 0.015 * L50 / np.sqrt(20 + L50)
+    SC = 1 + 0.045 * Cp_mean
+    SH = 1 + 0.015 * Cp_mean * T
+    Cp7 = Cp_mean ** 7
+    RT = (-2 * np.sqrt(Cp7 / (Cp7 + _25_POW_7))
+          * np.sin(_DEG_60 * np.exp(-(((hp_mean - _DEG_275) / _DEG_25) ** 2))))
+
+    tL = dLp / (kL * SL)
+    tC = dCp / (kC * SC)
+    tH = dHp / (kH * SH)
+    return np.sqrt(tL * tL + tC * tC + tH * tH + RT * tC * tH)
+
+DELTA_E_METHODS = {'76': delta_e76, '94': delta_e94, '2000': delta_e2000}
+
+def delta_e_rgb(rgb1, rgb2, method='2000'):
+    """ΔE entre colores sRGB (..., 3) con el método '76', '94' o '2000'"""
+    if method not in DELTA_E_METHODS:
+        raise ValueError(f"Método ΔE no válido: {method}")
+    return DELTA_E_METHODS[method](rgb_to_lab_array(rgb1), rgb_to_lab_array(rgb2))
@@ -0,0 +1,208 @@
+"""Índice de búsqueda del color conocido más cercano (espacio CIELAB)
+
+Reúne colores con nombre, paletas y recetas pasadas en un árbol KD sobre Lab:
+la distancia euclídea en Lab es ΔE76, y los candidatos más cercanos se
+reordenan con ΔE2000. Las inserciones van a un búfer que se recorre por
+fuerza bruta hasta que crece lo suficiente para reconstruir el árbol. Los
+duplicados se detectan con un diccionario RGB → posición, en O(1).
+
+Usa scipy.spatial.cKDTree si está instalado y un árbol KD propio en NumPy
+si no.
+"""
+from collections import namedtuple
+from importlib.util import find_spec
+
+import numpy as np
+
+from color_difference import rgb_to_lab_array, delta_e2000
+
+SCIPY_AVAILABLE = find_spec('scipy') is not None
+
+ColorMatch = namedtuple('ColorMatch', ['name', 'rgb', 'cmykw', 'source', 'delta_e'])
+
+class KDTree:
+    """Árbol KD estático sobre puntos (N, 3), con hojas de LEAF_SIZE puntos
+
+    Los nodos viven en arreglos planos; la búsqueda recorre el árbol con una
+    pila y calcula las distancias de cada hoja de forma vectorizada.
+    """
+    LEAF_SIZE = 32
+
+    def __init__(self, points):
+        self.points = np.asarray(points, dtype=np.float64)
+        self.order = np.arange(len(self.points))
+        self.dims, self.splits, self.bounds, self.children = [], [], [], []
+        # (padre, lado, inicio, fin): los hijos se enlazan al crearlos
+        stack = [(-1, 0, 0, len(self.points))]
+        while stack:
+            parent, side, start, end = stack.pop()
+            node = len(self.dims)
+            if parent >= 0:
+                self.children[parent][side] = node
+            self.bounds.append((start, end))
+            self.children.append([-1, -1])
+            if end - start <= self.LEAF_SIZE:
+                self.dims.append(-1)
+                self.splits.append(0.0)
+                continue
+            # Partir por la mediana de la dimensión más extendida
+            idx = self.order[start:end]
+            block = self.points[idx]
+            dim = int(np.argmax(block.max(axis=0) - block.min(axis=0)))
+            mid = (start + end) // 2
+            self.order[start:end] = idx[np.argpartition(block[:, dim], mid - start)]
+            self.dims.append(dim)
+            self.splits.append(float(self.points[self.order[mid], dim]))
+            stack.append((node, 1, mid, end))
+            stack.append((node, 0, start, mid))
+
+    def query(self, point, k=1):
+        """(distancias, índices) de los k puntos más cercanos, ordenados"""
+        point = np.asarray(point, dtype=np.float64)
+        k = min(k, len(self.points))
+        best_d = np.full(k, np.inf)
+        best_i = np.full(k, -1)
+        stack = [(0, 0.0)]
+        while stack:
+            node, plane = stack.pop()
+            if plane >= best_d[-1]:
+                continue
+            dim = self.dims[node]
+            if dim < 0:
+                start, end = self.bounds[node]
+                idx = self.order[start:end]
+                diff = self.points[idx] - point
+                d = np.einsum('ij,ij->i', diff, diff)
+                if d.min() >= best_d[-1]:
+                    continue
+                all_d = np.concatenate([best_d, d])
+                all_i = np.concatenate([best_i, idx])
+                keep = np.argsort(all_d, kind='stable')[:k]
+                best_d, best_i = all_d[keep], all_i[keep]
+                continue
+            diff = point[dim] - self.splits[node]
+            left, right = self.children[node]
+            near, far = (left, right) if diff < 0 else (right, left)
+            stack.append((far, diff * diff))
+            stack.append((near, plane))
+        return np.sqrt(best_d), best_i
+
+def build_tree(points, use_scipy=None):
+    """Árbol KD sobre puntos (N, 3): cKDTree de scipy si está disponible"""
+    if use_scipy is None:
+        use_scipy = SCIPY_AVAILABLE
+    if use_scipy:
+        from scipy.spatial import cKDTree
+        return cKDTree(points)
+    return KDTree(points)
+
+class ColorIndex:
+    """Colores conocidos (nombre, RGB, receta CMYKW, origen) indexados en Lab"""
+    # El búfer de inserciones se integra al árbol al superar esta fracción
+    REBUILD_RATIO = 0.1
+    REBUILD_MIN = 256
+    # Candidatos por ΔE76 que se reordenan con ΔE2000
+    CANDIDATES = 8
+
+    def __init__(self, use_scipy=None):
+        self.use_scipy = use_scipy
+        self._lab = np.empty((1024, 3))  # Capacidad que se duplica al llenarse
+        self.names = []
+        self.rgbs = []
+        self.recipes = []
+        self.sources = []
+        self.positions = {}  # (r, g, b) → posición
+        self.tree = None
+        self.tree_size = 0
+
+    @property
+    def lab(self):
+        """Coordenadas Lab (N, 3) de los colores indexados"""
+        return self._lab[:len(self.rgbs)]
+
+    def __len__(self):
+        return len(self.rgbs)
+
+    def __contains__(self, rgb):
+        return tuple(int(v) for v in rgb) in self.positions
+
+    def add(self, rgb, cmykw=None, name=None, source='history'):
+        """Agregar un color; devuelve False si ese RGB ya estaba indexado"""
+        return self.add_many([rgb], [cmykw], [name], source) == 1
+
+    def add_many(self, rgbs, cmykws=None, names=None, source='history'):
+        """Agregar colores en bloque (conversión a Lab vectorizada)
+
+        Devuelve cuántos colores eran nuevos.
+        """
+        rgbs = [tuple(rgb) for rgb in np.asarray(rgbs, dtype=np.int64).reshape(-1, 3).tolist()]
+        cmykws = cmykws if cmykws is not None else [None] * len(rgbs)
+        names = names if names is not None else [None] * len(rgbs)
+        new = []
+        for rgb, cmykw, name in zip(rgbs, cmykws, names):
+            if rgb in self.positions:
+                continue
+            self.positions[rgb] = len(self.rgbs)
+            self.rgbs.append(rgb)
+            self.recipes.append(tuple(cmykw) if cmykw is not None else None)
+            self.names.append(name)
+            self.sources.append(source)
+            new.append(rgb)
+        if new:
+            end = len(self.rgbs)
+            if end > len(self._lab):
+                grown = np.empty((max(end, 2 * len(self._lab)), 3))
+                grown[:end - len(new)] = self._lab[:end - len(new)]
+                self._lab = grown
+            self._lab[end - len(new):end] = rgb_to_lab_array(np.array(new, dtype=np.uint8))
+            pending = len(self.rgbs) - self.tree_size
+            if pending > max(self.REBUILD_MIN, self.REBUILD_RATIO * self.tree_size):
+                self.rebuild()
+        return len(new)
+
+    def rebuild(self):
+        """Reconstruir el árbol con todos los colores, vaciando el búfer"""
+        if len(self.rgbs):
+            self.tree = build_tree(self.lab, self.use_scipy)
+            self.tree_size = len(self.rgbs)
+
+    def get(self, rgb):
+        """Entrada exacta de un RGB (delta_e = 0) o None, en O(1)"""
+        position = self.positions.get(tuple(int(v) for v in rgb))
+        if position is None:
+            return None
+        return self._match(position, 0.0)
+
+    def _match(self, position, delta_e):
+        return ColorMatch(self.names[position], self.rgbs[position], self.recipes[position],
+                          self.sources[position], delta_e)
+
+    def nearest(self, rgb, k=1, exclude_exact=False):
+        """Los k colores indexados más cercanos a rgb, ordenados por ΔE2000
+
+        Se toman los CANDIDATES más cercanos por ΔE76 (árbol + búfer) y se
+        reordenan con ΔE2000; con exclude_exact se omite el propio color.
+        """
+        if not self.rgbs:
+            return []
+        lab = rgb_to_lab_array(np.asarray(rgb, dtype=np.uint8))
+        n = max(k, self.CANDIDATES) + bool(exclude_exact)
+        candidates = []
+        if self.tree is not None:
+            _, idx = self.tree.query(lab, k=min(n, self.tree_size))
+            candidates.extend(int(i) for i in np.atleast_1d(idx) if 0 <= i < self.tree_size)
+        if self.tree_size < len(self.rgbs):
+            # Búfer de inserciones: fuerza bruta vectorizada
+            diff = self.lab[self.tree_size:] - lab
+            d = np.einsum('ij,ij->i', diff, diff)
+            closest = np.argsort(d)[:n] if len(d) > n else np.arange(len(d))
+            candidates.extend(int(i) + self.tree_size for i in closest)
+        if exclude_exact:
+            exact = self.positions.get(tuple(int(v) for v in rgb))
+            candidates = [i for i in candidates if i != exact]
+        if not candidates:
+            return []
+        candidates = np.array(candidates)
+        delta_e = delta_e2000(self.lab[candidates], lab)
+        best = np.argsort(delta_e, kind='stable')[:k]
+        return [self._match(int(candidates[i]), float(delta_e[i])) for i in best]
@@ -0,0 +1,167 @@
+"""Distribución de color de una imagen: histograma 3D y paleta dominante
+
+El análisis trabaja sobre una submuestra en rejilla (un píxel de cada
+`step` x `step`), así el costo no depende del tamaño de la imagen: una foto
+de 12 MP y un frame de la cámara cuestan lo mismo. La rejilla es una vista
+con pasos del arreglo original, también si está mapeado en memoria.
+
+- color_histogram: conteos por celda en RGB o Lab con un solo np.bincount
+- median_cut: corta cajas de un histograma RGB de 5 bits por canal, siempre
+  la de más error y por el punto que menos error deja
+- extract_palette: median-cut como punto de partida y k-means por minilotes
+  para afinar los centros; devuelve los N colores con su proporción de
+  píxeles y su receta CMYKW
+
+Solo necesita NumPy; no depende de Tk.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from color_difference import rgb_to_lab_array
+from conversion import rgb_to_cmykw_array
+
+PaletteColor = namedtuple('PaletteColor', ['rgb', 'share', 'cmykw'])
+
+MAX_PIXELS = 65536
+CUT_BITS = 5  # Bits por canal del histograma que recorre median-cut
+PALETTE_METHODS = ('kmeans', 'median_cut')
+
+# Rango de cada canal Lab para el histograma (L, a, b)
+LAB_RANGES = np.array([[0.0, 100.0], [-128.0, 128.0], [-128.0, 128.0]])
+
+def subsample_pixels(image, max_pixels=MAX_PIXELS):
+    """Píxeles (N, 3) uint8 de una rejilla regular con N ≤ max_pixels aprox."""
+    image = np.asarray(image)
+    height, width = image.shape[:2]
+    step = max(1, int(np.ceil(np.sqrt(height * width / max_pixels))))
+    return np.ascontiguousarray(image[::step, ::step, :3]).reshape(-1, 3)
+
+def color_histogram(pixels, bins=16, space='rgb'):
+    """Histograma 3D (bins, bins, bins) de píxeles (N, 3) RGB uint8
+
+    En 'lab' las celdas cubren L 0–100 y a, b −128–128.
+    """
+    pixels = np.asarray(pixels).reshape(-1, 3)
+    if space == 'rgb':
+        cells = pixels.astype(np.intp) * bins >> 8
+    elif space == 'lab':
+        lab = rgb_to_lab_array(pixels)
+        low, high = LAB_RANGES[:, 0], LAB_RANGES[:, 1]
+        cells = np.clip(((lab - low) / (high - low) * bins).astype(np.intp), 0, bins - 1)
+    else:
+        raise ValueError(f"Espacio de color no válido: {space}")
+    flat = (cells[:, 0] * bins + cells[:, 1]) * bins + cells[:, 2]
+    return np.bincount(flat, minlength=bins ** 3).reshape(bins, bins, bins)
+
+def binned_colors(pixels, bits=CUT_BITS):
+    """Celdas no vacías de un histograma RGB: (color medio (M, 3), conteos (M,))"""
+    pixels = np.asarray(pixels).reshape(-1, 3)
+    cells = pixels.astype(np.intp) >> (8 - bits)
+    flat = (cells[:, 0] << 2 * bits) | (cells[:, 1] << bits) | cells[:, 2]
+    size = 1 << 3 * bits
+    counts = np.bincount(flat, minlength=size)
+    used = np.flatnonzero(counts)
+    sums = np.stack([np.bincount(flat, weights=pixels[:, c], minlength=size)[used]
+                     for c in range(3)], axis=1)
+    counts = counts[used]
+    return sums / counts[:, None], counts
+
+def box_error(colors, counts, box):
+    """Suma ponderada de errores cuadráticos de una caja frente a su media"""
+    values, weights = colors[box], counts[box]
+    mean = (values * weights[:, None]).sum(axis=0) / weights.sum()
+    return float((((values - mean) ** 2).sum(axis=1) * weights).sum())
+
+def split_box(colors, counts, box):
+    """Cortar la caja en su canal de mayor rango, donde menos error deja"""
+    values = colors[box]
+    channel = int((values.max(axis=0) - values.min(axis=0)).argmax())
+    order = box[np.argsort(values[:, channel], kind='stable')]
+    weights = counts[order].astype(np.float64)
+    v = colors[order]
+    # Error de cada lado para todos los cortes posibles, con sumas acumuladas
+    w = np.cumsum(weights)[:-1]
+    s = np.cumsum(v * weights[:, None], axis=0)[:-1]
+    q = np.cumsum((v ** 2).sum(axis=1) * weights)[:-1]
+    w_total = weights.sum()
+    s_total = (v * weights[:, None]).sum(axis=0)
+    q_total = ((v ** 2).sum(axis=1) * weights).sum()
+    left = q - (s ** 2).sum(axis=1) / w
+    right = (q_total - q) - ((s_total - s) ** 2).sum(axis=1) / (w_total - w)
+    cut = int((left + right).argmin()) + 1
+    return order[:cut], order[cut:]
+
+def median_cut(colors, counts, n):
+    """Partir las celdas en ≤ n cajas; devuelve (centros (n, 3), conteos (n,))
+
+    Variante de median-cut: se corta la caja con más error cuadrático, en el
+    punto de su canal de mayor rango que minimiza el error de ambas mitades
+    (la mediana partiría en dos un color grande y uniforme).
+    """
+    boxes = [np.arange(len(colors))]
+    errors = [box_error(colors, counts, boxes[0])]
+    while len(boxes) < n and max(errors) > 0:
+        index = int(np.argmax(errors))
+        box = boxes.pop(index)
+        errors.pop(index)
+        for half in split_box(colors, counts, box):
+            boxes.append(half)
+            errors.append(box_error(colors, counts, half))
+    box_counts = np.array([counts[box].sum() for box in boxes])
+    centers = np.array([(colors[box] * counts[box, None]).sum(axis=0) / counts[box].sum()
+                        for box in boxes])
+    return centers, box_counts
+
+def assign(pixels, centers):
+    """Índice del centro más cercano (distancia euclídea en RGB) de cada píxel"""
+    # |p - c|² = |p|² - 2 p·c + |c|²; |p|² no cambia el argmin
+    distances = (centers ** 2).sum(axis=1) - 2.0 * (pixels @ centers.T)
+    return distances.argmin(axis=1)
+
+def minibatch_kmeans(pixels, centers, batch_size=2048, iterations=20, seed=0):
+    """Afinar centros (k, 3) con k-means por minilotes (tasa 1/conteo por centro)"""
+    pixels = np.asarray(pixels, dtype=np.float64)
+    centers = np.array(centers, dtype=np.float64)
+    k = len(centers)
+    seen = np.zeros(k)
+    rng = np.random.default_rng(seed)
+    for _ in range(iterations):
+        batch = pixels[rng.integers(0, len(pixels), min(batch_size, len(pixels)))]
+        labels = assign(batch, centers)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.stack([np.bincount(labels, weights=batch[:, c], minlength=k)
+                         for c in range(3)], axis=1)
+        seen += counts
+        filled = counts > 0
+        # Media móvil: cada centro se mueve hacia la media de su lote
+        rate = counts[filled] / seen[filled]
+        centers[filled] += rate[:, None] * (sums[filled] / counts[filled, None] - centers[filled])
+    return centers
+
+def extract_palette(image, n=6, method='kmeans', max_pixels=MAX_PIXELS, recipe=None, seed=0):
+    """Los n colores dominantes de una imagen (alto, ancho, 3) RGB
+
+    Devuelve [PaletteColor] ordenados por proporción de píxeles. `recipe`
+    convierte un arreglo RGB (n, 3) en recetas CMYKW (n, 5); por omisión,
+    la conversión analítica.
+    """
+    if method not in PALETTE_METHODS:
+        raise ValueError(f"Método de paleta no válido: {method}")
+    pixels = subsample_pixels(image, max_pixels)
+    if len(pixels) == 0:
+        return []
+    colors, counts = binned_colors(pixels)
+    centers, shares = median_cut(colors, counts, n)
+    if method == 'kmeans' and len(centers) > 1:
+        samples = pixels.astype(np.float64)
+        centers = minibatch_kmeans(samples, centers, seed=seed)
+        shares = np.bincount(assign(samples, centers), minlength=len(centers))
+
+    order = [i for i in np.argsort(-shares, kind='stable') if shares[i] > 0]
+    rgbs = np.clip(np.round(centers[order]), 0, 255).astype(np.uint8)
+    recipes = (recipe or rgb_to_cmykw_array)(rgbs)
+    total = shares.sum()
+    return [PaletteColor(tuple(int(v) for v in rgb), float(shares[i] / total),
+                         tuple(int(v) for v in cmykw))
+            for i, rgb, cmykw in zip(order, rgbs, recipes)]
@@ -0,0 +1,471 @@
+"""Motor de conversión de color: RGB, HSL y CMYKW
+
+Kernels vectorizados con NumPy, tablas precalculadas con caché en disco y el
+círculo cromático. Solo depende de NumPy; PIL se importa al cachear el
+círculo como PNG.
+"""
+import json
+import os
+import time
+from math import pi
+
+import numpy as np
+
+# ---------- FUNCIONES DE CONVERSIÓN ----------
+# Kernels vectorizados: operan sobre arreglos (..., 3) o (..., 5) con las
+# mismas operaciones en float64 que la versión escalar, de modo que el
+# redondeo (round-half-even) y los casos especiales coinciden exactamente.
+
+def rgb_to_cmykw_array(rgb):
+    """Convierte un arreglo RGB (..., 3) a CMYKW (..., 5) uint8"""
+    rgb = np.asarray(rgb)
+    r = rgb[..., 0].astype(np.float64)
+    g = rgb[..., 1].astype(np.float64)
+    b = rgb[..., 2].astype(np.float64)
+
+    c = 1 - r / 255
+    m = 1 - g / 255
+    y = 1 - b / 255
+    k = np.minimum(np.minimum(c, m), y)
+
+    # Evitar división por cero donde k == 1 (negro puro)
+    chroma = k < 1
+    denom = np.where(chroma, 1 - k, 1.0)
+    c = np.where(chroma, (c - k) / denom, 0.0)
+    m = np.where(chroma, (m - k) / denom, 0.0)
+    y = np.where(chroma, (y - k) / denom, 0.0)
+
+    out = np.empty(rgb.shape[:-1] + (5,), dtype=np.uint8)
+    out[..., 0] = np.round(c * 100)
+    out[..., 1] = np.round(m * 100)
+    out[..., 2] = np.round(y * 100)
+    out[..., 3] = np.round(k * 100)
+    out[..., 4] = 0
+
+    # Solo blanco
+    white = (r == 255) & (g == 255) & (b == 255)
+    out[white] = (0, 0, 0, 0, 100)
+    return out
+
+def cmykw_to_rgb_array(cmykw):
+    """Convierte un arreglo CMYKW (..., 5) a RGB (..., 3) uint8"""
+    cmykw = np.asarray(cmykw, dtype=np.float64)
+    c = cmykw[..., 0] / 100
+    m = cmykw[..., 1] / 100
+    y = cmykw[..., 2] / 100
+    k = cmykw[..., 3] / 100
+
+    out = np.empty(cmykw.shape[:-1] + (3,), dtype=np.uint8)
+    out[..., 0] = np.clip(np.round(255 * (1 - c) * (1 - k)), 0, 255)
+    out[..., 1] = np.clip(np.round(255 * (1 - m) * (1 - k)), 0, 255)
+    out[..., 2] = np.clip(np.round(255 * (1 - y) * (1 - k)), 0, 255)
+
+    out[cmykw[..., 4] > 0] = 255
+    return out
+
+def rgb_to_hsl_array(rgb):
+    """Convierte un arreglo RGB (..., 3) a HSL (..., 3) float64"""
+    rgb = np.asarray(rgb)
+    r = rgb[..., 0] / 255.0
+    g = rgb[..., 1] / 255.0
+    b = rgb[..., 2] / 255.0
+    max_val = np.maximum(np.maximum(r, g), b)
+    min_val = np.minimum(np.minimum(r, g), b)
+
+    # Luminosidad
+    l = (max_val + min_val) / 2.0
+
+    gray = max_val == min_val
+    delta = np.where(gray, 1.0, max_val - min_val)
+
+    # Saturación
+    s_low = delta / np.where(gray, 1.0, max_val + min_val)
+    s_high = delta / np.where(gray, 1.0, 2.0 - max_val - min_val)
+    s = np.where(gray, 0.0, np.where(l <= 0.5, s_low, s_high))
+
+    # Matiz (mismo orden de prioridad que la versión escalar: R, G, B)
+    h = np.select(
+        [max_val == r, max_val == g],
+        [(g - b) / delta + np.where(g < b, 6.0, 0.0),
+         (b - r) / delta + 2.0],
+        (r - g) / delta + 4.0
+    )
+    h = np.where(gray, 0.0, h / 6.0)
+
+    out = np.empty(rgb.shape[:-1] + (3,), dtype=np.float64)
+    out[..., 0] = h * 360
+    out[..., 1] = s * 100
+    out[..., 2] = l * 100
+    return out
+
+def _hue_to_rgb_array(p, q, t):
+    """Versión vectorizada de hue_to_rgb"""
+    t = np.where(t < 0, t + 1, t)
+    t = np.where(t > 1, t - 1, t)
+    return np.select(
+        [t < 1/6, t < 1/2, t < 2/3],
+        [p + (q - p) * 6 * t, q, p + (q - p) * (2/3 - t) * 6],
+        p
+    )
+
+def hsl_to_rgb_array(hsl):
+    """Convierte un arreglo HSL (..., 3) a RGB (..., 3) uint8"""
+    hsl = np.asarray(hsl, dtype=np.float64)
+    h = hsl[..., 0] / 360.0
+    s = hsl[..., 1] / 100.0
+    l = hsl[..., 2] / 100.0
+
+    q = np.where(l < 0.5, l * (1 + s), l + s - l * s)
+    p = 2 * l - q
+
+    gray = s == 0
+    r = np.where(gray, l, _hue_to_rgb_array(p, q, h + 1/3))
+    g = np.where(gray, l, _hue_to_rgb_array(p, q, h))
+    b = np.where(gray, l, _hue_to_rgb_array(p, q, h - 1/3))
+
+    out = np.empty(hsl.shape[:-1] + (3,), dtype=np.uint8)
+    out[..., 0] = np.clip(np.round(r * 255), 0, 255)
+    out[..., 1] = np.clip(np.round(g * 255), 0, 255)
+    out[..., 2] = np.clip(np.round(b * 255), 0, 255)
+    return out
+
+# Versiones escalares en Python puro: para un solo color, crear arreglos de
+# NumPy cuesta decenas de µs por llamada, y estas corren en cada evento de la
+# interfaz y en cada frame del seguimiento. Dan los mismos resultados que los
+# kernels vectorizados (mismas operaciones en float64 y round-half-even).
+
+def rgb_to_cmykw(r, g, b):
+    """Convierte RGB a CMYKW"""
+    if r == 255 and g == 255 and b == 255:
+        return 0, 0, 0, 0, 100  # Solo blanco
+    
+    c = 1 - r / 255
+    m = 1 - g / 255
+    y = 1 - b / 255
+    k = min(c, m, y)
+    
+    if k < 1:
+        c = (c - k) / (1 - k)
+        m = (m - k) / (1 - k)
+        y = (y - k) / (1 - k)
+    else:
+        c = m = y = 0  # Solo negro
+    
+    return round(c * 100), round(m * 100), round(y * 100), round(k * 100), 0
+
+def cmykw_to_rgb(c, m, y, k, w):
+    """Convierte CMYKW a RGB"""
+    if w > 0:
+        return 255, 255, 255
+    
+    c /= 100
+    m /= 100
+    y /= 100
+    k /= 100
+    
+    r = round(255 * (1 - c) * (1 - k))
+    g = round(255 * (1 - m) * (1 - k))
+    b = round(255 * (1 - y) * (1 - k))
+    
+    return max(0, min(255, r)), max(0, min(255, g)), max(0, min(255, b))
+
+def rgb_to_hsl(r, g, b):
+    """Convierte RGB a HSL"""
+    r, g, b = r / 255.0, g / 255.0, b / 255.0
+    max_val = max(r, g, b)
+    min_val = min(r, g, b)
+    
+    # Luminosidad
+    l = (max_val + min_val) / 2.0
+    
+    if max_val == min_val:
+        h = s = 0.0
+    else:
+        # Saturación
+        delta = max_val - min_val
+        if l <= 0.5:
+            s = delta / (max_val + min_val)
+        else:
+            s = delta / (2.0 - max_val - min_val)
+        
+        # Matiz
+        if max_val == r:
+            h = (g - b) / delta + (6.0 if g < b else 0.0)
+        elif max_val == g:
+            h = (b - r) / delta + 2.0
+        else:
+            h = (r - g) / delta + 4.0
+        h /= 6.0
+    
+    return h * 360, s * 100, l * 100
+
+def _hue_to_rgb(p, q, t):
+    if t < 0:
+        t += 1
+    if t > 1:
+        t -= 1
+    if t < 1/6:
+        return p + (q - p) * 6 * t
+    if t < 1/2:
+        return q
+    if t < 2/3:
+        return p + (q - p) * (2/3 - t) * 6
+    return p
+
+def hsl_to_rgb(h, s, l):
+    """Convierte HSL a RGB"""
+    h, s, l = h / 360.0, s / 100.0, l / 100.0
+    
+    if s == 0:
+        r = g = b = l
+    else:
+        q = l * (1 + s) if l < 0.5 else l + s - l * s
+        p = 2 * l - q
+        r = _hue_to_rgb(p, q, h + 1/3)
+        g = _hue_to_rgb(p, q, h)
+        b = _hue_to_rgb(p, q, h - 1/3)
+    
+    return tuple(max(0, min(255, round(v * 255))) for v in (r, g, b))
+
+def srgb_to_linear(rgb):
+    """sRGB 0–255 a valores lineales 0–1 (float64)"""
+    rgb = np.asarray(rgb)
+    if rgb.dtype == np.uint8:
+        return _SRGB_TO_LINEAR[rgb]
+    v = rgb.astype(np.float64) / 255
+    return np.where(v <= 0.04045, v / 12.92, ((v + 0.055) / 1.055) ** 2.4)
+
+def linear_to_srgb(linear):
+    """Valores lineales 0–1 a sRGB 0–255 (float)"""
+    v = np.clip(linear, 0.0, 1.0)
+    return 255 * np.where(v <= 0.0031308, v * 12.92, 1.055 * v ** (1 / 2.4) - 0.055)
+
+# Con entradas uint8 la linealización es una lectura en tabla
+_SRGB_TO_LINEAR = srgb_to_linear(np.arange(256, dtype=np.int16))
+
+# ---------- TABLAS PRECALCULADAS ----------
+# Los archivos de caché van junto a color_app_config.json (directorio de trabajo)
+CONFIG_FILE = "color_app_config.json"
+
+def load_config(path=CONFIG_FILE):
+    """Leer color_app_config.json (vacío si no existe)"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+CACHE_DIR = "."
+
+def cache_path(filename):
+    """Ruta de un archivo de caché junto a color_app_config.json"""
+    return os.path.join(os.path.abspath(CACHE_DIR), filename)
+
+def trilinear(table, rgb):
+    """Interpolación trilineal en una rejilla (n, n, n, canales) sobre RGB 0–255
+
+    Los nodos están repartidos uniformemente entre 0 y 255; devuelve un
+    arreglo float32 (..., canales).
+    """
+    nodes = table.shape[0]
+    pos = np.asarray(rgb).astype(np.float32) * np.float32((nodes - 1) / 255)
+    idx = np.minimum(pos.astype(np.intp), nodes - 2)
+    frac = pos - idx
+    ri, gi, bi = idx[..., 0], idx[..., 1], idx[..., 2]
+    fr, fg, fb = frac[..., 0:1], frac[..., 1:2], frac[..., 2:3]
+
+    t = table
+    c00 = t[ri, gi, bi] * (1 - fr) + t[ri + 1, gi, bi] * fr
+    c01 = t[ri, gi, bi + 1] * (1 - fr) + t[ri + 1, gi, bi + 1] * fr
+    c10 = t[ri, gi + 1, bi] * (1 - fr) + t[ri + 1, gi + 1, bi] * fr
+    c11 = t[ri, gi + 1, bi + 1] * (1 - fr) + t[ri + 1, gi + 1, bi + 1] * fr
+    c0 = c00 * (1 - fg) + c10 * fg
+    c1 = c01 * (1 - fg) + c11 * fg
+    return c0 * (1 - fb) + c1 * fb
+
+class RGBToCMYKWTable:
+    """Tabla precalculada RGB→CMYKW con caché en disco (.npy mapeado en memoria)
+
+    - 'full': 256³ entradas de 5 bytes (~84 MB), una lectura indexada por color.
+    - 'coarse': 64 nodos por canal (6 bits, ~1.3 MB) con interpolación trilineal,
+      pensada para controladores con poca memoria.
+    """
+    FILES = {'full': 'rgb_cmykw_lut.npy', 'coarse': 'rgb_cmykw_lut_6bit.npy'}
+    COARSE_NODES = 64
+
+    def __init__(self, mode='full', path=None):
+        if mode not in self.FILES:
+            raise ValueError(f"Modo de tabla no válido: {mode}")
+        self.mode = mode
+        self.path = path or cache_path(self.FILES[mode])
+        self.table = None
+
+    def _expected_shape(self):
+        n = 256 if self.mode == 'full' else self.COARSE_NODES
+        return (n, n, n, 5)
+
+    def load(self):
+        """Cargar la tabla desde disco, construyéndola si no existe o es inválida"""
+        if os.path.exists(self.path):
+            try:
+                table = np.load(self.path, mmap_mode='r')
+                if table.shape == self._expected_shape() and table.dtype == np.uint8:
+                    self.table = table
+                    return self
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Tabla CMYKW inválida, se reconstruye: {e}")
+        self.build()
+        return self
+
+    def build(self):
+        """Construir la tabla con los kernels vectorizados y guardarla en disco"""
+        start = time.time()
+        tmp_path = self.path + '.tmp'
+        table = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint8,
+                                          shape=self._expected_shape())
+        if self.mode == 'full':
+            # Un plano R por iteración: 65536 colores, memoria acotada
+            plane = np.empty((256, 256, 3), dtype=np.uint8)
+            plane[..., 1] = np.arange(256)[:, None]
+            plane[..., 2] = np.arange(256)[None, :]
+            for r in range(256):
+                plane[..., 0] = r
+                table[r] = rgb_to_cmykw_array(plane)
+        else:
+            nodes = np.linspace(0, 255, self.COARSE_NODES)
+            grid = np.stack(np.meshgrid(nodes, nodes, nodes, indexing='ij'), axis=-1)
+            table[...] = rgb_to_cmykw_array(grid)
+            # El blanco puro se resuelve aparte para no contaminar la interpolación
+            table[-1, -1, -1] = (0, 0, 0, 0, 0)
+        table.flush()
+        del table
+        os.replace(tmp_path, self.path)
+        self.table = np.load(self.path, mmap_mode='r')
+        print(f"✅ Tabla CMYKW '{self.mode}' generada en {time.time() - start:.1f}s")
+
+    def lookup(self, rgb):
+        """Convierte un arreglo RGB (..., 3) uint8 a CMYKW (..., 5) uint8"""
+        rgb = np.asarray(rgb, dtype=np.uint8)
+        if self.mode == 'full':
+            return self.table[rgb[..., 0], rgb[..., 1], rgb[..., 2]]
+
+        out = np.round(trilinear(self.table, rgb)).astype(np.uint8)
+
+        white = (rgb[..., 0] == 255) & (rgb[..., 1] == 255) & (rgb[..., 2] == 255)
+        out[white] = (0, 0, 0, 0, 100)
+        return out
+
+    def lookup_one(self, r, g, b):
+        """Convierte un único color RGB a CMYKW"""
+        if self.mode == 'full':
+            return tuple(int(v) for v in self.table[r, g, b])
+        return tuple(int(v) for v in self.lookup((r, g, b)))
+
+class SliderPreviewTable:
+    """Tablas para la previsualización desde los sliders CMYKW (enteros 0–100)
+
+    - Producto factorizado 255·(1-x)(1-k) por canal: 101×101 uint8, idéntico a
+      cmykw_to_rgb, de modo que el espacio 101⁵ de los sliders se resuelve con
+      tres lecturas.
+    - Tabla RGB→HSL de 256³ entradas (uint16 en centésimas, ~100 MB mapeados
+      desde disco), opcional porque ocupa espacio en disco.
+    """
+    HSL_FILE = 'rgb_hsl_lut.npy'
+
+    def __init__(self, hsl_path=None):
+        levels = np.zeros((101, 101, 5))
+        levels[..., 0] = np.arange(101)[:, None]
+        levels[..., 3] = np.arange(101)[None, :]
+        # Listas anidadas: la indexación escalar es más rápida que en NumPy
+        self.channel = cmykw_to_rgb_array(levels)[..., 0].tolist()
+        self.hsl_path = hsl_path or cache_path(self.HSL_FILE)
+        self.hsl = None
+
+    def cmykw_to_rgb(self, c, m, y, k, w):
+        """CMYKW (enteros 0–100) a RGB mediante la tabla factorizada"""
+        if w > 0:
+            return 255, 255, 255
+        row_k = int(k)
+        ch = self.channel
+        return ch[int(c)][row_k], ch[int(m)][row_k], ch[int(y)][row_k]
+
+    def rgb_to_hsl(self, r, g, b):
+        """RGB a HSL; usa la tabla 256³ si está cargada"""
+        hsl = self.hsl
+        if hsl is None:
+            return rgb_to_hsl(r, g, b)
+        h, s, l = hsl[r, g, b].tolist()
+        return h / 100, s / 100, l / 100
+
+    def load_hsl(self):
+        """Cargar la tabla RGB→HSL desde disco, construyéndola si falta"""
+        if os.path.exists(self.hsl_path):
+            try:
+                table = np.load(self.hsl_path, mmap_mode='r')
+                if table.shape == (256, 256, 256, 3) and table.dtype == np.uint16:
+                    self.hsl = table
+                    return self
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Tabla HSL inválida, se reconstruye: {e}")
+
+        start = time.time()
+        tmp_path = self.hsl_path + '.tmp'
+        table = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint16,
+                                          shape=(256, 256, 256, 3))
+        plane = np.empty((256, 256, 3), dtype=np.uint8)
+        plane[..., 1] = np.arange(256)[:, None]
+        plane[..., 2] = np.arange(256)[None, :]
+        for r in range(256):
+            plane[..., 0] = r
+            table[r] = np.round(rgb_to_hsl_array(plane) * 100)
+        table.flush()
+        del table
+        os.replace(tmp_path, self.hsl_path)
+        self.hsl = np.load(self.hsl_path, mmap_mode='r')
+        print(f"✅ Tabla HSL generada en {time.time() - start:.1f}s")
+        return self
+
+# ---------- CÍRCULO CROMÁTICO ----------
+HUE_WHEEL_CACHE_DIR = "hue_wheel_cache"
+_hue_wheel_images = {}
+
+def render_hue_wheel(size=200, lightness=50):
+    """Genera el círculo cromático HSL como arreglo (size, size, 3) uint8"""
+    center = size // 2
+    radius = size // 2 - 10
+    
+    y, x = np.mgrid[0:size, 0:size]
+    dx = x - center
+    dy = y - center
+    distance = np.sqrt(dx * dx + dy * dy)
+    
+    hsl = np.empty((size, size, 3))
+    hsl[..., 0] = (180 + (180 / pi) * -np.arctan2(dy, dx)) % 360
+    hsl[..., 1] = distance / radius * 100
+    hsl[..., 2] = lightness
+    
+    img = hsl_to_rgb_array(hsl)
+    img[distance > radius] = 255  # Fondo blanco fuera del círculo
+    return img
+
+def load_hue_wheel(size=200, lightness=50):
+    """Círculo cromático como imagen PIL, cacheado en memoria y como PNG"""
+    key = (size, int(round(lightness)))
+    img = _hue_wheel_images.get(key)
+    if img is not None:
+        return img
+    
+    from PIL import Image
+    path = cache_path(os.path.join(HUE_WHEEL_CACHE_DIR, f"hue_{key[0]}_{key[1]}.png"))
+    try:
+        img = Image.open(path)
+        img.load()
+    except OSError:
+        img = Image.fromarray(render_hue_wheel(*key))
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            img.save(path)
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar el círculo cromático: {e}")
+    
+    _hue_wheel_images[key] = img
+    return img
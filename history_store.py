@@ -0,0 +1,188 @@
+"""Historial de recetas en SQLite (modo WAL, escrituras solo por anexado)
+
+Cada selección de color se anexa a la tabla `picks`; la tabla `colors`
+guarda una fila por color distinto con su última receta, así la tira del
+historial se consulta por páginas con un índice en vez de leer años de
+producción al arrancar. Un hilo escritor agrupa las inserciones en
+transacciones de hasta BATCH_SIZE filas, de modo que la interfaz nunca
+espera al disco.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+HistoryEntry = namedtuple('HistoryEntry', ['rgb', 'cmykw', 'timestamp', 'picks'])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS picks (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    rgb INTEGER NOT NULL,
+    c INTEGER, m INTEGER, y INTEGER, k INTEGER, w INTEGER
+);
+CREATE INDEX IF NOT EXISTS picks_ts ON picks(ts);
+CREATE INDEX IF NOT EXISTS picks_rgb ON picks(rgb);
+CREATE TABLE IF NOT EXISTS colors (
+    rgb INTEGER PRIMARY KEY,
+    last_ts REAL NOT NULL,
+    picks INTEGER NOT NULL,
+    c INTEGER, m INTEGER, y INTEGER, k INTEGER, w INTEGER
+);
+CREATE INDEX IF NOT EXISTS colors_last_ts ON colors(last_ts);
+"""
+
+UPSERT_COLOR = """
+INSERT INTO colors (last_ts, rgb, picks, c, m, y, k, w) VALUES (?, ?, 1, ?, ?, ?, ?, ?)
+ON CONFLICT(rgb) DO UPDATE SET
+    last_ts = excluded.last_ts, picks = picks + 1,
+    c = excluded.c, m = excluded.m, y = excluded.y, k = excluded.k, w = excluded.w
+"""
+
+# Marca para que el escritor vacíe su lote sin esperar a flush_interval
+_FLUSH = object()
+
+def pack_rgb(rgb):
+    """(r, g, b) a un entero 0xRRGGBB (clave de color indexada)"""
+    r, g, b = (int(v) for v in rgb)
+    return (r << 16) | (g << 8) | b
+
+def unpack_rgb(value):
+    return (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF
+
+class HistoryStore:
+    """Historial persistente con escritor en segundo plano y consultas paginadas"""
+    BATCH_SIZE = 256
+
+    def __init__(self, path='color_history.db', flush_interval=0.5):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.reader = self.connect()
+        self.reader.executescript(SCHEMA)
+
+    def connect(self):
+        """Nueva conexión en modo WAL (una por hilo)"""
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self):
+        """Escribir lo pendiente y cerrar las conexiones"""
+        if self.thread:
+            self.queue.put(None)
+            self.thread.join(timeout=5.0)
+            self.thread = None
+        with self.lock:
+            self.reader.close()
+
+    def add(self, rgb, cmykw, timestamp=None):
+        """Anexar una selección; la escribe el hilo escritor en su próximo lote"""
+        self.queue.put((time.time() if timestamp is None else timestamp, pack_rgb(rgb), *(int(v) for v in cmykw)))
+
+    def flush(self):
+        """Esperar a que todas las selecciones anexadas estén en disco"""
+        if self.thread:
+            self.queue.put(_FLUSH)
+            self.queue.join()
+
+    def _run(self):
+        conn = self.connect()
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            # Agrupar hasta BATCH_SIZE filas o flush_interval segundos
+            while batch[-1] is not None and batch[-1] is not _FLUSH and len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            rows = [item for item in batch if item is not None and item is not _FLUSH]
+            running = None not in batch
+            if rows:
+                try:
+                    self._write(conn, rows)
+                except sqlite3.Error as e:
+                    print(f"🛑 No se pudo guardar el historial: {e}")
+            for _ in batch:
+                self.queue.task_done()
+        conn.close()
+
+    @staticmethod
+    def _write(conn, rows):
+        with conn:
+            conn.executemany("INSERT INTO picks (ts, rgb, c, m, y, k, w) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.executemany(UPSERT_COLOR, rows)
+
+    def recent_colors(self, limit=10, offset=0):
+        """Colores distintos, del más reciente al más antiguo, por páginas"""
+        with self.lock:
+            rows = self.reader.execute(
+                "SELECT rgb, c, m, y, k, w, last_ts, picks FROM colors "
+                "ORDER BY last_ts DESC LIMIT ? OFFSET ?", (limit, offset)).fetchall()
+        return [HistoryEntry(unpack_rgb(row[0]), tuple(row[1:6]), row[6], row[7]) for row in rows]
+
+    def picks(self, start=None, end=None, limit=1000, after_id=0):
+        """Selecciones entre dos instantes, paginadas por id: [(id, HistoryEntry)]"""
+        with self.lock:
+            rows = self.reader.execute(
+                "SELECT id, rgb, c, m, y, k, w, ts FROM picks "
+                "WHERE id > ? AND ts >= ? AND ts < ? ORDER BY id LIMIT ?",
+                (after_id, start or 0, end or float('inf'), limit)).fetchall()
+        return [(row[0], HistoryEntry(unpack_rgb(row[1]), tuple(row[2:7]), row[7], 1)) for row in rows]
+
+    def color_count(self):
+        with self.lock:
+            return self.reader.execute("SELECT COUNT(*) FROM colors").fetchone()[0]
+
+    def iter_colors(self, limit=None, chunk=10000):
+        """Todos los colores distintos (los más recientes primero), por bloques
+
+        Abre su propia conexión, así puede recorrerse desde otro hilo.
+        """
+        conn = self.connect()
+        try:
+            cursor = conn.execute(
+                "SELECT rgb, c, m, y, k, w FROM colors ORDER BY last_ts DESC LIMIT ?",
+                (-1 if limit is None else limit,))
+            while True:
+                rows = cursor.fetchmany(chunk)
+                if not rows:
+                    break
+                yield [(unpack_rgb(row[0]), tuple(row[1:6])) for row in rows]
+        finally:
+            conn.close()
+
+    def migrate_json(self, json_path='color_history.json'):
+        """Importar un color_history.json antiguo y renombrarlo a .bak
+
+        Devuelve cuántas entradas se importaron.
+        """
+        if not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path, 'r') as f:
+                entries = [(tuple(rgb), tuple(cmykw)) for rgb, cmykw in json.load(f)]
+        except (OSError, ValueError, TypeError) as e:
+            print(f"⚠️ No se pudo migrar {json_path}: {e}")
+            return 0
+        # Conservar el orden: el último del archivo queda como el más reciente
+        now = time.time() - len(entries)
+        rows = [(now + i, pack_rgb(rgb), *(int(v) for v in cmykw)) for i, (rgb, cmykw) in enumerate(entries)]
+        with self.lock:
+            self._write(self.reader, rows)
+        os.replace(json_path, json_path + '.bak')
+        print(f"✅ {len(rows)} colores migrados de {json_path} a {self.path}")
+        return len(rows)
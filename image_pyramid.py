@@ -0,0 +1,163 @@
+"""Pirámide multirresolución para imágenes grandes (50–100 MP)
+
+La imagen completa nunca se reduce a la miniatura del canvas: el nivel 0
+guarda los píxeles reales para muestrear, y cada nivel siguiente es la mitad
+del anterior. Cada nivel es un solo arreglo (no se divide en tiles): la
+vista (zoom/desplazamiento) se compone recortando del nivel más chico que
+aún tiene resolución suficiente solo la región visible y reescalando ese
+recorte, así el costo depende del tamaño del canvas y no del de la imagen.
+
+- JPEG: una vista previa rápida con draft() (la DCT decodifica a 1/2–1/8)
+  mientras se decodifica la imagen completa en segundo plano
+- BMP, PPM y TIFF sin compresión: el nivel 0 es un np.memmap del archivo, sin
+  decodificar ni copiar; el sistema operativo lee solo las páginas usadas
+- los niveles se construyen por franjas de 2·TILE_SIZE filas, así la memoria
+  temporal no depende del tamaño de la imagen; la pirámide se detiene en el
+  primer nivel de lado ≤ TILE_SIZE
+
+No depende de Tk: render() devuelve una imagen PIL lista para un PhotoImage.
+"""
+import warnings
+
+import numpy as np
+from PIL import Image
+
+def open_image(path):
+    """Image.open sin el aviso de bomba de descompresión (fotos de 50–100 MP)
+
+    Las imágenes por encima del límite duro de PIL siguen fallando.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', Image.DecompressionBombWarning)
+        return Image.open(path)
+
+def memmap_raw(img, path):
+    """Vista (alto, ancho, 3) RGB mapeada del archivo, o None si no es RGB/BGR crudo
+
+    Acepta una sola región cruda o franjas de ancho completo consecutivas en
+    el archivo (TIFF por strips). BMP guarda BGR de abajo arriba: se expresa
+    con pasos negativos, sin copiar.
+    """
+    width, height = img.size
+    tiles = sorted(img.tile, key=lambda t: t[1][1])
+    if not tiles or any(t[0] != 'raw' for t in tiles):
+        return None
+    args = tiles[0][3]
+    rawmode, stride, orientation = (args, 0, 1) if isinstance(args, str) else (tuple(args) + (0, 1))[:3]
+    if rawmode not in ('RGB', 'BGR'):
+        return None
+    stride = stride or width * 3
+    base = tiles[0][2]
+    for _, extents, offset, tile_args in tiles:
+        x0, y0, x1, y1 = extents
+        if (x0, x1) != (0, width) or tile_args != args or offset != base + y0 * stride:
+            return None
+    if tiles[0][1][1] != 0 or tiles[-1][1][3] != height:
+        return None
+    mapped = np.memmap(path, dtype=np.uint8, mode='r', offset=base, shape=(stride * height,))
+    array = np.ndarray((height, width, 3), dtype=np.uint8, buffer=mapped, strides=(stride, 3, 1))
+    if orientation < 0:
+        array = array[::-1]
+    if rawmode == 'BGR':
+        array = array[..., ::-1]
+    return array
+
+def halve(array, tile_size):
+    """Nivel siguiente (mitad de lado) con Image.reduce, franja por franja"""
+    height, width = array.shape[:2]
+    out = np.empty(((height + 1) // 2, (width + 1) // 2, 3), dtype=np.uint8)
+    band = 2 * tile_size
+    for y in range(0, height, band):
+        reduced = Image.fromarray(np.ascontiguousarray(array[y:y + band])).reduce(2)
+        out[y // 2:y // 2 + reduced.height] = np.asarray(reduced)
+    return out
+
+class ImagePyramid:
+    """Niveles [(arreglo RGB, escala)], escala = píxeles originales por píxel del nivel"""
+    TILE_SIZE = 512
+    PREVIEW_SIDE = 1024
+
+    def __init__(self, path=None):
+        self.path = path
+        self.levels = []
+        self.full = False
+        self.size = (0, 0)
+        if path is not None:
+            with open_image(path) as img:
+                self.size = img.size
+
+    @classmethod
+    def from_array(cls, array):
+        """Pirámide a partir de un arreglo RGB ya en memoria (p. ej. una foto de la cámara)"""
+        pyramid = cls()
+        pyramid.size = (array.shape[1], array.shape[0])
+        pyramid.levels = pyramid.build_levels(np.ascontiguousarray(array[..., :3]))
+        pyramid.full = True
+        return pyramid
+
+    def load_preview(self):
+        """Vista previa rápida para JPEG; devuelve False si el formato no la permite"""
+        with open_image(self.path) as img:
+            if img.format != 'JPEG':
+                return False
+            img.draft('RGB', (self.PREVIEW_SIDE, self.PREVIEW_SIDE))
+            preview = np.asarray(img.convert('RGB'))
+        if not self.full:
+            self.levels = [(preview, self.size[0] / preview.shape[1])]
+        return True
+
+    def load_full(self):
+        """Nivel 0 a resolución completa (mapeado si se puede) y niveles reducidos"""
+        with open_image(self.path) as img:
+            array = memmap_raw(img, self.path)
+            if array is None:
+                if img.mode != 'RGB':
+                    img = img.convert('RGB')
+                array = np.asarray(img)
+        self.levels = self.build_levels(array)
+        self.full = True
+
+    def build_levels(self, array):
+        levels = [(array, 1.0)]
+        while max(array.shape[:2]) > self.TILE_SIZE:
+            array = halve(array, self.TILE_SIZE)
+            levels.append((array, self.size[0] / array.shape[1]))
+        return levels
+
+    def base(self):
+        """(arreglo, escala) con más resolución disponible, para muestrear color"""
+        return self.levels[0]
+
+    def level_for(self, zoom):
+        """El nivel más chico con al menos un píxel por píxel de pantalla"""
+        chosen = self.levels[0]
+        for array, scale in self.levels:
+            if scale * zoom <= 1.0:
+                chosen = (array, scale)
+        return chosen
+
+    def render(self, x0, y0, zoom, width, height, background=(255, 255, 255)):
+        """Imagen PIL (width, height) de la vista con origen (x0, y0) en píxeles
+        originales y `zoom` píxeles de pantalla por píxel original"""
+        out = Image.new('RGB', (width, height), background)
+        if not self.levels:
+            return out
+        array, scale = self.level_for(zoom)
+        level_height, level_width = array.shape[:2]
+        # Recorte visible en coordenadas del nivel (con un píxel de margen)
+        lx0 = max(0, int(np.floor(x0 / scale)))
+        ly0 = max(0, int(np.floor(y0 / scale)))
+        lx1 = min(level_width, int(np.ceil((x0 + width / zoom) / scale)) + 1)
+        ly1 = min(level_height, int(np.ceil((y0 + height / zoom) / scale)) + 1)
+        if lx1 <= lx0 or ly1 <= ly0:
+            return out
+        crop = Image.fromarray(np.ascontiguousarray(array[ly0:ly1, lx0:lx1]))
+        # Tamaño y posición en pantalla del recorte
+        factor = scale * zoom
+        left = round((lx0 * scale - x0) * zoom)
+        top = round((ly0 * scale - y0) * zoom)
+        target = (max(1, round((lx1 - lx0) * factor)), max(1, round((ly1 - ly0) * factor)))
+        # Ampliando se ven los píxeles reales; reduciendo, un filtro suave
+        resample = Image.Resampling.NEAREST if factor > 1 else Image.Resampling.BILINEAR
+        out.paste(crop.resize(target, resample), (left, top))
+        return out
@@ -0,0 +1,232 @@
+"""Modelo de mezcla de pigmentos Kubelka-Munk para recetas CMYKW
+
+La fórmula sustractiva de rgb_to_cmykw trata la pintura como tinta sobre
+papel; una mezcla real de pigmentos sigue mejor la teoría de Kubelka-Munk
+de dos constantes: cada pigmento base tiene un coeficiente de absorción K y
+uno de dispersión S por canal (R, G, B lineales), la mezcla suma K y S
+ponderados por la proporción y su reflectancia es
+
+    R = 1 + K/S - sqrt((K/S)² + 2·K/S)
+
+El problema inverso es lineal en K/S: para el color objetivo t = K/S(R),
+Σ cᵢ·(Kᵢ - t·Sᵢ) = 0 por canal, con cᵢ ≥ 0 y Σ cᵢ = 1. Con solo 5
+pigmentos el NNLS se resuelve exactamente probando los 31 subconjuntos de
+pigmentos activos, todos los objetivos a la vez. Una rejilla precalculada
+con interpolación trilineal deja cada consulta muy por debajo de 1 ms.
+"""
+import hashlib
+import itertools
+import json
+import os
+import time
+
+import numpy as np
+
+from conversion import (
+    RGBToCMYKWTable, cache_path, trilinear, srgb_to_linear, linear_to_srgb, rgb_to_cmykw_array,
+)
+
+PIGMENTS = 'CMYKW'
+
+# Pigmentos base: reflectancia de la capa opaca (masstone) por canal R, G, B
+# lineal y poder de dispersión relativo. Valores típicos de pinturas al agua;
+# se calibran con la clave 'pigments' de color_app_config.json.
+DEFAULT_PIGMENTS = {
+    'C': {'reflectance': (0.04, 0.30, 0.62), 'scattering': 0.35},
+    'M': {'reflectance': (0.62, 0.04, 0.22), 'scattering': 0.35},
+    'Y': {'reflectance': (0.85, 0.70, 0.04), 'scattering': 0.45},
+    'K': {'reflectance': (0.03, 0.03, 0.03), 'scattering': 0.50},
+    'W': {'reflectance': (0.92, 0.92, 0.92), 'scattering': 1.00},
+}
+
+# Reflectancias válidas: evita K/S infinito en negro y blanco absolutos
+REFLECTANCE_MIN = 0.002
+REFLECTANCE_MAX = 0.998
+
+def reflectance_to_ks(reflectance):
+    """Relación K/S de una capa opaca con reflectancia R"""
+    r = np.clip(reflectance, REFLECTANCE_MIN, REFLECTANCE_MAX)
+    return (1 - r) ** 2 / (2 * r)
+
+def ks_to_reflectance(ks):
+    """Reflectancia de una capa opaca con relación K/S"""
+    return 1 + ks - np.sqrt(ks * ks + 2 * ks)
+
+def round_recipe(proportions):
+    """Proporciones (..., 5) a porcentajes enteros que suman exactamente 100
+
+    Método del mayor resto: se trunca y los puntos que faltan van a los
+    pigmentos con mayor parte fraccionaria.
+    """
+    p = np.asarray(proportions, dtype=np.float64)
+    total = p.sum(axis=-1, keepdims=True)
+    scaled = 100 * p / np.where(total > 0, total, 1)
+    floor = np.floor(scaled)
+    missing = (100 - floor.sum(axis=-1)).astype(np.intp)
+    order = np.argsort(floor - scaled, axis=-1, kind='stable')  # mayor resto primero
+    ranks = np.argsort(order, axis=-1, kind='stable')
+    return (floor + (ranks < missing[..., None])).astype(np.uint8)
+
+class PigmentModel:
+    """Modelo directo (mezcla → color) e inverso (color → proporciones)"""
+    # Subconjuntos de pigmentos activos para el NNLS exacto
+    SUBSETS = [list(s) for n in range(1, 6) for s in itertools.combinations(range(5), n)]
+
+    def __init__(self, pigments=None, sum_weight=10.0, ridge=1e-6, ks_offset=0.5):
+        pigments = pigments or DEFAULT_PIGMENTS
+        reflectance = np.array([pigments[p]['reflectance'] for p in PIGMENTS], dtype=np.float64)
+        self.S = np.array([[pigments[p]['scattering']] * 3 for p in PIGMENTS], dtype=np.float64)
+        self.K = reflectance_to_ks(reflectance) * self.S
+        # Gama por canal: ninguna mezcla sale del rango de K/S de los pigmentos puros
+        self.ks_min = (self.K / self.S).min(axis=0)
+        self.ks_max = (self.K / self.S).max(axis=0)
+        self.sum_weight = sum_weight
+        self.ridge = ridge
+        self.ks_offset = ks_offset
+        self.pigments = pigments
+
+    @classmethod
+    def from_config(cls, config):
+        """Modelo con los pigmentos de la configuración (o los por defecto)"""
+        pigments = dict(DEFAULT_PIGMENTS)
+        pigments.update(config.get('pigments', {}))
+        return cls(pigments)
+
+    def fingerprint(self):
+        """Huella de los parámetros, para invalidar rejillas en caché"""
+        data = json.dumps([self.pigments, self.sum_weight, self.ridge, self.ks_offset], sort_keys=True)
+        return hashlib.sha1(data.encode()).hexdigest()[:10]
+
+    def mix(self, proportions):
+        """Color sRGB (..., 3) float de mezclar proporciones (..., 5)"""
+        c = np.asarray(proportions, dtype=np.float64)
+        c = c / c.sum(axis=-1, keepdims=True)
+        ks = (c @ self.K) / (c @ self.S)
+        return linear_to_srgb(ks_to_reflectance(ks))
+
+    def solve(self, rgb):
+        """Proporciones (..., 5) que suman 1 para colores sRGB (..., 3)
+
+        Minimiza Σ_canal (Σ cᵢ·(Kᵢ - t·Sᵢ) / (t + offset))² + w·(Σ cᵢ - 1)²
+        + ridge·|c|² con c ≥ 0. Dividir por t + offset vuelve el error
+        relativo, de modo que los canales oscuros (K/S grande) no dominan.
+        El objetivo se recorta antes a la gama de K/S de los pigmentos puros.
+        Devuelve (proporciones, residuo); un residuo alto indica un color
+        fuera de la gama que alcanzan los pigmentos base.
+        """
+        rgb = np.asarray(rgb, dtype=np.float64)
+        shape = rgb.shape[:-1]
+        t = reflectance_to_ks(srgb_to_linear(rgb.reshape(-1, 3)))  # (N, 3)
+        t = np.clip(t, self.ks_min, self.ks_max)
+        weight = 1 / (t + self.ks_offset)
+
+        # Ecuaciones por objetivo: A (N, 4, 5) x = b, la última fila fija Σc = 1
+        n = len(t)
+        A = np.empty((n, 4, 5))
+        A[:, :3, :] = (self.K.T[None] - t[:, :, None] * self.S.T[None]) * weight[:, :, None]
+        A[:, 3, :] = np.sqrt(self.sum_weight)
+        b = np.zeros(4)
+        b[3] = np.sqrt(self.sum_weight)
+
+        G = np.einsum('nli,nlj->nij', A, A) + self.ridge * np.eye(5)
+        h = A[:, 3, :] * b[3]  # Aᵀb: solo la fila de la suma aporta
+
+        # NNLS exacto: el óptimo es la solución sin restricciones de algún
+        # subconjunto de pigmentos activos que quede en cᵢ ≥ 0
+        best = np.zeros((n, 5))
+        best_cost = np.full(n, np.inf)
+        for subset in self.SUBSETS:
+            Gs = G[:, subset][:, :, subset]
+            hs = h[:, subset]
+            xs = np.linalg.solve(Gs, hs[..., None])[..., 0]
+            cost = np.einsum('ni,nij,nj->n', xs, Gs, xs) - 2 * np.einsum('ni,ni->n', hs, xs)
+            better = (xs >= -1e-12).all(axis=1) & (cost < best_cost)
+            if better.any():
+                best[better] = 0.0
+                best[np.ix_(better, subset)] = xs[better]
+                best_cost[better] = cost[better]
+
+        best = np.clip(best, 0.0, None)
+        best /= best.sum(axis=1, keepdims=True)
+        residual = best_cost + b @ b
+        return best.reshape(shape + (5,)), residual.reshape(shape)
+
+    def recipe(self, rgb):
+        """Porcentajes enteros CMYKW (..., 5) que suman 100"""
+        return round_recipe(self.solve(rgb)[0])
+
+class PigmentRecipeGrid:
+    """Soluciones del modelo precalculadas en una rejilla RGB (caché .npy)
+
+    El archivo lleva la huella de los pigmentos en el nombre, así una
+    calibración nueva genera su propia rejilla.
+    """
+    NODES = 33
+
+    def __init__(self, model=None, nodes=NODES, path=None):
+        self.model = model or PigmentModel()
+        self.nodes = nodes
+        self.path = path or cache_path(f"pigment_grid_{nodes}_{self.model.fingerprint()}.npy")
+        self.grid = None
+
+    def load(self):
+        """Cargar la rejilla desde disco, construyéndola si no existe o es inválida"""
+        if os.path.exists(self.path):
+            try:
+                grid = np.load(self.path)
+                if grid.shape == (self.nodes,) * 3 + (5,) and grid.dtype == np.float32:
+                    self.grid = grid
+                    return self
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Rejilla de pigmentos inválida, se reconstruye: {e}")
+        self.build()
+        return self
+
+    def build(self):
+        """Resolver el modelo en todos los nodos y guardar la rejilla"""
+        start = time.time()
+        axis = np.linspace(0, 255, self.nodes)
+        rgb = np.stack(np.meshgrid(axis, axis, axis, indexing='ij'), axis=-1)
+        self.grid = self.model.solve(rgb)[0].astype(np.float32)
+        tmp_path = self.path + '.tmp.npy'
+        try:
+            np.save(tmp_path, self.grid)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar la rejilla de pigmentos: {e}")
+        print(f"✅ Rejilla de pigmentos generada en {time.time() - start:.1f}s")
+
+    def lookup(self, rgb):
+        """Proporciones interpoladas (..., 5) para colores RGB (..., 3)"""
+        return trilinear(self.grid, rgb)
+
+    def recipe(self, rgb):
+        """Porcentajes enteros CMYKW (..., 5) que suman 100"""
+        return round_recipe(self.lookup(rgb))
+
+    def recipe_one(self, r, g, b):
+        """Receta de un único color, como tupla (c, m, y, k, w)"""
+        return tuple(int(v) for v in self.recipe((r, g, b)))
+
+# ---------- SELECCIÓN DEL CONVERSOR ----------
+def load_recipe_converter(config):
+    """Conversor RGB (..., 3) → CMYKW (..., 5) uint8 según la configuración
+
+    Lo usan la GUI, el CLI por lotes y el servicio de recetas, así un mismo
+    color da la misma receta en los tres. Orden: rejilla del modelo de
+    pigmentos ('mixing_model': 'kubelka_munk'), tabla precalculada
+    ('cmykw_lut': 'full' o 'coarse') y la fórmula analítica. Si una opción
+    no se puede cargar se avisa y se pasa a la siguiente.
+    """
+    if config.get('mixing_model', 'naive') == 'kubelka_munk':
+        try:
+            return PigmentRecipeGrid(PigmentModel.from_config(config)).load().recipe
+        except (OSError, ValueError, KeyError) as e:
+            print(f"🛑 No se pudo cargar el modelo de pigmentos: {e}")
+    mode = config.get('cmykw_lut', 'none')
+    if mode in RGBToCMYKWTable.FILES:
+        try:
+            return RGBToCMYKWTable(mode).load().lookup
+        except (OSError, ValueError) as e:
+            print(f"🛑 No se pudo cargar la tabla CMYKW: {e}")
+    return rgb_to_cmykw_array
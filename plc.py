@@ -0,0 +1,735 @@
+"""Comunicación con el PLC: Modbus TCP, puerto serial, telemetría y registros
+
+No depende de Tk ni de OpenCV. pymodbus (~90 ms de importación) y pyserial se
+cargan al abrir la primera conexión, así un servicio que solo convierte
+colores no paga ese costo al arrancar.
+"""
+import threading
+import time
+import queue
+import re
+from collections import deque, namedtuple
+from concurrent.futures import Future, InvalidStateError
+from importlib.util import find_spec
+
+import numpy as np
+
+from serial_protocol import encode_frame, encode_ascii, NEGOTIATE_REQUEST, NEGOTIATE_REPLY
+
+# Comprobar si pymodbus está instalado (se importa bajo demanda)
+MODBUS_AVAILABLE = find_spec('pymodbus') is not None
+if not MODBUS_AVAILABLE:
+    print("  pymodbus no está instalado. Ejecuta: pip install pymodbus")
+
+# Comprobar si pyserial está instalado (se importa bajo demanda)
+SERIAL_AVAILABLE = find_spec('serial') is not None
+if not SERIAL_AVAILABLE:
+    print("  pyserial no está instalado. Ejecuta: pip install pyserial")
+
+# COMUNICACIÓN CON PLC (MODBUS TCP o SERIAL)
+class ModbusConnection:
+    """Conexión Modbus TCP persistente con reconexión y backoff exponencial
+
+    Mantiene un único ModbusTcpClient abierto, de modo que cada escritura es
+    un solo round-trip Modbus en lugar de un handshake TCP completo. Si la
+    conexión cae, los reintentos se espacian de `backoff_initial` hasta
+    `backoff_max` segundos para no bloquear a quien envía.
+    """
+    def __init__(self, ip, port=502, timeout=3, backoff_initial=0.5, backoff_max=30.0):
+        self.ip = ip
+        self.port = port
+        self.timeout = timeout
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.client = None
+        self.lock = threading.Lock()
+        self._backoff = backoff_initial
+        self._retry_at = 0.0
+
+    def _ensure_connected(self):
+        """Conectar si hace falta, respetando el backoff"""
+        if self.client is not None and self.client.is_socket_open():
+            return True
+        
+        now = time.time()
+        if now < self._retry_at:
+            return False
+        
+        if self.client is None:
+            from pymodbus.client import ModbusTcpClient
+            self.client = ModbusTcpClient(self.ip, port=self.port, timeout=self.timeout)
+        if self.client.connect():
+            self._backoff = self.backoff_initial
+            return True
+        
+        self._retry_at = now + self._backoff
+        self._backoff = min(self._backoff * 2, self.backoff_max)
+        return False
+
+    def _drop(self):
+        """Cerrar el socket para forzar una reconexión en el próximo uso"""
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+
+    def execute(self, operation):
+        """Ejecutar operation(client) con la conexión abierta
+
+        Lanza ConnectionError si no hay conexión disponible.
+        """
+        from pymodbus.exceptions import ModbusException
+        with self.lock:
+            if not self._ensure_connected():
+                raise ConnectionError(f"No se pudo conectar al PLC {self.ip}:{self.port}")
+            try:
+                return operation(self.client)
+            except (ModbusException, OSError):
+                self._drop()
+                raise
+
+    def write_registers(self, address, values):
+        """Escribir registros holding"""
+        return self.execute(lambda client: client.write_registers(address, values))
+
+    def close(self):
+        """Cerrar la conexión"""
+        with self.lock:
+            self._drop()
+
+class ModbusConnectionPool:
+    """Conexiones Modbus persistentes compartidas, una por endpoint (ip, puerto)"""
+    def __init__(self, **connection_options):
+        self.connection_options = connection_options
+        self._connections = {}
+        self._lock = threading.Lock()
+
+    def get(self, ip, port=502):
+        """Obtener (o crear) la conexión de un endpoint"""
+        with self._lock:
+            connection = self._connections.get((ip, port))
+            if connection is None:
+                connection = ModbusConnection(ip, port, **self.connection_options)
+                self._connections[(ip, port)] = connection
+            return connection
+
+    def close_all(self):
+        """Cerrar todas las conexiones del pool"""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for connection in connections:
+            connection.close()
+
+# ---------- TELEMETRÍA SERIAL ----------
+TANKS = 'CMYKW'
+
+# Bits de alarma por tanque i: crítico (i), advertencia (5 + i), bomba detenida (10 + i)
+ALARM_CRITICAL = 0
+ALARM_WARNING = 5
+ALARM_PUMP_STOPPED = 10
+
+TELEMETRY_DTYPE = np.dtype([
+    ('time', 'f8'),
+    ('temps', 'f4', 5),
+    ('levels', 'f4', 5),
+    ('alarms', 'u2'),
+])
+
+class TelemetryBuffer:
+    """Buffer circular de tamaño fijo (NumPy) con los registros de telemetría"""
+    def __init__(self, capacity=4096):
+        self.data = np.zeros(capacity, dtype=TELEMETRY_DTYPE)
+        self.capacity = capacity
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def append(self, timestamp, temps, levels, alarms):
+        """Agregar un registro, sobrescribiendo el más antiguo si está lleno"""
+        with self.lock:
+            record = self.data[self.count % self.capacity]
+            record['time'] = timestamp
+            record['temps'] = temps
+            record['levels'] = levels
+            record['alarms'] = alarms
+            self.count += 1
+
+    def latest(self):
+        """Último registro (copia) o None si no hay datos"""
+        with self.lock:
+            if self.count == 0:
+                return None
+            return self.data[(self.count - 1) % self.capacity].copy()
+
+    def window(self, seconds, now=None):
+        """Registros de los últimos `seconds` segundos, en orden cronológico"""
+        now = time.time() if now is None else now
+        with self.lock:
+            n = min(self.count, self.capacity)
+            start = self.count - n
+            order = (np.arange(start, self.count)) % self.capacity
+            records = self.data[order]
+        return records[records['time'] >= now - seconds]
+
+    def aggregate(self, seconds, now=None):
+        """Estadísticas de la ventana: media/mín/máx por tanque y alarmas (OR)"""
+        records = self.window(seconds, now)
+        if len(records) == 0:
+            return None
+        return {
+            'samples': len(records),
+            'temps_mean': np.nanmean(records['temps'], axis=0),
+            'temps_min': np.nanmin(records['temps'], axis=0),
+            'temps_max': np.nanmax(records['temps'], axis=0),
+            'levels_mean': np.nanmean(records['levels'], axis=0),
+            'levels_min': np.nanmin(records['levels'], axis=0),
+            'alarms': int(np.bitwise_or.reduce(records['alarms'])),
+        }
+
+class TelemetryParser:
+    """Parser incremental de las líneas que imprime Sensores.ino
+
+    Un registro se completa con cada línea "Niveles - ...", que el firmware
+    imprime justo después de "Temperaturas - ..."; las alarmas recibidas
+    desde el registro anterior se acumulan en sus bits. Las respuestas de
+    control (negociación, confirmaciones, errores) van a `replies`.
+    """
+    VALUE_RE = re.compile(rb'([CMYKW]):(-?\d+(?:\.\d+)?)')
+    TEMPS_PREFIX = b"Temperaturas - "
+    LEVELS_PREFIX = b"Niveles - "
+    ALARM_PREFIXES = (
+        (b"Alarma ", ALARM_CRITICAL),
+        (b"Advertencia ", ALARM_WARNING),
+        (b"Bomba ", ALARM_PUMP_STOPPED),
+    )
+
+    def __init__(self, buffer, replies=None):
+        self.buffer = buffer
+        self.replies = replies
+        self._pending = bytearray()
+        self._temps = np.full(5, np.nan, dtype=np.float32)
+        self._levels = np.full(5, np.nan, dtype=np.float32)
+        self._alarms = 0
+        self.lines = 0
+
+    def feed(self, data):
+        """Agregar bytes recibidos y procesar las líneas completas"""
+        self._pending.extend(data)
+        start = 0
+        while True:
+            end = self._pending.find(b'\n', start)
+            if end < 0:
+                break
+            self.parse_line(bytes(self._pending[start:end]).strip())
+            start = end + 1
+        del self._pending[:start]
+
+    def _fill(self, target, line):
+        for tank, value in self.VALUE_RE.findall(line):
+            target[TANKS.index(tank.decode())] = float(value)
+
+    def parse_line(self, line, timestamp=None):
+        """Interpretar una línea completa"""
+        if not line:
+            return
+        self.lines += 1
+        
+        if line.startswith(self.TEMPS_PREFIX):
+            self._fill(self._temps, line[len(self.TEMPS_PREFIX):])
+            return
+        if line.startswith(self.LEVELS_PREFIX):
+            self._fill(self._levels, line[len(self.LEVELS_PREFIX):])
+            self.buffer.append(time.time() if timestamp is None else timestamp,
+                               self._temps, self._levels, self._alarms)
+            self._alarms = 0
+            return
+        
+        for prefix, base in self.ALARM_PREFIXES:
+            if line.startswith(prefix) and len(line) > len(prefix):
+                tank = chr(line[len(prefix)])
+                if tank in TANKS:
+                    self._alarms |= 1 << (base + TANKS.index(tank))
+                return
+        
+        if self.replies is not None:
+            self.replies.put(line)
+
+class SerialTelemetryReader:
+    """Hilo lector del puerto serial: nadie más bloquea leyendo el puerto
+
+    Las líneas de control solo se guardan entre expect_reply() y
+    end_reply(): el firmware imprime confirmaciones y avisos todo el tiempo
+    y fuera de una negociación nadie las lee.
+    """
+    def __init__(self, serial_connection, buffer=None):
+        self.serial_connection = serial_connection
+        self.buffer = buffer or TelemetryBuffer()
+        self.replies = queue.Queue()
+        self.awaiting_reply = threading.Event()
+        self.parser = TelemetryParser(self.buffer, self)
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2.0)
+            self.thread = None
+
+    def put(self, line):
+        """Línea de control del parser (se descarta si nadie espera respuesta)"""
+        if self.awaiting_reply.is_set():
+            self.replies.put(line)
+
+    def expect_reply(self):
+        """Descartar respuestas viejas y guardar las siguientes (antes de escribir)"""
+        self.awaiting_reply.set()
+        self._drain_replies()
+
+    def end_reply(self):
+        """Dejar de guardar líneas de control"""
+        self.awaiting_reply.clear()
+        self._drain_replies()
+
+    def _drain_replies(self):
+        while True:
+            try:
+                self.replies.get_nowait()
+            except queue.Empty:
+                return
+
+    def read_reply(self, timeout):
+        """Siguiente línea de control recibida, o None si vence el timeout"""
+        try:
+            return self.replies.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _run(self):
+        import serial
+        while self.running:
+            try:
+                # Bloquea hasta el timeout del puerto si no hay datos
+                data = self.serial_connection.read(self.serial_connection.in_waiting or 1)
+            except (serial.SerialException, OSError, TypeError) as e:
+                if self.running:
+                    print(f"🛑 Lector serial detenido: {e}")
+                break
+            if data:
+                self.parser.feed(data)
+
+# ---------- LECTURA DE REGISTROS MODBUS ----------
+# Grupo de registros con su propia tasa de sondeo (segundos)
+PollGroup = namedtuple('PollGroup', ['name', 'address', 'count', 'interval'])
+
+# Mapa de PLC_Prueba.st: niveles en %IW0–4 (rápido), temperaturas en %IW5–9 (lento).
+# Los grupos se publican en este orden: las temperaturas antes que los niveles,
+# que son los que cierran cada registro de telemetría.
+DEFAULT_POLL_GROUPS = (
+    PollGroup('temps', 5, 5, 2.0),
+    PollGroup('levels', 0, 5, 0.2),
+)
+
+def plan_reads(groups, max_gap=0, max_count=125):
+    """Agrupar rangos de registros en el mínimo de lecturas Modbus
+
+    Los rangos contiguos (o separados por huecos de hasta `max_gap`
+    registros) se fusionan sin superar `max_count` registros por petición.
+    Devuelve una lista de (dirección, cantidad).
+    """
+    reads = []
+    for group in sorted(groups, key=lambda g: g.address):
+        start, end = group.address, group.address + group.count
+        if reads:
+            last_start, last_count = reads[-1]
+            last_end = last_start + last_count
+            if start - last_end <= max_gap and max(end, last_end) - last_start <= max_count:
+                reads[-1] = (last_start, max(end, last_end) - last_start)
+                continue
+        reads.append((start, end - start))
+    return reads
+
+class RegisterPoller:
+    """Sondeo periódico de registros con tasas por grupo y avisos solo ante cambios
+
+    En cada ciclo se leen juntos todos los grupos que vencen, fusionados con
+    plan_reads. Los suscriptores reciben callback(nombre_grupo, valores)
+    únicamente cuando los valores del grupo cambian.
+    """
+    def __init__(self, connection, groups=DEFAULT_POLL_GROUPS, input_registers=True, max_gap=0):
+        self.connection = connection
+        self.groups = list(groups)
+        self.input_registers = input_registers
+        self.max_gap = max_gap
+        self.subscribers = []
+        self.values = {}
+        self.running = False
+        self.thread = None
+        self.requests = 0
+        self.registers_read = 0
+        self.errors = 0
+        self._started_at = None
+
+    def subscribe(self, callback):
+        """Registrar callback(nombre_grupo, valores)"""
+        self.subscribers.append(callback)
+
+    @property
+    def registers_per_second(self):
+        if not self._started_at:
+            return 0.0
+        return self.registers_read / max(time.time() - self._started_at, 1e-9)
+
+    def start(self):
+        self.running = True
+        self._started_at = time.time()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2.0)
+            self.thread = None
+
+    def _read(self, address, count):
+        from pymodbus.exceptions import ModbusException
+        if self.input_registers:
+            operation = lambda client: client.read_input_registers(address, count=count)
+        else:
+            operation = lambda client: client.read_holding_registers(address, count=count)
+        result = self.connection.execute(operation)
+        if result.isError():
+            raise ModbusException(f"Error al leer registros {address}–{address + count - 1}")
+        return result.registers
+
+    def poll(self, groups):
+        """Leer los grupos indicados y publicar los que cambiaron"""
+        registers = {}
+        for address, count in plan_reads(groups, self.max_gap):
+            values = self._read(address, count)
+            self.requests += 1
+            self.registers_read += count
+            registers.update(zip(range(address, address + count), values))
+        
+        for group in groups:
+            values = [registers[a] for a in range(group.address, group.address + group.count)]
+            if self.values.get(group.name) != values:
+                self.values[group.name] = values
+                for callback in self.subscribers:
+                    callback(group.name, values)
+
+    def _run(self):
+        from pymodbus.exceptions import ModbusException
+        # Todos vencen ya; desde ahí cada grupo avanza en su propio intervalo
+        start = time.time()
+        next_due = {group.name: start for group in self.groups}
+        while self.running:
+            now = time.time()
+            due = [g for g in self.groups if next_due[g.name] <= now]
+            if due:
+                try:
+                    self.poll(due)
+                except (ConnectionError, ModbusException, OSError):
+                    self.errors += 1
+                for group in due:
+                    next_due[group.name] = max(next_due[group.name] + group.interval, now)
+            time.sleep(max(0.0, min(next_due.values()) - time.time()))
+
+# Resultado de un envío al PLC: éxito, latencia en segundos y valores escritos
+SendResult = namedtuple('SendResult', ['ok', 'latency', 'values'])
+
+class PLCManager:
+    def __init__(self, connection_type='none', ip='192.168.0.10', port=502, serial_port=None, baudrate=9600,
+                 pool=None, heartbeat_register=None, heartbeat_interval=1.0, send_queue_size=1,
+                 serial_protocol='auto', telemetry=True, poll_groups=None):
+        self.connection_type = connection_type
+        self.ip = ip
+        self.port = port
+        self.serial_port = serial_port
+        self.baudrate = baudrate
+        self.last_send_time = 0
+        self.min_interval = 0.1  # Mínimo 100ms entre envíos
+        self.enabled = False
+        self.serial_connection = None
+        self.serial_protocol = serial_protocol  # 'auto', 'binary' o 'ascii'
+        self.serial_mode = None  # Resultado de la negociación
+        self._frame_seq = 0
+        self.telemetry = telemetry
+        self.telemetry_buffer = TelemetryBuffer()
+        self.telemetry_reader = None
+        self.poll_groups = poll_groups
+        self.poller = None
+        self._polled_temps = np.full(5, np.nan, dtype=np.float32)
+        self.pool = pool
+        self.modbus_connection = None
+        self.heartbeat_register = heartbeat_register
+        self.heartbeat_interval = heartbeat_interval
+        self._heartbeat_stop = threading.Event()
+        
+        # Cola acotada de envíos atendida por un único hilo
+        self.send_queue_size = send_queue_size
+        self._send_queue = deque()
+        self._send_cond = threading.Condition()
+        self._sender = None
+        self._closing = False
+        
+        # Configurar según tipo de conexión
+        if connection_type == 'modbus':
+            self.enabled = MODBUS_AVAILABLE
+            if self.enabled:
+                self.initialize_modbus()
+        elif connection_type == 'serial':
+            self.enabled = SERIAL_AVAILABLE
+            self.initialize_serial()
+            
+    def initialize_modbus(self):
+        """Preparar la conexión Modbus persistente (propia o del pool) y el heartbeat"""
+        if self.pool is not None:
+            self.modbus_connection = self.pool.get(self.ip, self.port)
+        else:
+            self.modbus_connection = ModbusConnection(self.ip, self.port)
+        
+        if self.heartbeat_register is not None:
+            threading.Thread(target=self._heartbeat_loop, daemon=True).start()
+        
+        # Lectura periódica de niveles y temperaturas del PLC
+        if self.telemetry and self.poll_groups:
+            self.poller = RegisterPoller(self.modbus_connection, self.poll_groups)
+            self.poller.subscribe(self._on_registers)
+            self.poller.start()
+
+    def _on_registers(self, group, values):
+        """Convertir lecturas crudas (ADC 0–1023, como en PLC_Prueba.st) en telemetría"""
+        if group == 'temps':
+            self._polled_temps[:] = [v * 0.48828125 for v in values]
+        elif group == 'levels':
+            levels = [(v * 100) // 1023 for v in values]
+            alarms = 0
+            for i, level in enumerate(levels):
+                if level < 10:
+                    alarms |= 1 << (ALARM_CRITICAL + i)
+                elif level < 20:
+                    alarms |= 1 << (ALARM_WARNING + i)
+            self.telemetry_buffer.append(time.time(), self._polled_temps, levels, alarms)
+
+    def _heartbeat_loop(self):
+        """Escribir un contador periódico: mantiene viva la conexión y le permite
+        al PLC detectar que la HMI dejó de responder"""
+        from pymodbus.exceptions import ModbusException
+        counter = 0
+        while not self._heartbeat_stop.wait(self.heartbeat_interval):
+            counter = (counter + 1) % 65536
+            try:
+                self.modbus_connection.write_registers(self.heartbeat_register, [counter])
+            except (ConnectionError, ModbusException, OSError):
+                pass  # El backoff de la conexión espacia los reintentos
+
+    def initialize_serial(self):
+        """Inicializar conexión serial"""
+        if not SERIAL_AVAILABLE or not self.serial_port:
+            return
+        
+        import serial
+        try:
+            self.serial_connection = serial.Serial(
+                port=self.serial_port,
+                baudrate=self.baudrate,
+                timeout=1
+            )
+            print(f"✅ Conexión serial establecida en {self.serial_port}")
+        except Exception as e:
+            print(f"🛑 Error al conectar serial: {e}")
+            self.serial_connection = None
+            return
+        
+        # Lector de telemetría en segundo plano
+        if self.telemetry:
+            self.telemetry_reader = SerialTelemetryReader(self.serial_connection, self.telemetry_buffer)
+            self.telemetry_reader.start()
+            
+    def enviar_a_plc(self, c, m, y, k, w, callback=None):
+        """Encolar un envío CMYKW
+
+        Devuelve False si no hay conexión habilitada; si no, un Future cuyo
+        resultado es un SendResult. Si la cola está llena, el valor nuevo
+        reemplaza al último pendiente (gana el más reciente) y ambos Futures
+        se resuelven con ese envío, así el valor final nunca se pierde.
+        """
+        if not self.enabled:
+            return False
+        
+        future = Future()
+        if callback:
+            future.add_done_callback(callback)
+        
+        with self._send_cond:
+            if self._closing:
+                future.set_result(SendResult(False, 0.0, [c, m, y, k, w]))
+                return future
+            
+            if len(self._send_queue) >= self.send_queue_size:
+                _, futures = self._send_queue.pop()
+                futures.append(future)
+                self._send_queue.append(([c, m, y, k, w], futures))
+            else:
+                self._send_queue.append(([c, m, y, k, w], [future]))
+            
+            if self._sender is None:
+                self._sender = threading.Thread(target=self._sender_loop, daemon=True)
+                self._sender.start()
+            self._send_cond.notify()
+        
+        return future
+
+    def _sender_loop(self):
+        """Hilo único de envío: respeta el orden y el intervalo mínimo"""
+        while True:
+            with self._send_cond:
+                while not self._send_queue and not self._closing:
+                    self._send_cond.wait()
+                if not self._send_queue:
+                    return
+                
+                # Esperar el intervalo mínimo; mientras tanto los valores se combinan
+                remaining = self.last_send_time + self.min_interval - time.time()
+                if remaining > 0 and not self._closing:
+                    self._send_cond.wait(remaining)
+                    continue
+                
+                valores, futures = self._send_queue.popleft()
+            
+            self.last_send_time = time.time()
+            start = time.perf_counter()
+            try:
+                ok = self._enviar_async(*valores)
+            except Exception as e:
+                print(f"🛑 Error en el hilo de envío: {e}")
+                ok = False
+            result = SendResult(ok, time.perf_counter() - start, valores)
+            for future in futures:
+                # Quien esperaba con timeout pudo cancelar su future; el hilo sigue
+                if future.done():
+                    continue
+                try:
+                    future.set_result(result)
+                except InvalidStateError:
+                    pass
+
+    def _enviar_async(self, c, m, y, k, w):
+        """Enviar datos según el tipo de conexión"""
+        if self.connection_type == 'modbus':
+            return self._enviar_modbus(c, m, y, k, w)
+        elif self.connection_type == 'serial':
+            return self._enviar_serial(c, m, y, k, w)
+        return False
+            
+    def _enviar_modbus(self, c, m, y, k, w):
+        """Enviar datos via Modbus TCP"""
+        try:
+            valores = [c, m, y, k, w]
+            resultado = self.modbus_connection.write_registers(0, valores)
+            if resultado.isError():
+                print("❌ Error al escribir en el PLC")
+                return False
+            print(f"✅ CMYKW enviado al PLC (Modbus): {valores}")
+            return True
+        except ConnectionError:
+            print("🚫 No se pudo conectar al PLC (Modbus)")
+        except Exception as e:
+            print(f"🛑 Error de comunicación PLC (Modbus): {e}")
+        return False
+            
+    def _enviar_serial(self, c, m, y, k, w):
+        """Enviar datos via Serial"""
+        if not self.serial_connection:
+            print("🚫 No hay conexión serial establecida")
+            return False
+            
+        try:
+            if self.serial_mode is None:
+                self.serial_mode = self._negotiate_serial_protocol()
+            
+            if self.serial_mode == 'binary':
+                # Trama binaria de 9 bytes con secuencia y CRC-16
+                self.serial_connection.write(encode_frame(self._frame_seq, c, m, y, k, w))
+                self._frame_seq = (self._frame_seq + 1) & 0xFF
+                print(f"✅ CMYKW enviado por Serial (binario): {[c, m, y, k, w]}")
+            else:
+                # Formato: "C:xxx M:xxx Y:xxx K:xxx W:xxx\n"
+                data = encode_ascii(c, m, y, k, w)
+                self.serial_connection.write(data)
+                print(f"✅ CMYKW enviado por Serial: {data.decode('ascii').strip()}")
+            return True
+        except Exception as e:
+            print(f"🛑 Error de comunicación Serial: {e}")
+            return False
+            
+    def _negotiate_serial_protocol(self, attempts=3, timeout=1.0):
+        """Negociar el modo binario; si el firmware no responde, usar ASCII"""
+        if self.serial_protocol != 'auto':
+            return self.serial_protocol
+        
+        reader = self.telemetry_reader
+        try:
+            for _ in range(attempts):
+                if reader is None:
+                    self.serial_connection.reset_input_buffer()
+                else:
+                    reader.expect_reply()
+                self.serial_connection.write(NEGOTIATE_REQUEST)
+                deadline = time.time() + timeout
+                while time.time() < deadline:
+                    # Con el lector activo, las respuestas llegan por su cola
+                    if reader is not None:
+                        line = reader.read_reply(deadline - time.time()) or b""
+                    else:
+                        line = self.serial_connection.readline()
+                    if line.startswith(NEGOTIATE_REPLY):
+                        print("✅ Protocolo serial binario negociado")
+                        return 'binary'
+                    if line.startswith(b"Error"):
+                        # Firmware antiguo: no entiende el comando
+                        return 'ascii'
+            return 'ascii'
+        finally:
+            if reader is not None:
+                reader.end_reply()
+            
+    def close(self):
+        """Cerrar conexiones (tras vaciar la cola de envíos pendientes)"""
+        with self._send_cond:
+            self._closing = True
+            self._send_cond.notify()
+        if self._sender is not None:
+            self._sender.join(timeout=5.0)
+        self._heartbeat_stop.set()
+        if self.telemetry_reader is not None:
+            self.telemetry_reader.stop()
+        if self.poller is not None:
+            self.poller.stop()
+        # Las conexiones de un pool compartido las cierra su dueño
+        if self.modbus_connection is not None and self.pool is None:
+            self.modbus_connection.close()
+        if self.serial_connection and self.serial_connection.is_open:
+            self.serial_connection.close()
+
+def plc_manager_from_config(config, **overrides):
+    """Crear el PLCManager a partir de color_app_config.json (ya cargado)"""
+    options = dict(
+        connection_type=config.get('connection_type', 'none'),
+        ip=config.get('plc_ip', '192.168.0.10'),
+        port=config.get('plc_port', 502),
+        serial_port=config.get('serial_port'),
+        baudrate=config.get('baudrate', 9600),
+        heartbeat_register=config.get('heartbeat_register'),
+        heartbeat_interval=config.get('heartbeat_interval', 1.0),
+        serial_protocol=config.get('serial_protocol', 'auto'),
+        poll_groups=DEFAULT_POLL_GROUPS if config.get('poll_registers', False) else None,
+    )
+    options.update(overrides)
+    return PLCManager(**options)
@@ -0,0 +1,195 @@
+"""Transporte asíncrono (asyncio) para varias estaciones de mezcla
+
+Un solo proceso mantiene conexiones abiertas con decenas de mezcladoras
+(Modbus TCP o serial), reparte recetas CMYKW a todas a la vez y reúne las
+confirmaciones en paralelo, con un timeout propio por estación.
+"""
+import asyncio
+import re
+import time
+from collections import namedtuple
+from importlib.util import find_spec
+
+from serial_protocol import encode_ascii
+
+# pymodbus y pyserial-asyncio se importan al crear cada estación
+MODBUS_AVAILABLE = find_spec('pymodbus') is not None
+SERIAL_ASYNC_AVAILABLE = find_spec('serial_asyncio') is not None
+
+# Resultado del envío a una estación
+StationResult = namedtuple('StationResult', ['station', 'ok', 'latency', 'error'])
+
+
+class AsyncModbusStation:
+    """Mezcladora conectada por Modbus TCP (registros holding 0–4)"""
+    def __init__(self, name, ip, port=502, register=0, timeout=1.0):
+        if not MODBUS_AVAILABLE:
+            raise RuntimeError("pymodbus no está instalado. Ejecuta: pip install pymodbus")
+        self.name = name
+        self.ip = ip
+        self.port = port
+        self.register = register
+        self.timeout = timeout
+        from pymodbus.client import AsyncModbusTcpClient
+        self.client = AsyncModbusTcpClient(ip, port=port, timeout=timeout)
+        self.lock = asyncio.Lock()
+
+    async def connect(self):
+        """Abrir la conexión (idempotente)"""
+        if not self.client.connected:
+            await self.client.connect()
+        return self.client.connected
+
+    async def send(self, c, m, y, k, w):
+        """Escribir la receta; la respuesta Modbus es la confirmación"""
+        from pymodbus.exceptions import ModbusException
+        async with self.lock:
+            if not await self.connect():
+                raise ConnectionError(f"No se pudo conectar a {self.ip}:{self.port}")
+            result = await self.client.write_registers(self.register, [c, m, y, k, w])
+            if result.isError():
+                raise ModbusException(f"El PLC rechazó la escritura: {result}")
+            return True
+
+    async def close(self):
+        """Cerrar la conexión"""
+        self.client.close()
+
+
+class AsyncSerialStation:
+    """Mezcladora conectada por puerto serial (protocolo ASCII de Sensores.ino)
+
+    La confirmación es la línea "CMYKW Recibido: C:.. M:.. Y:.. K:.. W:.." que
+    devuelve el Arduino con los valores recibidos; las líneas de telemetría
+    intermedias se ignoran. Solo cuenta el eco de la receta enviada: una
+    confirmación tardía de un envío que venció su timeout no confirma el
+    siguiente.
+    """
+    ACK_PATTERN = re.compile(rb"CMYKW Recibido: C:(\d+) M:(\d+) Y:(\d+) K:(\d+) W:(\d+)")
+
+    def __init__(self, name, serial_port, baudrate=9600, timeout=2.0):
+        if not SERIAL_ASYNC_AVAILABLE:
+            raise RuntimeError("pyserial-asyncio no está instalado. Ejecuta: pip install pyserial-asyncio")
+        self.name = name
+        self.serial_port = serial_port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+        self.lock = asyncio.Lock()
+
+    async def connect(self):
+        """Abrir el puerto (idempotente)"""
+        if self.writer is None:
+            import serial_asyncio
+            self.reader, self.writer = await serial_asyncio.open_serial_connection(
+                url=self.serial_port, baudrate=self.baudrate
+            )
+        return True
+
+    async def send(self, c, m, y, k, w):
+        """Escribir la trama ASCII y esperar la confirmación con los mismos valores"""
+        sent = tuple(int(v) for v in (c, m, y, k, w))
+        async with self.lock:
+            await self.connect()
+            self.writer.write(encode_ascii(*sent))
+            await self.writer.drain()
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    raise ConnectionError(f"Puerto {self.serial_port} cerrado")
+                ack = self.ACK_PATTERN.match(line)
+                if ack and tuple(int(v) for v in ack.groups()) == sent:
+                    return True
+
+    async def close(self):
+        """Cerrar el puerto"""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            self.reader = None
+
+
+class StationRegistry:
+    """Registro de estaciones de mezcla por nombre"""
+    def __init__(self):
+        self.stations = {}
+
+    def add(self, station):
+        """Registrar una estación (reemplaza otra con el mismo nombre)"""
+        self.stations[station.name] = station
+        return station
+
+    def remove(self, name):
+        """Quitar una estación del registro"""
+        return self.stations.pop(name, None)
+
+    def get(self, name):
+        return self.stations[name]
+
+    @property
+    def names(self):
+        return list(self.stations)
+
+    async def connect_all(self):
+        """Conectar todas las estaciones en paralelo; devuelve {nombre: ok}"""
+        names = self.names
+        results = await asyncio.gather(
+            *(asyncio.wait_for(self.stations[n].connect(), self.stations[n].timeout) for n in names),
+            return_exceptions=True
+        )
+        return {n: r is True for n, r in zip(names, results)}
+
+    async def send(self, name, recipe):
+        """Enviar una receta (c, m, y, k, w) a una estación con su timeout"""
+        station = self.stations[name]
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(station.send(*recipe), station.timeout)
+            return StationResult(name, True, time.perf_counter() - start, None)
+        except asyncio.TimeoutError:
+            return StationResult(name, False, time.perf_counter() - start, "timeout")
+        except (ConnectionError, OSError, RuntimeError) as e:
+            return StationResult(name, False, time.perf_counter() - start, str(e))
+        except Exception as e:
+            return StationResult(name, False, time.perf_counter() - start, repr(e))
+
+    async def fan_out(self, recipes):
+        """Repartir recetas en paralelo y reunir las confirmaciones
+
+        `recipes` es una receta única para todas las estaciones o un dict
+        {nombre: receta}. Devuelve {nombre: StationResult}.
+        """
+        if not isinstance(recipes, dict):
+            recipes = {name: recipes for name in self.stations}
+        results = await asyncio.gather(*(self.send(n, r) for n, r in recipes.items()))
+        return {result.station: result for result in results}
+
+    async def close_all(self):
+        """Cerrar todas las conexiones"""
+        await asyncio.gather(*(s.close() for s in self.stations.values()), return_exceptions=True)
+
+
+def registry_from_config(config):
+    """Crear el registro a partir de la clave 'stations' de la configuración
+
+    Cada estación es un dict con 'name', 'type' ('modbus' o 'serial') y sus
+    parámetros: 'ip'/'port' o 'serial_port'/'baudrate', más 'timeout'.
+    Se llama dentro del bucle de asyncio: el cliente de pymodbus se crea
+    sobre el bucle activo.
+    """
+    registry = StationRegistry()
+    for entry in config.get('stations', []):
+        if entry.get('type') == 'modbus':
+            registry.add(AsyncModbusStation(
+                entry['name'], entry['ip'], entry.get('port', 502),
+                timeout=entry.get('timeout', 1.0)
+            ))
+        elif entry.get('type') == 'serial':
+            registry.add(AsyncSerialStation(
+                entry['name'], entry['serial_port'], entry.get('baudrate', 9600),
+                timeout=entry.get('timeout', 2.0)
+            ))
+        else:
+            raise ValueError(f"Tipo de estación no válido: {entry.get('type')}")
+    return registry
@@ -0,0 +1,406 @@
+"""Servicio HTTP/JSON de recetas para el MES (sin interfaz gráfica)
+
+Servidor asyncio de la biblioteca estándar con:
+
+- POST /convert   {"rgb": [[r, g, b], ...]} -> {"cmykw": [[c, m, y, k, w], ...]}
+- POST /dispatch  {"cmykw": [c, m, y, k, w]} o {"rgb": [r, g, b]}, con "wait"
+                  opcional (por defecto true); encola el envío en el PLCManager
+- GET  /metrics   histogramas de latencia por endpoint y contadores
+- GET  /health
+
+Las conversiones concurrentes se agrupan en micro-lotes (una sola llamada
+vectorizada por ventana), cada endpoint tiene su propio límite de
+concurrencia y los envíos al PLC pasan por la cola coalescente del
+PLCManager. Con --fake-plc se puede probar bajo carga sin hardware:
+
+    python recipe_service.py --port 8080 --fake-plc
+"""
+import argparse
+import asyncio
+import json
+import time
+from bisect import bisect_left
+
+import numpy as np
+
+from conversion import load_config, rgb_to_cmykw_array
+from pigment_model import load_recipe_converter
+from plc import PLCManager, plc_manager_from_config
+
+MAX_BODY_BYTES = 8 * 1024 * 1024
+MAX_COLORS_PER_REQUEST = 100000
+
+HTTP_STATUS = {
+    200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 431: "Request Header Fields Too Large",
+    500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout",
+}
+
+class HTTPError(Exception):
+    """Error que se responde al cliente con su código HTTP"""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# ---------- MÉTRICAS ----------
+class LatencyHistogram:
+    """Histograma de latencias con cubetas fijas en milisegundos"""
+    BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+
+    def __init__(self):
+        self.counts = [0] * len(self.BOUNDS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, seconds):
+        ms = seconds * 1000
+        self.counts[bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q):
+        """Cota superior de la cubeta que contiene el percentil q (0–100)"""
+        if not self.count:
+            return 0.0
+        target = self.count * q / 100
+        seen = 0
+        for bound, count in zip(self.BOUNDS_MS, self.counts):
+            seen += count
+            if seen >= target:
+                return round(min(bound, self.max_ms), 3)
+        return round(self.max_ms, 3)
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max_ms, 3),
+            'buckets': {('+inf' if b == float('inf') else str(b)): c
+                        for b, c in zip(self.BOUNDS_MS, self.counts)},
+        }
+
+# ---------- MICRO-LOTES DE CONVERSIÓN ----------
+class ConversionBatcher:
+    """Agrupa las conversiones concurrentes en una sola llamada vectorizada
+
+    Cada petición espera como mucho `window` segundos; con 0 el lote reúne
+    las peticiones que llegan en la misma vuelta del bucle de eventos, sin
+    agregar latencia. Si se acumulan más de `max_colors` colores el lote se
+    procesa de inmediato y los lotes grandes se convierten en un hilo para
+    no bloquear el bucle.
+    """
+    def __init__(self, convert, window=0.0, max_colors=65536, offload_colors=20000):
+        self.convert = convert
+        self.window = window
+        self.max_colors = max_colors
+        self.offload_colors = offload_colors
+        self._pending = []
+        self._pending_colors = 0
+        self._flush_handle = None
+        self.requests = 0
+        self.batches = 0
+        self.colors = 0
+
+    async def submit(self, rgb):
+        """Convertir un arreglo (N, 3) uint8; devuelve (N, 5) uint8"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((rgb, future))
+        self._pending_colors += len(rgb)
+        self.requests += 1
+
+        if self._pending_colors >= self.max_colors:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        self._pending_colors = 0
+        if not batch:
+            return
+
+        self.batches += 1
+        rgb = np.concatenate([item[0] for item in batch]) if len(batch) > 1 else batch[0][0]
+        self.colors += len(rgb)
+        if len(rgb) >= self.offload_colors:
+            task = asyncio.get_running_loop().run_in_executor(None, self.convert, rgb)
+            task.add_done_callback(lambda t: self._resolve(batch, t))
+        else:
+            try:
+                self._resolve(batch, result=self.convert(rgb))
+            except Exception as e:
+                self._resolve(batch, error=e)
+
+    def _resolve(self, batch, task=None, result=None, error=None):
+        """Repartir el resultado del lote entre las peticiones que lo forman"""
+        if task is not None:
+            error = task.exception()
+            result = None if error else task.result()
+        offset = 0
+        for rgb, future in batch:
+            # Una petición cancelada (cliente desconectado) igual ocupa su tramo
+            if not future.done():
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result[offset:offset + len(rgb)])
+            offset += len(rgb)
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'colors': self.colors,
+            'requests_per_batch': round(self.requests / self.batches, 2) if self.batches else 0.0,
+        }
+
+# ---------- PLC SIMULADO ----------
+class FakePLCManager(PLCManager):
+    """PLCManager sin hardware: misma cola coalescente, envío simulado
+
+    Cada escritura tarda `latency` segundos, como un round-trip Modbus, y se
+    guarda en `writes` para comprobar qué llegó realmente al mezclador.
+    """
+    def __init__(self, latency=0.005, min_interval=0.1, **kwargs):
+        super().__init__(connection_type='fake', **kwargs)
+        self.enabled = True
+        self.latency = latency
+        self.min_interval = min_interval
+        self.writes = []
+
+    def _enviar_async(self, c, m, y, k, w):
+        time.sleep(self.latency)
+        self.writes.append((c, m, y, k, w))
+        return True
+
+# ---------- SERVIDOR ----------
+class RecipeService:
+    """Servidor HTTP/1.1 (keep-alive) con los endpoints de recetas"""
+    DEFAULT_LIMITS = {'/convert': 64, '/dispatch': 16}
+
+    def __init__(self, plc=None, convert=None, batch_window=0.0, limits=None,
+                 queue_timeout=1.0, dispatch_timeout=5.0):
+        self.plc = plc
+        convert = convert or rgb_to_cmykw_array
+        self.batcher = ConversionBatcher(convert, batch_window) if batch_window is not None else None
+        self.convert = convert
+        self.limits = dict(self.DEFAULT_LIMITS, **(limits or {}))
+        self.queue_timeout = queue_timeout
+        self.dispatch_timeout = dispatch_timeout
+        self.histograms = {}
+        self.rejected = {}
+        self.in_flight = {}
+        self.dispatched = 0
+        self.coalesced = 0
+        self._semaphores = {}
+        self.routes = {
+            ('GET', '/health'): self.handle_health,
+            ('GET', '/metrics'): self.handle_metrics,
+            ('POST', '/convert'): self.handle_convert,
+            ('POST', '/dispatch'): self.handle_dispatch,
+        }
+
+    async def start(self, host='127.0.0.1', port=8080):
+        """Abrir el socket; devuelve el asyncio.Server"""
+        # Los semáforos se crean dentro del bucle que los va a usar
+        self._semaphores = {path: asyncio.Semaphore(n) for path, n in self.limits.items()}
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    # --- Protocolo HTTP ---
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._write(writer, 431, {'error': "Encabezados demasiado grandes"}, False)
+                    break
+
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ', 2)
+                except ValueError:
+                    await self._write(writer, 400, {'error': "Línea de petición inválida"}, False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(':')
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                length = headers.get('content-length', '') or '0'
+                if not (length.isascii() and length.isdigit()):
+                    await self._write(writer, 400, {'error': "Content-Length inválido"}, False)
+                    break
+                length = int(length)
+                if length > MAX_BODY_BYTES:
+                    await self._write(writer, 413, {'error': "Cuerpo demasiado grande"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self._dispatch_request(method, target.split('?', 1)[0], body)
+                await self._write(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _write(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {HTTP_STATUS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+
+    async def _dispatch_request(self, method, path, body):
+        """Enrutar, aplicar el límite de concurrencia y medir la latencia"""
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                return 405, {'error': f"Método {method} no permitido en {path}"}
+            return 404, {'error': f"Ruta no encontrada: {path}"}
+
+        start = time.perf_counter()
+        semaphore = self._semaphores.get(path)
+        try:
+            if semaphore is not None:
+                try:
+                    await asyncio.wait_for(semaphore.acquire(), self.queue_timeout)
+                except asyncio.TimeoutError:
+                    self.rejected[path] = self.rejected.get(path, 0) + 1
+                    return 503, {'error': "Servicio ocupado, reintenta más tarde"}
+            self.in_flight[path] = self.in_flight.get(path, 0) + 1
+            try:
+                data = json.loads(body) if body else {}
+                if not isinstance(data, dict):
+                    raise HTTPError(400, "El cuerpo debe ser un objeto JSON")
+                return await handler(data)
+            finally:
+                self.in_flight[path] -= 1
+                if semaphore is not None:
+                    semaphore.release()
+        except HTTPError as e:
+            return e.status, {'error': str(e)}
+        except (ValueError, TypeError, KeyError) as e:
+            return 400, {'error': f"Petición inválida: {e}"}
+        except Exception as e:
+            print(f"🛑 Error en {path}: {e!r}")
+            return 500, {'error': "Error interno"}
+        finally:
+            self.histograms.setdefault(path, LatencyHistogram()).record(time.perf_counter() - start)
+
+    # --- Endpoints ---
+    async def handle_health(self, data):
+        return 200, {'status': 'ok', 'plc': bool(self.plc and self.plc.enabled)}
+
+    async def handle_metrics(self, data):
+        return 200, {
+            'endpoints': {path: h.snapshot() for path, h in self.histograms.items()},
+            'in_flight': self.in_flight,
+            'rejected': self.rejected,
+            'batcher': self.batcher.stats() if self.batcher else None,
+            'dispatch': {'requests': self.dispatched, 'coalesced': self.coalesced},
+        }
+
+    async def handle_convert(self, data):
+        rgb = parse_colors(data.get('rgb'), 3, 255)
+        if len(rgb) > MAX_COLORS_PER_REQUEST:
+            raise HTTPError(413, f"Máximo {MAX_COLORS_PER_REQUEST} colores por petición")
+        cmykw = await self.batcher.submit(rgb) if self.batcher else self.convert(rgb)
+        return 200, {'cmykw': cmykw.tolist()}
+
+    async def handle_dispatch(self, data):
+        if self.plc is None or not self.plc.enabled:
+            raise HTTPError(503, "No hay conexión con el PLC habilitada")
+        if 'cmykw' in data:
+            recipe = [int(v) for v in parse_colors(data['cmykw'], 5, 100)[0]]
+        else:
+            recipe = [int(v) for v in self.convert(parse_colors(data.get('rgb'), 3, 255))[0]]
+
+        future = self.plc.enviar_a_plc(*recipe)
+        self.dispatched += 1
+        if not data.get('wait', True):
+            return 202, {'queued': True, 'values': recipe}
+
+        try:
+            # shield: el timeout no cancela el future que completa el hilo de envío
+            result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)),
+                                            self.dispatch_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPError(504, "El PLC no confirmó el envío a tiempo")
+        coalesced = list(result.values) != recipe
+        self.coalesced += coalesced
+        return 200, {
+            'ok': result.ok,
+            'latency_ms': round(result.latency * 1000, 3),
+            'values': list(result.values),
+            'coalesced': coalesced,
+        }
+
+def parse_colors(value, channels, maximum):
+    """Validar una lista de colores (o un color suelto) de enteros como arreglo (N, canales) uint8"""
+    if value is None:
+        raise ValueError("falta la lista de colores")
+    colors = np.asarray(value)
+    if colors.ndim == 1:
+        colors = colors[None, :]
+    if colors.ndim != 2 or colors.shape[1] != channels or colors.shape[0] == 0:
+        raise ValueError(f"se esperaban colores de {channels} componentes")
+    # Solo enteros: 12.7 o NaN no se truncan en silencio
+    if not np.issubdtype(colors.dtype, np.integer) or colors.min() < 0 or colors.max() > maximum:
+        raise ValueError(f"los componentes deben ser enteros entre 0 y {maximum}")
+    return colors.astype(np.uint8)
+
+# ---------- FUNCIÓN PRINCIPAL ----------
+async def serve(service, host, port):
+    server = await service.start(host, port)
+    print(f"✅ Servicio de recetas en http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON de recetas CMYKW")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--config', default="color_app_config.json")
+    parser.add_argument('--fake-plc', action='store_true', help="Simular el PLC (pruebas de carga)")
+    parser.add_argument('--fake-latency', type=float, default=0.005, help="Latencia simulada por envío (s)")
+    parser.add_argument('--batch-window', type=float, default=0.0,
+                        help="Ventana de micro-lotes en ms (negativo para desactivar)")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    if args.fake_plc:
+        plc = FakePLCManager(latency=args.fake_latency, telemetry=False)
+    else:
+        plc = plc_manager_from_config(config)
+
+    window = args.batch_window / 1000 if args.batch_window >= 0 else None
+    service = RecipeService(plc, load_recipe_converter(config), batch_window=window)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        plc.close()
+
+if __name__ == "__main__":
+    main()
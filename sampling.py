@@ -0,0 +1,288 @@
+"""Muestreo de color: captura de cámara, regiones de interés y seguimiento en vivo
+
+OpenCV se importa al abrir la cámara; el muestreo de ROI y k-means solo
+necesitan NumPy.
+"""
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from conversion import rgb_to_cmykw
+
+# ---------- CAPTURA DE CÁMARA ----------
+class CameraCapture:
+    """Hilo productor dueño de cv2.VideoCapture
+
+    Publica solo el frame más reciente: cada frame nuevo reemplaza al
+    anterior aunque nadie lo haya leído, así los consumidores (la GUI) solo
+    toman el último y un frame viejo nunca se acumula.
+    
+    Los frames se escriben en un anillo de `buffers` arreglos preasignados
+    (resize y cvtColor con dst=), sin asignar memoria por frame. Un frame
+    publicado sigue siendo válido hasta que el productor da la vuelta al
+    anillo: quien necesite conservarlo más tiempo debe copiarlo. `source`
+    puede ser un índice/URL de OpenCV o un objeto con read() y release().
+    """
+    def __init__(self, source=0, size=(450, 350), buffers=3):
+        self.source = source
+        self.size = size
+        width, height = size
+        self.buffers = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(buffers)]
+        self.running = False
+        self.thread = None
+        self.capture_fps = 0.0
+        self._lock = threading.Lock()
+        self._new_frame = threading.Condition(self._lock)
+        self._frame = None
+        self._seq = 0
+
+    def start(self):
+        """Abrir la cámara e iniciar el hilo de captura"""
+        if hasattr(self.source, 'read'):
+            cap = self.source
+        else:
+            import cv2
+            cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            cap.release()
+            return False
+        
+        self.running = True
+        self.thread = threading.Thread(target=self._run, args=(cap,), daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        """Detener el hilo de captura (el hilo libera la cámara al salir)"""
+        self.running = False
+        with self._new_frame:
+            self._new_frame.notify_all()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def latest(self):
+        """Devuelve (secuencia, frame RGB) del frame más reciente"""
+        with self._lock:
+            return self._seq, self._frame
+
+    def wait_newer(self, seq, timeout=0.5):
+        """Esperar un frame más nuevo que seq; devuelve (secuencia, frame)"""
+        with self._new_frame:
+            self._new_frame.wait_for(lambda: self._seq != seq or not self.running, timeout)
+            return self._seq, self._frame
+
+    def _run(self, cap):
+        """Bucle de captura: leer, redimensionar y convertir fuera del hilo de Tk"""
+        import cv2
+        count = 0
+        window_start = time.time()
+        width, height = self.size
+        raw = None
+        resized = np.empty((height, width, 3), dtype=np.uint8)
+        slot = 0
+        try:
+            while self.running:
+                # La cámara reutiliza el buffer del frame anterior si coincide el tamaño
+                ret, frame = cap.read(raw)
+                if not ret:
+                    time.sleep(0.01)
+                    continue
+                raw = frame
+                
+                frame_rgb = self.buffers[slot]
+                slot = (slot + 1) % len(self.buffers)
+                if frame.shape[:2] == (height, width):
+                    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame_rgb)
+                else:
+                    cv2.resize(frame, self.size, dst=resized)
+                    cv2.cvtColor(resized, cv2.COLOR_BGR2RGB, dst=frame_rgb)
+                
+                with self._new_frame:
+                    self._frame = frame_rgb
+                    self._seq += 1
+                    self._new_frame.notify_all()
+                
+                # FPS de captura por ventana de un segundo
+                count += 1
+                now = time.time()
+                if now - window_start >= 1.0:
+                    self.capture_fps = count / (now - window_start)
+                    count = 0
+                    window_start = now
+        finally:
+            cap.release()
+
+# ---------- MUESTREO DE COLOR ----------
+ROI_SHAPES = ('square', 'circle')
+ROI_MODES = ('mean', 'median', 'trimmed', 'kmeans')
+
+def roi_pixels(image, x, y, radius, shape='square'):
+    """Píxeles (N, 3) de la región de interés centrada en (x, y)
+
+    Trabaja sobre una vista del buffer de la imagen: solo se copian los
+    píxeles de la región, nunca la imagen completa.
+    """
+    height, width = image.shape[:2]
+    x0, x1 = max(0, x - radius), min(width, x + radius + 1)
+    y0, y1 = max(0, y - radius), min(height, y + radius + 1)
+    region = image[y0:y1, x0:x1, :3]
+    
+    if shape == 'circle':
+        yy, xx = np.ogrid[y0 - y:y1 - y, x0 - x:x1 - x]
+        return region[xx * xx + yy * yy <= radius * radius]
+    return region.reshape(-1, 3)
+
+def kmeans_colors(pixels, k=3, iterations=10, seed=0):
+    """K-means vectorizado sobre píxeles (N, 3); devuelve (centros, conteos)"""
+    pixels = np.asarray(pixels, dtype=np.float64)
+    k = min(k, len(pixels))
+    rng = np.random.default_rng(seed)
+    centers = pixels[rng.choice(len(pixels), size=k, replace=False)]
+    
+    for _ in range(iterations):
+        # |p - c|² = |p|² - 2 p·c + |c|²; |p|² no cambia el argmin
+        distances = (centers ** 2).sum(axis=1) - 2.0 * (pixels @ centers.T)
+        labels = distances.argmin(axis=1)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.stack([np.bincount(labels, weights=pixels[:, c], minlength=k)
+                         for c in range(3)], axis=1)
+        # Los clusters vacíos conservan su centro anterior
+        filled = counts > 0
+        new_centers = centers.copy()
+        new_centers[filled] = sums[filled] / counts[filled, None]
+        if np.allclose(new_centers, centers):
+            break
+        centers = new_centers
+    
+    return centers, counts
+
+def sample_roi(image, x, y, radius=2, shape='square', mode='median', trim=0.1, k=3):
+    """Color representativo (r, g, b) de una región de interés
+
+    Modos: 'mean', 'median', 'trimmed' (media recortada por canal) y
+    'kmeans' (centro del cluster dominante).
+    """
+    pixels = roi_pixels(image, x, y, radius, shape)
+    if len(pixels) == 0:
+        raise ValueError("La región de interés está fuera de la imagen")
+    
+    if mode == 'mean':
+        color = pixels.mean(axis=0)
+    elif mode == 'median':
+        color = np.median(pixels, axis=0)
+    elif mode == 'trimmed':
+        ordered = np.sort(pixels, axis=0)
+        cut = int(len(ordered) * trim)
+        color = ordered[cut:len(ordered) - cut].mean(axis=0)
+    elif mode == 'kmeans':
+        centers, counts = kmeans_colors(pixels, k)
+        color = centers[counts.argmax()]
+    else:
+        raise ValueError(f"Modo de muestreo no válido: {mode}")
+    
+    return tuple(int(v) for v in np.clip(np.round(color), 0, 255))
+
+# ---------- SEGUIMIENTO EN VIVO ----------
+class LiveColorTracker:
+    """Hilo que sigue el color de una ROI fija en cada frame y lo envía al PLC
+
+    El color se suaviza con una media móvil exponencial ('ema') o una mediana
+    de ventana ('median'), y solo se envía al PLC cuando algún canal CMYKW se
+    aleja más de `deadband` puntos del último valor enviado.
+    """
+    def __init__(self, camera, plc, convert=None, roi=None, radius=5, shape='square',
+                 mode='median', smoothing='ema', alpha=0.3, window=5, deadband=2):
+        self.camera = camera
+        self.plc = plc
+        self.convert = convert or rgb_to_cmykw
+        self.roi = roi
+        self.radius = radius
+        self.shape = shape
+        self.mode = mode
+        self.smoothing = smoothing
+        self.alpha = alpha
+        self.deadband = deadband
+        self.running = False
+        self.thread = None
+        self.latest_rgb = None
+        self.latest_cmykw = None
+        self.last_sent = None
+        self.sent_count = 0
+        self._pending = None  # Receta enviada sin resultado todavía
+        self._ema = None
+        self._window = deque(maxlen=window)
+
+    def start(self):
+        """Iniciar el hilo de seguimiento"""
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Detener el hilo de seguimiento"""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def roi_center(self, frame):
+        """Centro de la ROI: configurado o el centro del frame"""
+        if self.roi:
+            return self.roi
+        height, width = frame.shape[:2]
+        return width // 2, height // 2
+
+    def _smooth(self, rgb):
+        """Suavizar el color muestreado"""
+        if self.smoothing == 'median':
+            self._window.append(rgb)
+            return np.median(self._window, axis=0)
+        if self._ema is None:
+            self._ema = rgb
+        else:
+            self._ema = self.alpha * rgb + (1 - self.alpha) * self._ema
+        return self._ema
+
+    def _run(self):
+        """Bucle de seguimiento: un muestreo por frame nuevo"""
+        seq = 0
+        while self.running:
+            seq, frame = self.camera.wait_newer(seq)
+            if frame is None or not self.running:
+                continue
+            
+            x, y = self.roi_center(frame)
+            try:
+                rgb = np.array(sample_roi(frame, x, y, self.radius, self.shape, self.mode), dtype=np.float64)
+            except ValueError:
+                continue
+            
+            r, g, b = (int(v) for v in np.round(self._smooth(rgb)))
+            cmykw = self.convert(r, g, b)
+            self.latest_rgb = (r, g, b)
+            self.latest_cmykw = cmykw
+            
+            # Banda muerta frente al envío en curso o al último confirmado:
+            # no inundar el PLC con cambios mínimos
+            reference = self._pending or self.last_sent
+            if reference is not None and \
+                    max(abs(new - old) for new, old in zip(cmykw, reference)) <= self.deadband:
+                continue
+            
+            future = self.plc.enviar_a_plc(*cmykw)
+            if future is not False:
+                self._pending = cmykw
+                future.add_done_callback(lambda f, cmykw=cmykw: self._on_sent(cmykw, f.result()))
+
+    def _on_sent(self, cmykw, result):
+        """Resultado de un envío: solo uno confirmado cuenta para la banda muerta;
+        si falla, el próximo frame lo reintenta"""
+        if result.ok:
+            # Si el PLCManager combinó envíos, lo enviado es result.values
+            self.last_sent = tuple(result.values)
+            self.sent_count += 1
+        if self._pending == cmykw:
+            self._pending = None
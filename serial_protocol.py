@@ -0,0 +1,119 @@
+"""Protocolo serial binario compacto para recetas CMYKW
+
+Trama de 9 bytes (frente a los 30 de "C:xxx M:xxx Y:xxx K:xxx W:xxx\\n"):
+
+    0xA5 | seq | C | M | Y | K | W | CRC16 (big-endian)
+
+- 0xA5 marca el inicio; no es ASCII, así el Arduino distingue una trama
+  binaria de una línea de texto con solo mirar el primer byte.
+- seq es un contador de 8 bits: un salto indica tramas perdidas.
+- C..W son porcentajes 0–100 (uint8).
+- CRC-16/CCITT-FALSE (polinomio 0x1021, inicial 0xFFFF) sobre seq..W.
+
+El modo binario se negocia enviando "PROTO BIN\\n"; un firmware que lo
+soporta responde "PROTO BIN OK". Si no hay respuesta se usa el formato ASCII.
+"""
+
+FRAME_START = 0xA5
+FRAME_SIZE = 9
+NEGOTIATE_REQUEST = b"PROTO BIN\n"
+NEGOTIATE_REPLY = b"PROTO BIN OK"
+
+
+class FrameError(ValueError):
+    """Trama binaria inválida (tamaño, inicio, CRC o valores fuera de rango)"""
+
+
+def _crc16_table():
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        table.append(crc & 0xFFFF)
+    return table
+
+_CRC16_TABLE = _crc16_table()
+
+
+def crc16_ccitt(data, crc=0xFFFF):
+    """CRC-16/CCITT-FALSE de una secuencia de bytes"""
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC16_TABLE[(crc >> 8) ^ byte]
+    return crc
+
+
+def encode_frame(seq, c, m, y, k, w):
+    """Codificar una receta CMYKW como trama binaria"""
+    values = (c, m, y, k, w)
+    if not all(0 <= v <= 100 for v in values):
+        raise FrameError(f"Valores CMYKW fuera de rango: {values}")
+    body = bytes((seq & 0xFF,) + tuple(int(v) for v in values))
+    crc = crc16_ccitt(body)
+    return bytes((FRAME_START,)) + body + bytes((crc >> 8, crc & 0xFF))
+
+
+def decode_frame(frame):
+    """Decodificar una trama completa; devuelve (seq, (c, m, y, k, w))"""
+    if len(frame) != FRAME_SIZE:
+        raise FrameError(f"Tamaño de trama inválido: {len(frame)}")
+    if frame[0] != FRAME_START:
+        raise FrameError("Byte de inicio inválido")
+    if crc16_ccitt(frame[1:7]) != (frame[7] << 8 | frame[8]):
+        raise FrameError("CRC inválido")
+    values = tuple(frame[2:7])
+    if not all(v <= 100 for v in values):
+        raise FrameError(f"Valores CMYKW fuera de rango: {values}")
+    return frame[1], values
+
+
+def encode_ascii(c, m, y, k, w):
+    """Formato ASCII de respaldo: "C:xxx M:xxx Y:xxx K:xxx W:xxx\\n" """
+    return f"C:{c:03d} M:{m:03d} Y:{y:03d} K:{k:03d} W:{w:03d}\n".encode('ascii')
+
+
+class FrameDecoder:
+    """Parser incremental de referencia del lado Python
+
+    Recibe bytes en fragmentos arbitrarios, se resincroniza buscando 0xA5
+    tras una trama corrupta y cuenta errores de CRC y tramas perdidas según
+    los saltos del número de secuencia.
+    """
+    def __init__(self):
+        self.buffer = bytearray()
+        self.last_seq = None
+        self.crc_errors = 0
+        self.lost_frames = 0
+        self.skipped_bytes = 0
+
+    def feed(self, data):
+        """Agregar bytes y devolver la lista de (seq, valores) decodificados"""
+        self.buffer.extend(data)
+        frames = []
+        while True:
+            start = self.buffer.find(FRAME_START)
+            if start < 0:
+                self.skipped_bytes += len(self.buffer)
+                self.buffer.clear()
+                break
+            if start:
+                self.skipped_bytes += start
+                del self.buffer[:start]
+            if len(self.buffer) < FRAME_SIZE:
+                break
+
+            try:
+                seq, values = decode_frame(bytes(self.buffer[:FRAME_SIZE]))
+            except FrameError:
+                # Descartar solo el byte de inicio y buscar el siguiente
+                self.crc_errors += 1
+                self.skipped_bytes += 1
+                del self.buffer[:1]
+                continue
+
+            del self.buffer[:FRAME_SIZE]
+            if self.last_seq is not None:
+                self.lost_frames += (seq - self.last_seq - 1) & 0xFF
+            self.last_seq = seq
+            frames.append((seq, values))
+        return frames
@@ -0,0 +1,6 @@
+"""Las pruebas importan los módulos desde la raíz del repositorio"""
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
@@ -0,0 +1,40 @@
+"""CLI de procesamiento por lotes: validación de argumentos"""
+import pytest
+
+from batch import run_batch
+
+@pytest.mark.parametrize('argv', [
+    ['.', '--roi', '10,20'],
+    ['.', '--roi', 'a,b,c'],
+    ['.', '--roi', '10,20,-1'],
+    ['.', '--target', '255,0'],
+    ['.', '--target', '300,0,0'],
+    ['.', '--mode', 'trimmed'],
+])
+def test_invalid_arguments_exit_with_usage_error(argv, capsys):
+    with pytest.raises(SystemExit) as exc:
+        run_batch(argv)
+    assert exc.value.code == 2
+    assert 'error:' in capsys.readouterr().err
+
+def test_trimmed_mode_with_roi(tmp_path, capsys):
+    from PIL import Image
+    Image.new('RGB', (8, 8), (200, 100, 50)).save(tmp_path / 'a.png')
+    output = tmp_path / 'recetas.json'
+    assert run_batch([str(tmp_path), '--roi', '4,4,2', '--mode', 'trimmed',
+                      '--workers', '1', '-f', 'json', '-o', str(output)]) == 0
+    assert '"r": 200' in output.read_text()
+
+def test_bad_images_are_reported_per_file(tmp_path, monkeypatch, capsys):
+    from PIL import Image
+    Image.new('RGB', (8, 8), (10, 20, 30)).save(tmp_path / 'ok.png')
+    Image.new('RGB', (64, 64), (0, 0, 0)).save(tmp_path / 'huge.png')
+    # Cabecera válida y datos truncados: PIL falla al decodificar
+    (tmp_path / 'corrupt.png').write_bytes((tmp_path / 'ok.png').read_bytes()[:40])
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 1000)  # 64x64 > 2x el límite
+    output = tmp_path / 'recetas.json'
+    assert run_batch([str(tmp_path), '--workers', '1', '-f', 'json', '-o', str(output),
+                      '--config', str(tmp_path / 'no_existe.json')]) == 0
+    assert '"ok.png"' in output.read_text()
+    out = capsys.readouterr().out
+    assert 'huge.png' in out and 'corrupt.png' in out
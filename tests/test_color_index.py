@@ -0,0 +1,95 @@
+"""ColorIndex: árbol KD y búfer de inserciones frente a la fuerza bruta"""
+import numpy as np
+import pytest
+
+from color_difference import delta_e2000, rgb_to_lab_array
+from color_index import ColorIndex, KDTree
+
+def brute_force(rgbs, rgb, candidates=ColorIndex.CANDIDATES):
+    """Mejor ΔE2000 entre los `candidates` colores más cercanos por ΔE76"""
+    lab = rgb_to_lab_array(np.asarray(rgb, dtype=np.uint8))
+    labs = rgb_to_lab_array(np.asarray(rgbs, dtype=np.uint8))
+    closest = np.argsort(np.linalg.norm(labs - lab, axis=1))[:candidates]
+    return delta_e2000(labs[closest], lab).min()
+
+@pytest.fixture
+def palette():
+    rng = np.random.default_rng(7)
+    return np.unique(rng.integers(0, 256, (2000, 3)), axis=0)
+
+def test_kdtree_matches_brute_force():
+    rng = np.random.default_rng(3)
+    points = rng.uniform(-100, 100, (1000, 3))
+    tree = KDTree(points)
+    for point in rng.uniform(-120, 120, (50, 3)):
+        distances, indices = tree.query(point, k=5)
+        expected = np.sort(np.linalg.norm(points - point, axis=1))[:5]
+        assert np.allclose(distances, expected)
+        assert np.allclose(np.linalg.norm(points[indices] - point, axis=1), expected)
+
+def test_kdtree_k_larger_than_points():
+    distances, indices = KDTree([[0, 0, 0], [1, 0, 0]]).query([0, 0, 0], k=5)
+    assert sorted(indices.tolist()) == [0, 1]
+    assert np.allclose(distances, [0, 1])
+
+@pytest.mark.parametrize('rebuild', [True, False])
+def test_nearest_matches_brute_force(palette, rebuild):
+    index = ColorIndex(use_scipy=False)
+    index.REBUILD_MIN = 10**9  # Sin reconstrucción automática: todo en el búfer
+    index.add_many(palette)
+    if rebuild:
+        index.rebuild()
+    assert (index.tree is not None) == rebuild
+    rng = np.random.default_rng(11)
+    for rgb in rng.integers(0, 256, (40, 3)):
+        match = index.nearest(rgb)[0]
+        assert match.delta_e == pytest.approx(brute_force([match.rgb], rgb))
+        assert match.delta_e == pytest.approx(brute_force(palette, rgb))
+
+def test_nearest_mixes_tree_and_buffer(palette):
+    index = ColorIndex(use_scipy=False)
+    index.add_many(palette[:1500])
+    index.rebuild()
+    index.add_many(palette[1500:1700])
+    assert index.tree_size == 1500 < len(index)
+    target = tuple(int(v) for v in palette[1650])
+    assert index.nearest(target)[0].rgb == target
+    target = tuple(int(v) for v in palette[10])
+    assert index.nearest(target)[0].rgb == target
+
+def test_nearest_is_sorted_and_can_exclude_exact(palette):
+    index = ColorIndex(use_scipy=False)
+    index.add_many(palette)
+    target = tuple(int(v) for v in palette[42])
+    matches = index.nearest(target, k=5)
+    assert matches[0].rgb == target and matches[0].delta_e == 0.0
+    assert [m.delta_e for m in matches] == sorted(m.delta_e for m in matches)
+    others = index.nearest(target, k=3, exclude_exact=True)
+    assert target not in [m.rgb for m in others]
+    assert others[0] == matches[1]
+
+def test_rebuild_is_triggered_by_buffer_growth():
+    index = ColorIndex(use_scipy=False)
+    index.add_many([(i, 0, 0) for i in range(index.REBUILD_MIN)])
+    assert index.tree is None
+    index.add((0, 1, 0))
+    assert index.tree_size == len(index) == index.REBUILD_MIN + 1
+
+def test_duplicates_and_exact_lookup():
+    index = ColorIndex(use_scipy=False)
+    assert index.add((10, 20, 30), cmykw=(1, 2, 3, 4, 90), name='pizarra', source='palette')
+    assert not index.add((10, 20, 30), name='otra')
+    assert index.add_many([(10, 20, 30), (1, 1, 1), (1, 1, 1)]) == 1
+    assert len(index) == 2 and (1, 1, 1) in index
+    assert index.get(np.array([10, 20, 30])) == ('pizarra', (10, 20, 30), (1, 2, 3, 4, 90), 'palette', 0.0)
+    assert index.get((9, 9, 9)) is None
+
+def test_lab_storage_grows_past_initial_capacity():
+    index = ColorIndex(use_scipy=False)
+    rgbs = [(r, g, 0) for r in range(0, 256, 4) for g in range(0, 256, 2)]
+    index.add_many(rgbs)
+    assert len(index) == len(rgbs) > 1024
+    assert np.allclose(index.lab, rgb_to_lab_array(np.array(rgbs, dtype=np.uint8)))
+
+def test_empty_index():
+    assert ColorIndex().nearest((1, 2, 3)) == []
@@ -0,0 +1,115 @@
+"""Paleta dominante (median-cut y k-means) e histograma 3D"""
+import numpy as np
+import pytest
+
+from color_palette import (assign, binned_colors, color_histogram, extract_palette,
+                           median_cut, minibatch_kmeans, subsample_pixels)
+from conversion import rgb_to_cmykw_array
+
+COLORS = [(200, 30, 30), (20, 120, 220), (240, 235, 220), (30, 160, 60)]
+SHARES = [0.4, 0.3, 0.2, 0.1]
+
+def stripes(width=400, height=120, noise=12, seed=0):
+    """Franjas verticales de COLORS con anchos según SHARES y ruido ±noise"""
+    rng = np.random.default_rng(seed)
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    edges = np.round(np.cumsum([0] + SHARES) * width).astype(int)
+    for color, x0, x1 in zip(COLORS, edges[:-1], edges[1:]):
+        jitter = rng.integers(-noise, noise + 1, (height, x1 - x0, 3))
+        image[:, x0:x1] = np.clip(np.array(color) + jitter, 0, 255)
+    return image
+
+def test_subsample_is_a_regular_grid():
+    image = stripes(400, 300)
+    pixels = subsample_pixels(image, max_pixels=3000)
+    assert np.array_equal(pixels, image[::7, ::7].reshape(-1, 3))
+    assert len(subsample_pixels(image[:10, :10])) == 100
+
+def test_rgb_histogram_counts_every_pixel_in_its_cell():
+    pixels = np.array([[0, 0, 0], [15, 15, 15], [16, 0, 255], [255, 255, 255]], dtype=np.uint8)
+    histogram = color_histogram(pixels, bins=16)
+    assert histogram.shape == (16, 16, 16) and histogram.sum() == 4
+    assert histogram[0, 0, 0] == 2 and histogram[1, 0, 15] == 1 and histogram[15, 15, 15] == 1
+
+def test_lab_histogram():
+    pixels = np.array([[0, 0, 0], [255, 255, 255], [128, 128, 128], [255, 0, 0]], dtype=np.uint8)
+    histogram = color_histogram(pixels, bins=8, space='lab')
+    assert histogram.sum() == 4
+    # L = 100 cae en la última celda; los grises quedan en a, b ≈ 0 (borde de celda)
+    assert histogram.sum(axis=(1, 2)).tolist() == [1, 0, 0, 0, 2, 0, 0, 1]
+    assert histogram[4, 6, 6] == 1  # Rojo: L 53, a 80, b 67
+    with pytest.raises(ValueError):
+        color_histogram(pixels, space='hsv')
+
+def test_binned_colors_keep_cell_means():
+    pixels = np.array([[0, 0, 0], [6, 0, 2], [255, 255, 255]], dtype=np.uint8)
+    colors, counts = binned_colors(pixels)
+    assert counts.tolist() == [2, 1]
+    assert np.allclose(colors, [[3, 0, 1], [255, 255, 255]])
+
+def test_median_cut_separates_uniform_colors():
+    colors = np.array(COLORS, dtype=np.float64)
+    counts = np.array([400, 300, 200, 100])
+    centers, box_counts = median_cut(colors, counts, 4)
+    found = sorted(zip(map(tuple, centers.round().astype(int).tolist()), box_counts.tolist()))
+    assert found == sorted(zip(COLORS, [400, 300, 200, 100]))
+    # Menos cajas que colores: los conteos siguen sumando el total
+    centers, box_counts = median_cut(colors, counts, 2)
+    assert len(centers) == 2 and box_counts.sum() == 1000
+    # Sin error que reducir no se corta más
+    centers, box_counts = median_cut(colors[:1], counts[:1], 6)
+    assert len(centers) == 1
+
+def test_median_cut_does_not_split_a_dominant_color():
+    """La mediana partiría en dos el rojo, que tiene el 90 % de los píxeles"""
+    colors = np.array([[200, 0, 0], [0, 0, 200], [0, 0, 210]], dtype=np.float64)
+    counts = np.array([900, 50, 50])
+    centers, box_counts = median_cut(colors, counts, 2)
+    assert sorted(box_counts.tolist()) == [100, 900]
+
+def test_assign_matches_euclidean_argmin():
+    rng = np.random.default_rng(1)
+    pixels = rng.uniform(0, 255, (500, 3))
+    centers = rng.uniform(0, 255, (7, 3))
+    expected = np.linalg.norm(pixels[:, None] - centers[None], axis=2).argmin(axis=1)
+    assert np.array_equal(assign(pixels, centers), expected)
+
+def test_minibatch_kmeans_moves_centers_to_cluster_means():
+    rng = np.random.default_rng(2)
+    truth = np.array([[40.0, 40.0, 40.0], [200.0, 60.0, 60.0]])
+    pixels = np.concatenate([t + rng.normal(0, 5, (2000, 3)) for t in truth])
+    centers = minibatch_kmeans(pixels, truth + 25.0, iterations=30)
+    assert np.abs(centers - truth).max() < 2.0
+    # Los centros de partida no se modifican
+    start = truth + 25.0
+    minibatch_kmeans(pixels, start)
+    assert np.array_equal(start, truth + 25.0)
+
+@pytest.mark.parametrize('method', ['kmeans', 'median_cut'])
+def test_extract_palette_finds_stripes_and_shares(method):
+    palette = extract_palette(stripes(), n=4, method=method)
+    assert len(palette) == 4
+    assert [p.share for p in palette] == sorted((p.share for p in palette), reverse=True)
+    assert sum(p.share for p in palette) == pytest.approx(1.0)
+    for entry, color, share in zip(palette, COLORS, SHARES):
+        assert np.abs(np.subtract(entry.rgb, color)).max() <= 3
+        assert entry.share == pytest.approx(share, abs=0.01)
+        assert entry.cmykw == tuple(rgb_to_cmykw_array(np.array([entry.rgb], dtype=np.uint8))[0])
+
+def test_extract_palette_is_deterministic_per_seed():
+    image = stripes()
+    assert extract_palette(image, n=6, seed=3) == extract_palette(image, n=6, seed=3)
+
+def test_extract_palette_custom_recipe_and_errors():
+    def recipe(rgbs):
+        return np.tile([1, 2, 3, 4, 90], (len(rgbs), 1))
+    palette = extract_palette(stripes(), n=2, recipe=recipe)
+    assert [p.cmykw for p in palette] == [(1, 2, 3, 4, 90)] * 2
+    assert extract_palette(np.zeros((0, 0, 3), dtype=np.uint8)) == []
+    with pytest.raises(ValueError):
+        extract_palette(stripes(), method='octree')
+
+def test_extract_palette_drops_empty_clusters():
+    image = np.full((50, 50, 3), (10, 200, 30), dtype=np.uint8)
+    palette = extract_palette(image, n=6)
+    assert [(p.rgb, p.share) for p in palette] == [((10, 200, 30), 1.0)]
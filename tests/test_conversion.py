@@ -0,0 +1,43 @@
+"""Las conversiones escalares y los kernels vectorizados dan los mismos resultados"""
+import numpy as np
+
+from conversion import (
+    rgb_to_cmykw, cmykw_to_rgb, rgb_to_hsl, hsl_to_rgb,
+    rgb_to_cmykw_array, cmykw_to_rgb_array, rgb_to_hsl_array, hsl_to_rgb_array,
+)
+
+N = 20000
+
+def random_rgb(rng):
+    rgb = rng.integers(0, 256, (N, 3))
+    rgb[:4] = [(0, 0, 0), (255, 255, 255), (128, 128, 128), (255, 0, 0)]
+    return rgb
+
+def test_rgb_to_cmykw_matches_array():
+    rgb = random_rgb(np.random.default_rng(0))
+    scalar = np.array([rgb_to_cmykw(*color) for color in rgb.tolist()])
+    np.testing.assert_array_equal(scalar, rgb_to_cmykw_array(rgb))
+
+def test_cmykw_to_rgb_matches_array():
+    cmykw = np.random.default_rng(1).integers(0, 101, (N, 5))
+    cmykw[::2, 4] = 0
+    scalar = np.array([cmykw_to_rgb(*recipe) for recipe in cmykw.tolist()])
+    np.testing.assert_array_equal(scalar, cmykw_to_rgb_array(cmykw))
+
+def test_rgb_to_hsl_matches_array():
+    rgb = random_rgb(np.random.default_rng(2))
+    scalar = np.array([rgb_to_hsl(*color) for color in rgb.tolist()])
+    np.testing.assert_array_equal(scalar, rgb_to_hsl_array(rgb))
+
+def test_hsl_to_rgb_matches_array():
+    rng = np.random.default_rng(3)
+    sliders = np.column_stack([rng.integers(0, 361, N), rng.integers(0, 101, N), rng.integers(0, 101, N)])
+    floats = np.column_stack([rng.uniform(0, 360, N), rng.uniform(0, 100, N), rng.uniform(0, 100, N)])
+    for hsl in (sliders, floats):
+        scalar = np.array([hsl_to_rgb(*color) for color in hsl.tolist()])
+        np.testing.assert_array_equal(scalar, hsl_to_rgb_array(hsl))
+
+def test_scalar_returns_python_numbers():
+    assert rgb_to_cmykw(255, 255, 255) == (0, 0, 0, 0, 100)
+    assert rgb_to_cmykw(0, 0, 0) == (0, 0, 0, 100, 0)
+    assert all(type(v) is int for v in rgb_to_cmykw(200, 100, 50) + hsl_to_rgb(200, 50, 40))
@@ -0,0 +1,120 @@
+"""HistoryStore: hilo escritor por lotes, consultas paginadas y migración"""
+import json
+import sqlite3
+
+import pytest
+
+from history_store import HistoryEntry, HistoryStore, pack_rgb, unpack_rgb
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'), flush_interval=60.0)
+    yield store
+    store.close()
+
+def recording_writes(store, monkeypatch):
+    """Registrar el tamaño de cada lote que escribe el hilo escritor"""
+    sizes = []
+    write = HistoryStore._write
+    def record(conn, rows):
+        sizes.append(len(rows))
+        write(conn, rows)
+    monkeypatch.setattr(store, '_write', record)
+    return sizes
+
+def test_pack_roundtrip():
+    assert pack_rgb((0x12, 0x34, 0x56)) == 0x123456
+    assert unpack_rgb(pack_rgb((255, 0, 7))) == (255, 0, 7)
+
+def test_writer_groups_rows_in_batches(store, monkeypatch):
+    sizes = recording_writes(store, monkeypatch)
+    for i in range(600):
+        store.add((i % 256, 0, 0), (1, 2, 3, 4, 90), timestamp=1000.0 + i)
+    store.start().flush()
+    assert sizes == [256, 256, 88]
+    assert store.color_count() == 256
+    assert len(store.picks(limit=10000)) == 600
+
+def test_flush_does_not_wait_for_interval(store, monkeypatch):
+    sizes = recording_writes(store, monkeypatch)
+    store.start()
+    store.add((1, 2, 3), (0, 0, 0, 0, 100))
+    store.flush()  # flush_interval es de 60 s: sin la marca el test se colgaría
+    assert sizes == [1]
+    assert store.recent_colors()[0].rgb == (1, 2, 3)
+
+def test_close_writes_pending_rows(tmp_path):
+    path = str(tmp_path / 'history.db')
+    store = HistoryStore(path, flush_interval=60.0).start()
+    store.add((9, 8, 7), (10, 20, 30, 40, 0), timestamp=5.0)
+    store.close()
+    reopened = HistoryStore(path)
+    try:
+        assert reopened.recent_colors() == [HistoryEntry((9, 8, 7), (10, 20, 30, 40, 0), 5.0, 1)]
+    finally:
+        reopened.close()
+
+def test_writer_survives_sqlite_errors(store, monkeypatch, capsys):
+    write = HistoryStore._write
+    calls = []
+    def flaky(conn, rows):
+        calls.append(rows)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        write(conn, rows)
+    monkeypatch.setattr(store, '_write', flaky)
+    store.start()
+    store.add((1, 1, 1), (0, 0, 0, 0, 100))
+    store.flush()
+    assert 'database is locked' in capsys.readouterr().out
+    store.add((2, 2, 2), (0, 0, 0, 0, 100))
+    store.flush()
+    assert [entry.rgb for entry in store.recent_colors()] == [(2, 2, 2)]
+
+def test_recent_colors_keeps_last_recipe_and_counts(store):
+    store.start()
+    store.add((10, 10, 10), (1, 1, 1, 1, 96), timestamp=1.0)
+    store.add((20, 20, 20), (2, 2, 2, 2, 92), timestamp=2.0)
+    store.add((10, 10, 10), (5, 5, 5, 5, 80), timestamp=3.0)
+    store.add((30, 30, 30), (3, 3, 3, 3, 88), timestamp=4.0)
+    store.flush()
+    assert store.recent_colors() == [
+        HistoryEntry((30, 30, 30), (3, 3, 3, 3, 88), 4.0, 1),
+        HistoryEntry((10, 10, 10), (5, 5, 5, 5, 80), 3.0, 2),
+        HistoryEntry((20, 20, 20), (2, 2, 2, 2, 92), 2.0, 1),
+    ]
+    assert [e.rgb for e in store.recent_colors(limit=1, offset=1)] == [(10, 10, 10)]
+
+def test_picks_time_range_and_pagination(store):
+    store.start()
+    for i in range(10):
+        store.add((i, 0, 0), (0, 0, 0, 0, 100), timestamp=100.0 + i)
+    store.flush()
+    window = store.picks(start=103.0, end=107.0)
+    assert [entry.timestamp for _, entry in window] == [103.0, 104.0, 105.0, 106.0]
+    first = store.picks(limit=4)
+    second = store.picks(limit=4, after_id=first[-1][0])
+    assert [e.rgb[0] for _, e in first + second] == list(range(8))
+
+def test_iter_colors_in_chunks(store):
+    store.start()
+    for i in range(25):
+        store.add((0, i, 0), (0, 0, 0, 0, 100), timestamp=float(i))  # ts = 0 es explícito
+    store.flush()
+    chunks = list(store.iter_colors(chunk=10))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert chunks[0][0] == ((0, 24, 0), (0, 0, 0, 0, 100))
+    assert sum(len(chunk) for chunk in store.iter_colors(limit=7, chunk=10)) == 7
+
+def test_migrate_json(store, tmp_path, capsys):
+    legacy = tmp_path / 'color_history.json'
+    legacy.write_text(json.dumps([[[1, 2, 3], [10, 0, 0, 0, 90]], [[4, 5, 6], [0, 10, 0, 0, 90]]]))
+    assert store.migrate_json(str(legacy)) == 2
+    assert not legacy.exists() and (tmp_path / 'color_history.json.bak').exists()
+    assert [e.rgb for e in store.recent_colors()] == [(4, 5, 6), (1, 2, 3)]
+    assert store.migrate_json(str(legacy)) == 0
+    broken = tmp_path / 'broken.json'
+    broken.write_text('{')
+    assert store.migrate_json(str(broken)) == 0
+    assert broken.exists()
+    assert 'No se pudo migrar' in capsys.readouterr().out
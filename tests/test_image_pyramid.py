@@ -0,0 +1,145 @@
+"""ImagePyramid: niveles, nivel 0 mapeado del archivo y composición de la vista"""
+import numpy as np
+import pytest
+from PIL import Image
+
+from image_pyramid import ImagePyramid, halve, memmap_raw
+
+class SmallPyramid(ImagePyramid):
+    """Tiles de 64 px: varios niveles con imágenes de pocos cientos de píxeles"""
+    TILE_SIZE = 64
+    PREVIEW_SIDE = 64
+
+def gradient(width, height):
+    y, x = np.mgrid[0:height, 0:width]
+    return np.dstack([x % 256, y % 256, (x * 7 + y * 3) % 256]).astype(np.uint8)
+
+def is_mapped(array):
+    while isinstance(array, np.ndarray):
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+# Anchos impares: las filas BMP llevan relleno hasta múltiplos de 4 bytes
+@pytest.mark.parametrize('name, options', [
+    ('image.bmp', {}),
+    ('image.ppm', {}),
+    ('image.tif', {}),
+    ('strips.tif', {'tiffinfo': {278: 7}}),  # RowsPerStrip: varias franjas
+])
+def test_memmap_raw_matches_decoded_pixels(tmp_path, name, options):
+    pixels = gradient(101, 67)
+    path = str(tmp_path / name)
+    Image.fromarray(pixels).save(path, **options)
+    with Image.open(path) as img:
+        if name == 'strips.tif':
+            assert len(img.tile) > 1
+        mapped = memmap_raw(img, path)
+    assert mapped is not None and is_mapped(mapped)
+    assert np.array_equal(mapped, pixels)
+
+@pytest.mark.parametrize('name, options', [
+    ('image.png', {}),
+    ('image.jpg', {}),
+    ('lzw.tif', {'compression': 'tiff_lzw'}),
+])
+def test_memmap_raw_rejects_compressed_files(tmp_path, name, options):
+    path = str(tmp_path / name)
+    Image.fromarray(gradient(40, 30)).save(path, **options)
+    with Image.open(path) as img:
+        assert memmap_raw(img, path) is None
+
+def test_memmap_raw_rejects_non_rgb(tmp_path):
+    path = str(tmp_path / 'gray.bmp')
+    Image.fromarray(gradient(40, 30)[..., 0]).save(path)
+    with Image.open(path) as img:
+        assert memmap_raw(img, path) is None
+
+def test_halve_in_bands_matches_whole_reduce():
+    pixels = gradient(301, 257)
+    expected = np.asarray(Image.fromarray(pixels).reduce(2))
+    assert np.array_equal(halve(pixels, 16), expected)
+    assert halve(pixels, 16).shape == (129, 151, 3)
+
+def test_levels_halve_down_to_tile_size():
+    pyramid = SmallPyramid.from_array(gradient(500, 300))
+    shapes = [array.shape[:2] for array, _ in pyramid.levels]
+    assert shapes == [(300, 500), (150, 250), (75, 125), (38, 63)]
+    assert [scale for _, scale in pyramid.levels] == [1.0, 2.0, 4.0, 500 / 63]
+    assert pyramid.size == (500, 300) and pyramid.full
+
+def test_from_array_drops_alpha():
+    rgba = np.dstack([gradient(20, 10), np.full((10, 20), 128, np.uint8)])
+    array, _ = SmallPyramid.from_array(rgba).base()
+    assert array.shape == (10, 20, 3) and array.flags['C_CONTIGUOUS']
+
+def test_load_full_maps_uncompressed_files(tmp_path):
+    pixels = gradient(300, 200)
+    path = str(tmp_path / 'big.bmp')
+    Image.fromarray(pixels).save(path)
+    pyramid = SmallPyramid(path)
+    pyramid.load_full()
+    base, scale = pyramid.base()
+    assert is_mapped(base) and scale == 1.0
+    assert np.array_equal(base, pixels)
+    assert len(pyramid.levels) == 4
+
+def test_load_full_decodes_other_formats(tmp_path):
+    pixels = gradient(120, 80)
+    path = str(tmp_path / 'image.png')
+    Image.fromarray(pixels).convert('RGBA').save(path)
+    pyramid = SmallPyramid(path)
+    assert not pyramid.load_preview()
+    pyramid.load_full()
+    base, _ = pyramid.base()
+    assert not is_mapped(base) and np.array_equal(base, pixels)
+
+def test_jpeg_preview_is_replaced_by_full_levels(tmp_path):
+    path = str(tmp_path / 'photo.jpg')
+    Image.fromarray(gradient(512, 384)).save(path, quality=95)
+    pyramid = SmallPyramid(path)
+    assert pyramid.load_preview()
+    (preview, scale), = pyramid.levels
+    assert preview.shape[1] < 512 and scale == 512 / preview.shape[1]
+    assert not pyramid.full
+    pyramid.load_full()
+    assert pyramid.base()[0].shape == (384, 512, 3)
+    # Una vista previa tardía no pisa los niveles completos
+    assert pyramid.load_preview()
+    assert pyramid.base()[0].shape == (384, 512, 3)
+
+def test_level_for_picks_smallest_sufficient_level():
+    pyramid = SmallPyramid.from_array(gradient(500, 300))
+    assert pyramid.level_for(2.0)[1] == 1.0
+    assert pyramid.level_for(1.0)[1] == 1.0
+    assert pyramid.level_for(0.5)[1] == 2.0
+    assert pyramid.level_for(0.3)[1] == 2.0
+    assert pyramid.level_for(0.25)[1] == 4.0
+    assert pyramid.level_for(0.01)[1] == 500 / 63
+
+def test_render_at_full_resolution_is_a_crop():
+    pixels = gradient(500, 300)
+    pyramid = SmallPyramid.from_array(pixels)
+    view = np.asarray(pyramid.render(40, 30, 1.0, 100, 80))
+    assert np.array_equal(view, pixels[30:110, 40:140])
+
+def test_render_zoom_in_repeats_pixels():
+    pixels = gradient(500, 300)
+    view = np.asarray(SmallPyramid.from_array(pixels).render(10, 20, 2.0, 8, 6))
+    assert np.array_equal(view, pixels[20:23, 10:14].repeat(2, axis=0).repeat(2, axis=1))
+
+def test_render_zoom_out_uses_reduced_level():
+    pixels = gradient(500, 300)
+    pyramid = SmallPyramid.from_array(pixels)
+    view = np.asarray(pyramid.render(0, 0, 0.5, 250, 150))
+    assert np.array_equal(view, pyramid.levels[1][0])
+
+def test_render_outside_image_is_background():
+    pyramid = SmallPyramid.from_array(gradient(50, 40))
+    view = np.asarray(pyramid.render(-30, 0, 1.0, 40, 10, background=(1, 2, 3)))
+    assert (view[:, :30] == (1, 2, 3)).all()
+    assert np.array_equal(view[:, 30:], gradient(50, 40)[:10, :10])
+    empty = np.asarray(pyramid.render(100, 100, 1.0, 10, 10, background=(1, 2, 3)))
+    assert (empty == (1, 2, 3)).all()
+    assert (np.asarray(ImagePyramid().render(0, 0, 1.0, 4, 4)) == 255).all()
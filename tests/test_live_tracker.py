@@ -0,0 +1,60 @@
+"""LiveColorTracker: la banda muerta solo cuenta envíos confirmados"""
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+from plc import SendResult
+from sampling import LiveColorTracker
+
+class FakeCamera:
+    """Entrega el mismo frame `frames` veces y luego detiene al seguidor"""
+    def __init__(self, frames):
+        self.frame = np.full((20, 20, 3), (200, 100, 50), dtype=np.uint8)
+        self.frames = frames
+        self.seq = 0
+        self.tracker = None
+
+    def wait_newer(self, seq, timeout=0.5):
+        if self.seq >= self.frames:
+            self.tracker.running = False
+            return self.seq, None
+        self.seq += 1
+        return self.seq, self.frame
+
+class FakePLC:
+    """Resuelve cada envío al instante con el resultado de `outcomes`"""
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.sends = []
+
+    def enviar_a_plc(self, *values):
+        self.sends.append(values)
+        future = Future()
+        ok = self.outcomes.pop(0) if self.outcomes else True
+        future.set_result(SendResult(ok, 0.0, list(values)))
+        return future
+
+def run_tracker(plc, frames):
+    camera = FakeCamera(frames)
+    tracker = LiveColorTracker(camera, plc, radius=2)
+    camera.tracker = tracker
+    tracker.running = True
+    thread = threading.Thread(target=tracker._run)
+    thread.start()
+    thread.join(timeout=5.0)
+    return tracker
+
+def test_failed_send_is_retried():
+    plc = FakePLC([False, False, True])
+    tracker = run_tracker(plc, frames=10)
+    # Dos fallos y un envío confirmado; después la banda muerta lo detiene
+    assert len(plc.sends) == 3
+    assert tracker.sent_count == 1
+    assert tracker.last_sent == tracker.latest_cmykw
+
+def test_confirmed_send_suppresses_repeats():
+    plc = FakePLC([True])
+    tracker = run_tracker(plc, frames=10)
+    assert len(plc.sends) == 1
+    assert tracker.sent_count == 1
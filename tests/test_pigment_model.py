@@ -0,0 +1,72 @@
+"""Modelo Kubelka-Munk: solver NNLS exacto, redondeo de recetas y rejilla"""
+import numpy as np
+import pytest
+
+from conversion import srgb_to_linear
+from pigment_model import PigmentModel, PigmentRecipeGrid, reflectance_to_ks, round_recipe
+
+MODEL = PigmentModel()
+
+def objective(model, rgb, c):
+    """Función que minimiza PigmentModel.solve, escrita directo desde su docstring"""
+    t = np.clip(reflectance_to_ks(srgb_to_linear(np.asarray(rgb, dtype=np.float64))),
+                model.ks_min, model.ks_max)
+    channels = (c @ model.K - t * (c @ model.S)) / (t + model.ks_offset)
+    return (channels ** 2).sum() + model.sum_weight * (c.sum() - 1) ** 2 + model.ridge * (c ** 2).sum()
+
+def test_mixes_inside_the_gamut_are_reproduced():
+    rng = np.random.default_rng(0)
+    rgb = MODEL.mix(rng.dirichlet(np.ones(5), 300))
+    proportions, residual = MODEL.solve(rgb)
+    assert proportions.shape == (300, 5)
+    assert (proportions >= 0).all()
+    assert np.allclose(proportions.sum(axis=1), 1.0)
+    assert np.abs(MODEL.mix(proportions) - rgb).max() < 0.01  # En unidades de 0–255
+    assert residual.max() < 1e-3
+
+def test_solution_beats_every_feasible_alternative():
+    rng = np.random.default_rng(1)
+    targets = rng.uniform(0, 255, (20, 3))
+    proportions, _ = MODEL.solve(targets)
+    for rgb, best in zip(targets, proportions):
+        cost = objective(MODEL, rgb, best)
+        candidates = np.vstack([rng.dirichlet(np.ones(5), 500), np.eye(5),
+                                np.clip(best + rng.normal(0, 0.02, (200, 5)), 0, None)])
+        candidates /= candidates.sum(axis=1, keepdims=True)
+        others = [objective(MODEL, rgb, c) for c in candidates]
+        assert cost <= min(others) + 1e-9
+
+def test_solve_keeps_leading_shape():
+    rgb = np.full((2, 3, 3), 128.0)
+    proportions, residual = MODEL.solve(rgb)
+    assert proportions.shape == (2, 3, 5) and residual.shape == (2, 3)
+    assert np.allclose(proportions, proportions[0, 0])
+
+def test_pure_pigments_solve_to_themselves():
+    recipes = MODEL.recipe(MODEL.mix(np.eye(5)))
+    assert (recipes == 100 * np.eye(5, dtype=np.uint8)).all()
+
+@pytest.mark.parametrize('proportions, expected', [
+    ([1, 1, 1, 0, 0], [34, 33, 33, 0, 0]),
+    ([0.125, 0.125, 0.25, 0.5, 0], [13, 12, 25, 50, 0]),  # Empate: el primero
+    ([0, 0, 0, 0, 3], [0, 0, 0, 0, 100]),
+])
+def test_round_recipe_uses_largest_remainder(proportions, expected):
+    recipe = round_recipe(proportions)
+    assert recipe.tolist() == expected
+    assert recipe.sum() == 100
+
+def test_round_recipe_always_sums_to_100():
+    rng = np.random.default_rng(2)
+    recipes = round_recipe(rng.dirichlet(np.full(5, 0.3), 1000))
+    assert (recipes.sum(axis=1) == 100).all()
+
+def test_grid_matches_solver_on_nodes(tmp_path):
+    grid = PigmentRecipeGrid(MODEL, nodes=5, path=str(tmp_path / 'grid.npy')).load()
+    nodes = np.linspace(0, 255, 5)
+    rgb = np.stack(np.meshgrid(nodes, nodes, nodes, indexing='ij'), axis=-1).reshape(-1, 3)
+    assert np.allclose(grid.lookup(rgb), MODEL.solve(rgb)[0], atol=1e-6)
+    # Una segunda carga lee el archivo en lugar de reconstruir
+    again = PigmentRecipeGrid(MODEL, nodes=5, path=grid.path).load()
+    assert np.array_equal(again.grid, grid.grid)
+    assert grid.recipe_one(128, 64, 32) == tuple(int(v) for v in grid.recipe((128, 64, 32)))
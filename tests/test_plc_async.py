@@ -0,0 +1,49 @@
+"""Estación serial asíncrona: confirmación por eco de la receta"""
+import asyncio
+
+import plc_async
+from plc_async import AsyncSerialStation
+
+class FakeWriter:
+    """Escritor que guarda lo enviado y responde por el lector"""
+    def __init__(self, reader, replies):
+        self.reader = reader
+        self.replies = replies
+        self.written = []
+
+    def write(self, data):
+        self.written.append(data)
+        if self.replies:
+            self.reader.feed_data(self.replies.pop(0))
+
+    async def drain(self):
+        pass
+
+def make_station(monkeypatch, replies):
+    monkeypatch.setattr(plc_async, 'SERIAL_ASYNC_AVAILABLE', True)
+    station = AsyncSerialStation('prueba', '/dev/null', timeout=0.2)
+    station.reader = asyncio.StreamReader()
+    station.writer = FakeWriter(station.reader, replies)
+    return station
+
+def test_serial_send_uses_ascii_frame_and_skips_telemetry(monkeypatch):
+    async def run():
+        station = make_station(monkeypatch, [b"Sensor: 512\r\nCMYKW Recibido: C:10 M:20 Y:30 K:40 W:0\r\n"])
+        assert await station.send(10, 20, 30, 40, 0)
+        return station.writer.written
+    assert asyncio.run(run()) == [b"C:010 M:020 Y:030 K:040 W:000\n"]
+
+def test_late_ack_does_not_confirm_next_send(monkeypatch):
+    async def run():
+        # El eco del primer envío llega después de su timeout
+        station = make_station(monkeypatch, [b"", b"CMYKW Recibido: C:1 M:2 Y:3 K:4 W:5\r\n"])
+        try:
+            await asyncio.wait_for(station.send(1, 2, 3, 4, 5), station.timeout)
+        except asyncio.TimeoutError:
+            pass
+        second = asyncio.ensure_future(station.send(6, 7, 8, 9, 10))
+        await asyncio.sleep(0.05)
+        assert not second.done()
+        station.reader.feed_data(b"CMYKW Recibido: C:6 M:7 Y:8 K:9 W:10\r\n")
+        return await asyncio.wait_for(second, 1.0)
+    assert asyncio.run(run())
@@ -0,0 +1,87 @@
+"""Cola de envíos del PLCManager: un solo hilo, coalescencia y resultados en Futures"""
+import threading
+import time
+
+from plc import PLCManager, SendResult
+
+class RecordingPLC(PLCManager):
+    """PLCManager sin hardware que guarda cada escritura"""
+    def __init__(self, latency=0.0, min_interval=0.1, fail=None, **kwargs):
+        super().__init__(connection_type='none', telemetry=False, **kwargs)
+        self.enabled = True
+        self.latency = latency
+        self.min_interval = min_interval
+        self.fail = fail
+        self.writes = []
+        self.threads = set()
+
+    def _enviar_async(self, c, m, y, k, w):
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.latency)
+        if self.fail:
+            raise self.fail
+        self.writes.append((c, m, y, k, w))
+        return True
+
+def test_disabled_manager_returns_false():
+    manager = PLCManager('none', telemetry=False)
+    assert manager.enviar_a_plc(1, 2, 3, 4, 5) is False
+
+def test_burst_coalesces_into_latest_value():
+    plc = RecordingPLC(min_interval=0.2)
+    try:
+        first = plc.enviar_a_plc(0, 0, 0, 0, 0).result(timeout=2.0)
+        # Toda la ráfaga cae dentro del intervalo mínimo: solo sale el último
+        burst = [plc.enviar_a_plc(i, 0, 0, 0, 0) for i in range(1, 11)]
+        results = [future.result(timeout=2.0) for future in burst]
+    finally:
+        plc.close()
+    assert first == SendResult(True, first.latency, [0, 0, 0, 0, 0])
+    assert plc.writes == [(0, 0, 0, 0, 0), (10, 0, 0, 0, 0)]
+    assert all(r.ok and r.values == [10, 0, 0, 0, 0] for r in results)
+    assert len(plc.threads) == 1
+
+def test_larger_queue_keeps_order():
+    plc = RecordingPLC(min_interval=0.0, latency=0.02, send_queue_size=8)
+    try:
+        futures = [plc.enviar_a_plc(i, 0, 0, 0, 0) for i in range(5)]
+        values = [f.result(timeout=2.0).values[0] for f in futures]
+    finally:
+        plc.close()
+    assert values == [0, 1, 2, 3, 4]
+    assert [w[0] for w in plc.writes] == [0, 1, 2, 3, 4]
+
+def test_min_interval_between_sends():
+    plc = RecordingPLC(min_interval=0.1)
+    try:
+        a = plc.enviar_a_plc(1, 0, 0, 0, 0).result(timeout=2.0)
+        start = time.perf_counter()
+        plc.enviar_a_plc(2, 0, 0, 0, 0).result(timeout=2.0)
+        elapsed = time.perf_counter() - start
+    finally:
+        plc.close()
+    assert a.ok
+    assert elapsed >= 0.08
+
+def test_failed_send_resolves_future_and_keeps_thread():
+    plc = RecordingPLC(min_interval=0.0, fail=ConnectionError("sin PLC"))
+    called = threading.Event()
+    try:
+        result = plc.enviar_a_plc(1, 2, 3, 4, 5, callback=lambda f: called.set()).result(timeout=2.0)
+        assert not result.ok
+        assert called.wait(1.0)
+        plc.fail = None
+        assert plc.enviar_a_plc(6, 7, 8, 9, 10).result(timeout=2.0).ok
+    finally:
+        plc.close()
+    assert plc.writes == [(6, 7, 8, 9, 10)]
+
+def test_close_flushes_pending_and_rejects_new_sends():
+    plc = RecordingPLC(min_interval=0.3)
+    plc.enviar_a_plc(1, 0, 0, 0, 0).result(timeout=2.0)
+    pending = plc.enviar_a_plc(2, 0, 0, 0, 0)
+    plc.close()
+    assert pending.result(timeout=0).ok
+    assert plc.writes[-1] == (2, 0, 0, 0, 0)
+    late = plc.enviar_a_plc(3, 0, 0, 0, 0).result(timeout=0)
+    assert not late.ok
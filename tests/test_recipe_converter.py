@@ -0,0 +1,51 @@
+"""Selección del conversor RGB→CMYKW compartida por la GUI, el CLI y el servicio"""
+import numpy as np
+
+import conversion
+import pigment_model
+from conversion import rgb_to_cmykw_array
+from pigment_model import PigmentModel, PigmentRecipeGrid, load_recipe_converter
+
+RGB = np.array([[200, 30, 30], [20, 120, 220], [255, 255, 255], [0, 0, 0]], dtype=np.uint8)
+
+def test_default_is_analytic():
+    assert load_recipe_converter({}) is rgb_to_cmykw_array
+
+class SmallGrid(PigmentRecipeGrid):
+    """Rejilla de 5 nodos: se construye en milisegundos"""
+    def __init__(self, model=None, nodes=5, path=None):
+        super().__init__(model, nodes, path)
+
+def test_kubelka_munk_uses_pigment_grid(tmp_path, monkeypatch):
+    monkeypatch.setattr(conversion, 'CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(pigment_model, 'PigmentRecipeGrid', SmallGrid)
+    convert = load_recipe_converter({'mixing_model': 'kubelka_munk', 'cmykw_lut': 'coarse'})
+    recipes = convert(RGB)
+    assert recipes.shape == (4, 5)
+    assert (recipes.sum(axis=1) == 100).all()
+    expected = SmallGrid(PigmentModel()).load().recipe(RGB)
+    assert np.array_equal(recipes, expected)
+
+def test_lut_falls_back_to_analytic_when_it_cannot_load(monkeypatch, capsys):
+    def broken(self):
+        raise OSError("disco lleno")
+    monkeypatch.setattr(pigment_model.RGBToCMYKWTable, 'load', broken)
+    assert load_recipe_converter({'cmykw_lut': 'coarse'}) is rgb_to_cmykw_array
+    assert 'disco lleno' in capsys.readouterr().out
+
+def test_batch_and_service_use_configured_converter(tmp_path, monkeypatch):
+    import json
+    from PIL import Image
+    from batch import run_batch
+    from recipe_service import RecipeService
+    calls = []
+    def fake_converter(rgb):
+        calls.append(len(rgb))
+        return np.full(np.shape(rgb)[:-1] + (5,), 7, dtype=np.uint8)
+    monkeypatch.setattr('batch.load_recipe_converter', lambda config: fake_converter)
+    Image.new('RGB', (4, 4), (10, 20, 30)).save(tmp_path / 'a.png')
+    output = tmp_path / 'recetas.json'
+    assert run_batch([str(tmp_path), '--workers', '1', '-f', 'json', '-o', str(output),
+                      '--config', str(tmp_path / 'no_existe.json')]) == 0
+    assert json.loads(output.read_text())[0]['c'] == 7
+    assert RecipeService(convert=fake_converter, batch_window=None).convert is fake_converter
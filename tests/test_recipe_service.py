@@ -0,0 +1,94 @@
+"""Servicio de recetas: validación de colores"""
+import asyncio
+import json
+
+import pytest
+
+from recipe_service import FakePLCManager, RecipeService, parse_colors
+
+def post(service, path, payload):
+    """Petición procesada por el enrutador del servicio; devuelve (estado, json)"""
+    async def run():
+        server = await service.start(port=0)  # Crea los semáforos en este bucle
+        try:
+            return await service._dispatch_request('POST', path, json.dumps(payload).encode())
+        finally:
+            server.close()
+            await server.wait_closed()
+    return asyncio.run(run())
+
+def raw_request(service, request):
+    """Enviar bytes crudos por un socket real; devuelve la línea de estado"""
+    async def run():
+        server = await service.start(port=0)
+        try:
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(request)
+            await writer.drain()
+            status = await asyncio.wait_for(reader.readline(), 5.0)
+            writer.close()
+            return status
+        finally:
+            server.close()
+            await server.wait_closed()
+    return asyncio.run(run())
+
+def test_parse_colors_accepts_integer_lists():
+    colors = parse_colors([[0, 128, 255], [1, 2, 3]], 3, 255)
+    assert colors.tolist() == [[0, 128, 255], [1, 2, 3]]
+    assert parse_colors([10, 20, 30, 40, 0], 5, 100).shape == (1, 5)
+
+@pytest.mark.parametrize('value', [
+    [12.7, 0, 0],
+    [float('nan'), 0, 0],
+    ["1", 0, 0],
+    [256, 0, 0],
+    [-1, 0, 0],
+    [[1, 2, 3], [4, 5]],
+])
+def test_parse_colors_rejects_non_integer_or_out_of_range(value):
+    with pytest.raises(ValueError):
+        parse_colors(value, 3, 255)
+
+def test_convert_rejects_float_and_nan_channels():
+    service = RecipeService(batch_window=None)
+    for rgb in ([[200.5, 100, 50]], [[float('nan'), 100, 50]]):
+        status, payload = post(service, '/convert', {'rgb': rgb})
+        assert status == 400
+        assert 'enteros' in payload['error']
+    status, payload = post(service, '/convert', {'rgb': [[200, 100, 50]]})
+    assert status == 200
+
+def test_dispatch_timeout_does_not_kill_sender_thread():
+    plc = FakePLCManager(latency=0.5, min_interval=0.0, telemetry=False)
+    service = RecipeService(plc=plc, batch_window=None, dispatch_timeout=0.1)
+    try:
+        status, _ = post(service, '/dispatch', {'cmykw': [10, 20, 30, 40, 0]})
+        assert status == 504
+        # El envío que venció sigue en curso; los siguientes deben completarse
+        service.dispatch_timeout = 5.0
+        status, payload = post(service, '/dispatch', {'cmykw': [50, 50, 0, 0, 0]})
+        assert status == 200
+        assert payload['ok'] and payload['values'] == [50, 50, 0, 0, 0]
+        assert plc._sender.is_alive()
+    finally:
+        plc.close()
+
+@pytest.mark.parametrize('length', [b'abc', b'-5', b'1e3'])
+def test_invalid_content_length_returns_400(length):
+    status = raw_request(RecipeService(batch_window=None),
+                         b"POST /convert HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n")
+    assert status.startswith(b"HTTP/1.1 400")
+
+def test_valid_request_over_socket():
+    body = json.dumps({'rgb': [[255, 0, 0]]}).encode()
+    status = raw_request(RecipeService(batch_window=None),
+                         b"POST /convert HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+    assert status.startswith(b"HTTP/1.1 200")
+
+@pytest.mark.parametrize('payload', [[1, 2], "texto", 3])
+def test_non_object_body_returns_400(payload):
+    status, body = post(RecipeService(batch_window=None), '/convert', payload)
+    assert status == 400
+    assert 'objeto' in body['error']
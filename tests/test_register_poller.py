@@ -0,0 +1,91 @@
+"""Lectura de registros Modbus: plan de lecturas y sondeo por grupos"""
+import threading
+import time
+
+import pytest
+
+from plc import MODBUS_AVAILABLE, DEFAULT_POLL_GROUPS, PollGroup, RegisterPoller, plan_reads
+
+pytestmark = pytest.mark.skipif(not MODBUS_AVAILABLE, reason="pymodbus no está instalado")
+
+class FakeResponse:
+    def __init__(self, registers):
+        self.registers = registers
+
+    def isError(self):
+        return False
+
+class FakeConnection:
+    """ModbusConnection simulada: registra cada lectura (dirección, cantidad)"""
+    def __init__(self, registers, fail=False):
+        self.registers = registers
+        self.fail = fail
+        self.reads = []
+        self.lock = threading.Lock()
+
+    def execute(self, operation):
+        if self.fail:
+            raise ConnectionError("PLC desconectado")
+        return operation(self)
+
+    def read_input_registers(self, address, count):
+        with self.lock:
+            self.reads.append((address, count))
+        return FakeResponse(list(self.registers[address:address + count]))
+
+    read_holding_registers = read_input_registers
+
+def test_plan_reads_merges_contiguous_and_close_ranges():
+    groups = [PollGroup('a', 10, 5, 1), PollGroup('b', 0, 5, 1), PollGroup('c', 5, 5, 1)]
+    assert plan_reads(groups) == [(0, 15)]
+    gapped = [PollGroup('a', 0, 5, 1), PollGroup('b', 8, 2, 1)]
+    assert plan_reads(gapped) == [(0, 5), (8, 2)]
+    assert plan_reads(gapped, max_gap=3) == [(0, 10)]
+    assert plan_reads(gapped, max_gap=3, max_count=8) == [(0, 5), (8, 2)]
+    overlapping = [PollGroup('a', 0, 10, 1), PollGroup('b', 2, 3, 1)]
+    assert plan_reads(overlapping) == [(0, 10)]
+    assert plan_reads([]) == []
+
+def test_default_groups_are_one_request():
+    assert plan_reads(DEFAULT_POLL_GROUPS) == [(0, 10)]
+
+def test_poll_publishes_only_changes():
+    registers = list(range(100, 110))
+    connection = FakeConnection(registers)
+    poller = RegisterPoller(connection, DEFAULT_POLL_GROUPS)
+    events = []
+    poller.subscribe(lambda name, values: events.append((name, values)))
+
+    poller.poll(poller.groups)
+    assert connection.reads == [(0, 10)]
+    assert events == [('temps', [105, 106, 107, 108, 109]), ('levels', [100, 101, 102, 103, 104])]
+
+    poller.poll(poller.groups)
+    assert len(events) == 2  # Sin cambios: sin avisos
+    registers[1] = 0
+    poller.poll(poller.groups)
+    assert events[-1] == ('levels', [100, 0, 102, 103, 104])
+    assert (poller.requests, poller.registers_read) == (3, 30)
+
+def test_background_loop_respects_group_intervals():
+    connection = FakeConnection(list(range(10)))
+    groups = [PollGroup('temps', 5, 5, 60.0), PollGroup('levels', 0, 5, 0.05)]
+    poller = RegisterPoller(connection, groups)
+    poller.start()
+    time.sleep(0.3)
+    poller.stop()
+    # Un solo ciclo con ambos grupos fusionados; después solo los niveles
+    assert connection.reads[0] == (0, 10)
+    assert set(connection.reads[1:]) == {(0, 5)}
+    assert 3 <= len(connection.reads) <= 8
+    assert poller.errors == 0
+
+def test_background_loop_counts_errors_and_keeps_running():
+    connection = FakeConnection(list(range(10)), fail=True)
+    poller = RegisterPoller(connection, [PollGroup('levels', 0, 5, 0.05)])
+    poller.start()
+    time.sleep(0.2)
+    assert poller.thread.is_alive()
+    poller.stop()
+    assert poller.errors >= 2
+    assert poller.values == {}
@@ -0,0 +1,58 @@
+"""Protocolo serial binario: CRC, tramas y parser incremental"""
+import pytest
+
+from serial_protocol import (
+    FRAME_SIZE, FrameDecoder, FrameError, crc16_ccitt, decode_frame, encode_ascii, encode_frame,
+)
+
+def test_crc16_ccitt_false_check_value():
+    assert crc16_ccitt(b"123456789") == 0x29B1
+
+def test_encode_decode_round_trip():
+    for seq, values in ((0, (0, 0, 0, 0, 0)), (255, (100, 100, 100, 100, 100)), (300, (10, 20, 30, 40, 0))):
+        frame = encode_frame(seq, *values)
+        assert len(frame) == FRAME_SIZE
+        assert decode_frame(frame) == (seq & 0xFF, values)
+
+def test_encode_rejects_out_of_range_values():
+    with pytest.raises(FrameError):
+        encode_frame(0, 101, 0, 0, 0, 0)
+
+def test_decode_rejects_corrupted_crc():
+    frame = bytearray(encode_frame(1, 10, 20, 30, 40, 0))
+    frame[3] ^= 0x01
+    with pytest.raises(FrameError):
+        decode_frame(bytes(frame))
+
+def test_encode_ascii_format():
+    assert encode_ascii(1, 20, 100, 0, 5) == b"C:001 M:020 Y:100 K:000 W:005\n"
+
+def test_decoder_handles_arbitrary_chunks():
+    stream = encode_frame(0, 1, 2, 3, 4, 5) + encode_frame(1, 6, 7, 8, 9, 10)
+    decoder = FrameDecoder()
+    frames = []
+    for i in range(len(stream)):
+        frames += decoder.feed(stream[i:i + 1])
+    assert frames == [(0, (1, 2, 3, 4, 5)), (1, (6, 7, 8, 9, 10))]
+
+def test_decoder_resyncs_after_garbage():
+    decoder = FrameDecoder()
+    frames = decoder.feed(b"basura\xa5\x01" + encode_frame(7, 10, 20, 30, 40, 0))
+    assert frames == [(7, (10, 20, 30, 40, 0))]
+    assert decoder.skipped_bytes == len(b"basura\xa5\x01")
+
+def test_decoder_resyncs_after_corrupted_crc():
+    bad = bytearray(encode_frame(1, 10, 20, 30, 40, 0))
+    bad[-1] ^= 0xFF
+    decoder = FrameDecoder()
+    frames = decoder.feed(bytes(bad) + encode_frame(2, 50, 50, 0, 0, 0))
+    assert frames == [(2, (50, 50, 0, 0, 0))]
+    assert decoder.crc_errors == 1
+
+def test_decoder_counts_lost_frames_from_sequence_gaps():
+    decoder = FrameDecoder()
+    decoder.feed(encode_frame(254, 0, 0, 0, 0, 0))
+    decoder.feed(encode_frame(1, 0, 0, 0, 0, 0))  # Se perdieron 255 y 0
+    decoder.feed(encode_frame(2, 0, 0, 0, 0, 0))
+    assert decoder.lost_frames == 2
+    assert decoder.last_seq == 2
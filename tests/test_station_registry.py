@@ -0,0 +1,139 @@
+"""Transporte asíncrono: estaciones Modbus, reparto con timeout y configuración"""
+import asyncio
+import socket
+
+import pytest
+
+from plc_async import (
+    MODBUS_AVAILABLE, AsyncModbusStation, AsyncSerialStation, StationRegistry, registry_from_config,
+)
+import plc_async
+
+needs_modbus = pytest.mark.skipif(not MODBUS_AVAILABLE, reason="pymodbus no está instalado")
+
+class StubStation:
+    """Estación simulada que confirma tras `delay` segundos"""
+    def __init__(self, name, delay=0.0, timeout=0.5, error=None):
+        self.name = name
+        self.delay = delay
+        self.timeout = timeout
+        self.error = error
+        self.sent = []
+        self.closed = False
+
+    async def connect(self):
+        await asyncio.sleep(self.delay)
+        return True
+
+    async def send(self, c, m, y, k, w):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        self.sent.append((c, m, y, k, w))
+        return True
+
+    async def close(self):
+        self.closed = True
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+async def start_modbus_server(port):
+    """Servidor Modbus TCP local con 100 registros holding"""
+    from pymodbus.datastore import ModbusSequentialDataBlock, ModbusServerContext
+    from pymodbus.server import ModbusTcpServer
+    block = ModbusSequentialDataBlock(1, [0] * 100)  # Dirección 0 del cliente = bloque 1
+    try:
+        from pymodbus.datastore import ModbusDeviceContext
+        context = ModbusServerContext(devices=ModbusDeviceContext(hr=block), single=True)
+    except ImportError:  # pymodbus < 3.10
+        from pymodbus.datastore import ModbusSlaveContext
+        context = ModbusServerContext(slaves=ModbusSlaveContext(hr=block), single=True)
+    server = ModbusTcpServer(context, address=('127.0.0.1', port))
+    await server.serve_forever(background=True)
+    return server, block
+
+def test_fan_out_reports_timeout_without_blocking_the_rest():
+    async def run():
+        registry = StationRegistry()
+        fast = registry.add(StubStation('rapida'))
+        registry.add(StubStation('lenta', delay=1.0, timeout=0.1))
+        registry.add(StubStation('rota', error=ConnectionError("sin respuesta")))
+        start = asyncio.get_running_loop().time()
+        results = await registry.fan_out((10, 20, 30, 40, 0))
+        return fast, results, asyncio.get_running_loop().time() - start
+    fast, results, elapsed = asyncio.run(run())
+    assert results['rapida'].ok and fast.sent == [(10, 20, 30, 40, 0)]
+    assert not results['lenta'].ok and results['lenta'].error == "timeout"
+    assert not results['rota'].ok and results['rota'].error == "sin respuesta"
+    assert elapsed < 0.5  # La estación lenta no retrasa a las demás más que su timeout
+
+def test_fan_out_with_recipe_per_station():
+    async def run():
+        registry = StationRegistry()
+        a, b = registry.add(StubStation('a')), registry.add(StubStation('b'))
+        results = await registry.fan_out({'a': (1, 2, 3, 4, 5), 'b': (5, 4, 3, 2, 1)})
+        connected = await registry.connect_all()
+        await registry.close_all()
+        return a, b, results, connected
+    a, b, results, connected = asyncio.run(run())
+    assert a.sent == [(1, 2, 3, 4, 5)] and b.sent == [(5, 4, 3, 2, 1)]
+    assert all(r.ok for r in results.values())
+    assert connected == {'a': True, 'b': True}
+    assert a.closed and b.closed
+
+@needs_modbus
+def test_modbus_station_writes_holding_registers():
+    async def run():
+        port = free_port()
+        server, _ = await start_modbus_server(port)
+        station = AsyncModbusStation('modbus', '127.0.0.1', port, timeout=1.0)
+        try:
+            registry = StationRegistry()
+            registry.add(station)
+            results = await registry.fan_out((11, 22, 33, 44, 55))
+            response = await station.client.read_holding_registers(0, count=5)
+            return results, list(response.registers)
+        finally:
+            await station.close()
+            await server.shutdown()
+    results, registers = asyncio.run(run())
+    assert results['modbus'].ok
+    assert registers == [11, 22, 33, 44, 55]
+
+@needs_modbus
+def test_modbus_station_without_server_fails_cleanly():
+    async def run():
+        registry = StationRegistry()
+        registry.add(AsyncModbusStation('apagada', '127.0.0.1', free_port(), timeout=0.3))
+        try:
+            return await registry.fan_out((0, 0, 0, 0, 0))
+        finally:
+            await registry.close_all()
+    result = asyncio.run(run())['apagada']
+    assert not result.ok and result.error
+
+@needs_modbus
+def test_registry_from_config(monkeypatch):
+    monkeypatch.setattr(plc_async, 'SERIAL_ASYNC_AVAILABLE', True)
+    config = {'stations': [
+        {'name': 'linea1', 'type': 'modbus', 'ip': '10.0.0.5', 'port': 1502, 'timeout': 0.5},
+        {'name': 'linea2', 'type': 'serial', 'serial_port': '/dev/ttyUSB0', 'baudrate': 115200},
+    ]}
+
+    async def build():
+        return registry_from_config(config)  # pymodbus necesita el bucle activo
+    registry = asyncio.run(build())
+    assert registry.names == ['linea1', 'linea2']
+    modbus, serial = registry.get('linea1'), registry.get('linea2')
+    assert isinstance(modbus, AsyncModbusStation)
+    assert (modbus.ip, modbus.port, modbus.timeout) == ('10.0.0.5', 1502, 0.5)
+    assert isinstance(serial, AsyncSerialStation)
+    assert (serial.serial_port, serial.baudrate, serial.timeout) == ('/dev/ttyUSB0', 115200, 2.0)
+
+def test_registry_from_config_rejects_unknown_type():
+    with pytest.raises(ValueError):
+        registry_from_config({'stations': [{'name': 'x', 'type': 'can'}]})
+    assert registry_from_config({}).names == []
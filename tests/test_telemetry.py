@@ -0,0 +1,113 @@
+"""Telemetría serial: parser de líneas, buffer circular y lector de respuestas"""
+import contextlib
+import io
+
+import numpy as np
+
+from plc import (
+    ALARM_CRITICAL, ALARM_PUMP_STOPPED, ALARM_WARNING, PLCManager, SerialTelemetryReader,
+    TelemetryBuffer, TelemetryParser,
+)
+
+FIRMWARE_BLOCK = (
+    "Alarma C: Nivel crítico bajo\r\n"
+    "Advertencia M: Nivel bajo\r\n"
+    "Bomba W detenida: Temperatura menor a 30°C\r\n"
+    "Temperaturas - C:31.25°C M:29.79°C Y:30.00°C K:-1.50°C W:45.41°C\r\n"
+    "Niveles - C:8% M:15% Y:60% K:100% W:0%\r\n"
+).encode('utf-8')
+
+class Replies(list):
+    """Destino de las líneas de control, como la cola del lector"""
+    put = list.append
+
+def test_parser_builds_one_record_per_levels_line():
+    buffer = TelemetryBuffer(8)
+    replies = Replies()
+    parser = TelemetryParser(buffer, replies)
+    # Fragmentos arbitrarios, como llegan del puerto
+    for i in range(0, len(FIRMWARE_BLOCK), 7):
+        parser.feed(FIRMWARE_BLOCK[i:i + 7])
+    record = buffer.latest()
+    assert buffer.count == 1
+    assert np.allclose(record['temps'], [31.25, 29.79, 30.0, -1.5, 45.41])
+    assert np.allclose(record['levels'], [8, 15, 60, 100, 0])
+    assert record['alarms'] == (1 << ALARM_CRITICAL) | (1 << ALARM_WARNING + 1) | (1 << ALARM_PUMP_STOPPED + 4)
+    assert replies == []
+    # Las alarmas se reinician con cada registro
+    parser.feed(b"Niveles - C:9% M:15% Y:60% K:100% W:0%\n")
+    assert buffer.latest()['alarms'] == 0
+    assert buffer.latest()['levels'][0] == 9
+
+def test_parser_sends_other_lines_to_replies():
+    replies = Replies()
+    parser = TelemetryParser(TelemetryBuffer(4), replies)
+    parser.feed(b"PROTO BIN OK\r\nAdvertencia: tramas perdidas: 3\r\n\r\n")
+    assert replies == [b"PROTO BIN OK", b"Advertencia: tramas perdidas: 3"]
+
+def test_buffer_wraps_and_windows_in_order():
+    buffer = TelemetryBuffer(4)
+    assert buffer.latest() is None and buffer.aggregate(10, now=0) is None
+    for t in range(6):
+        buffer.append(float(t), np.full(5, 20.0 + t), np.full(5, 50.0 - t), 1 << t)
+    assert buffer.count == 6
+    assert buffer.latest()['time'] == 5.0
+    window = buffer.window(10, now=5.0)
+    assert window['time'].tolist() == [2.0, 3.0, 4.0, 5.0]  # Solo los 4 más recientes, en orden
+    assert buffer.window(1.5, now=5.0)['time'].tolist() == [4.0, 5.0]
+    stats = buffer.aggregate(10, now=5.0)
+    assert stats['samples'] == 4
+    assert np.allclose(stats['temps_mean'], 23.5)
+    assert np.allclose(stats['temps_max'], 25.0)
+    assert np.allclose(stats['levels_min'], 45.0)
+    assert stats['alarms'] == 0b111100
+
+def test_latest_returns_a_copy():
+    buffer = TelemetryBuffer(2)
+    buffer.append(1.0, np.zeros(5), np.zeros(5), 0)
+    record = buffer.latest()
+    buffer.append(2.0, np.ones(5), np.ones(5), 0)
+    buffer.append(3.0, np.ones(5), np.ones(5), 0)
+    assert record['time'] == 1.0
+
+class FakeSerial:
+    """Puerto que responde a cada escritura a través del parser del lector"""
+    def __init__(self):
+        self.reader = None
+        self.reply = b""
+        self.written = []
+
+    def write(self, data):
+        self.written.append(data)
+        self.reader.parser.feed(self.reply)
+
+def make_reader():
+    serial = FakeSerial()
+    reader = SerialTelemetryReader(serial)
+    serial.reader = reader
+    return serial, reader
+
+def test_control_lines_are_dropped_when_nobody_waits():
+    _, reader = make_reader()
+    for _ in range(1000):
+        reader.parser.feed(b"CMYKW Recibido: C:10 M:20 Y:30 K:40 W:0\r\nAgitador ACTIVADO\r\n")
+    assert reader.replies.qsize() == 0
+    reader.expect_reply()
+    reader.parser.feed(b"PROTO BIN OK\r\n")
+    assert reader.read_reply(0.1) == b"PROTO BIN OK"
+    reader.end_reply()
+    reader.parser.feed(b"Error: Formato incorrecto\r\n")
+    assert reader.replies.qsize() == 0
+
+def test_stale_error_does_not_spoil_negotiation():
+    serial, reader = make_reader()
+    manager = PLCManager.__new__(PLCManager)
+    manager.serial_protocol = 'auto'
+    manager.serial_connection = serial
+    manager.telemetry_reader = reader
+    # Un error viejo sin lector de respuestas y luego la respuesta real
+    reader.parser.feed(b"Error: Formato incorrecto\r\n")
+    serial.reply = b"Niveles - C:50 M:50 Y:50 K:50 W:50\r\nPROTO BIN OK\r\n"
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert manager._negotiate_serial_protocol(timeout=0.2) == 'binary'
+    assert not reader.awaiting_reply.is_set()
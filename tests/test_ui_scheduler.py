@@ -0,0 +1,120 @@
+"""UpdateScheduler: fusión de peticiones por cuadro y widgets sin cambios"""
+import pytest
+
+from ui_scheduler import UpdateScheduler
+
+class FakeRoot:
+    """after()/after_cancel() de Tk: los callbacks se disparan a mano"""
+    def __init__(self):
+        self.callbacks = {}
+        self.next_id = 0
+
+    def after(self, ms, callback):
+        self.next_id += 1
+        self.callbacks[self.next_id] = (ms, callback)
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        del self.callbacks[after_id]
+
+    def tick(self):
+        """Disparar los callbacks pendientes (un cuadro)"""
+        callbacks, self.callbacks = self.callbacks, {}
+        for _, callback in callbacks.values():
+            callback()
+
+class FakeWidget:
+    def __init__(self):
+        self.calls = []
+
+    def config(self, **options):
+        self.calls.append(options)
+
+def test_requests_in_one_frame_are_coalesced():
+    root = FakeRoot()
+    scheduler = UpdateScheduler(root, frame_ms=16)
+    runs = []
+    for value in range(20):
+        scheduler.schedule('color', lambda value=value: runs.append(value))
+    assert [ms for ms, _ in root.callbacks.values()] == [16]
+    assert runs == []
+    root.tick()
+    assert runs == [19]  # La última función pedida gana
+    assert root.callbacks == {}
+    assert scheduler.report()['keys']['color'] == {
+        'requests': 20, 'runs': 1, 'coalesced': 19,
+        'mean_ms': scheduler.stats['color'].as_dict()['mean_ms'],
+        'max_ms': scheduler.stats['color'].as_dict()['max_ms']}
+
+def test_keys_run_in_request_order():
+    root = FakeRoot()
+    scheduler = UpdateScheduler(root)
+    runs = []
+    scheduler.schedule('a', lambda: runs.append('a'))
+    scheduler.schedule('b', lambda: runs.append('b'))
+    scheduler.schedule('a', lambda: runs.append('a2'))
+    root.tick()
+    assert runs == ['b', 'a2']
+
+def test_key_requested_by_another_runs_in_same_frame():
+    root = FakeRoot()
+    scheduler = UpdateScheduler(root)
+    runs = []
+    scheduler.schedule('color', lambda: (runs.append('color'),
+                                         scheduler.schedule('preview', lambda: runs.append('preview'))))
+    root.tick()
+    assert runs == ['color', 'preview']
+    assert root.callbacks == {} and scheduler.frames == 1
+
+def test_key_requested_again_during_frame_waits_for_next():
+    root = FakeRoot()
+    scheduler = UpdateScheduler(root)
+    runs = []
+    def redraw():
+        runs.append('redraw')
+        if len(runs) == 1:
+            scheduler.schedule('redraw', redraw)
+    scheduler.schedule('redraw', redraw)
+    root.tick()
+    assert runs == ['redraw']
+    assert len(root.callbacks) == 1  # Reprogramado para el siguiente cuadro
+    root.tick()
+    assert runs == ['redraw', 'redraw']
+    assert scheduler.frames == 2
+
+def test_flush_runs_now_and_cancels_timer():
+    root = FakeRoot()
+    scheduler = UpdateScheduler(root)
+    runs = []
+    scheduler.schedule('color', lambda: runs.append('color'))
+    scheduler.flush()
+    assert runs == ['color'] and root.callbacks == {}
+    scheduler.flush()  # Sin pendientes ni temporizador
+    assert runs == ['color']
+
+def test_configure_skips_unchanged_options():
+    scheduler = UpdateScheduler(FakeRoot())
+    label = FakeWidget()
+    assert scheduler.set_text(label, "C: 10%")
+    assert not scheduler.set_text(label, "C: 10%")
+    assert scheduler.configure(label, text="C: 10%", bg='#ff0000')
+    assert label.calls == [{'text': "C: 10%"}, {'bg': '#ff0000'}]
+    report = scheduler.report()
+    assert (report['widget_updates'], report['widget_skips']) == (2, 1)
+    scheduler.forget(label)
+    assert scheduler.set_text(label, "C: 10%")
+    assert label.calls[-1] == {'text': "C: 10%"}
+
+def test_failing_update_does_not_stall_the_scheduler():
+    root = FakeRoot()
+    scheduler = UpdateScheduler(root)
+    runs = []
+    def broken():
+        scheduler.schedule('preview', lambda: runs.append('preview'))
+        raise RuntimeError("widget destruido")
+    scheduler.schedule('color', broken)
+    with pytest.raises(RuntimeError):
+        root.tick()
+    assert len(root.callbacks) == 1
+    root.tick()
+    assert runs == ['preview']
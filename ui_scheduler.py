@@ -0,0 +1,116 @@
+"""Planificador de actualizaciones de la interfaz (un redibujo por cuadro)
+
+Arrastrar un slider genera decenas de eventos por cuadro de pantalla. En vez
+de recalcular y reconfigurar widgets en cada uno, los manejadores piden una
+actualización con una clave; las peticiones con la misma clave dentro del
+mismo cuadro se funden en una sola ejecución. Los textos y opciones de los
+widgets se comparan con el último valor aplicado y solo se reconfigura lo que
+cambió. No importa Tk: basta un objeto con after() y after_cancel().
+"""
+import time
+
+class UpdateStats:
+    """Tiempos acumulados de una clave de actualización"""
+    __slots__ = ('requests', 'runs', 'total', 'worst')
+
+    def __init__(self):
+        self.requests = 0
+        self.runs = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'runs': self.runs,
+            'coalesced': self.requests - self.runs,
+            'mean_ms': round(self.total / self.runs * 1000, 3) if self.runs else 0.0,
+            'max_ms': round(self.worst * 1000, 3),
+        }
+
+class UpdateScheduler:
+    """Agrupa las actualizaciones pedidas y las ejecuta una vez por cuadro"""
+    def __init__(self, root, frame_ms=16):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.pending = {}  # clave → función; el orden de inserción es el de ejecución
+        self.after_id = None
+        self.running = False  # Dentro de run_frame: se reprograma al terminar
+        self.applied = {}  # (id del widget, opción) → último valor aplicado
+        self.stats = {}
+        self.frames = 0
+        self.widget_updates = 0
+        self.widget_skips = 0
+
+    def schedule(self, key, function):
+        """Pedir una actualización; la última función pedida con la clave gana"""
+        self.pending.pop(key, None)
+        self.pending[key] = function
+        self.stats.setdefault(key, UpdateStats()).requests += 1
+        if self.after_id is None and not self.running:
+            self.after_id = self.root.after(self.frame_ms, self.run_frame)
+
+    def run_frame(self):
+        """Ejecutar lo pendiente; una clave pedida de nuevo durante el cuadro
+        corre en el mismo cuadro si aún no se había ejecutado"""
+        self.after_id = None
+        self.running = True
+        done = set()
+        try:
+            while self.pending:
+                key = next(iter(self.pending))
+                if key in done:
+                    break
+                function = self.pending.pop(key)
+                done.add(key)
+                start = time.perf_counter()
+                function()
+                elapsed = time.perf_counter() - start
+                stats = self.stats[key]
+                stats.runs += 1
+                stats.total += elapsed
+                stats.worst = max(stats.worst, elapsed)
+        finally:
+            self.frames += 1
+            self.running = False
+            if self.pending and self.after_id is None:
+                self.after_id = self.root.after(self.frame_ms, self.run_frame)
+
+    def flush(self):
+        """Ejecutar ya lo pendiente (p. ej. antes de leer el estado o cerrar)"""
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+        self.run_frame()
+
+    def configure(self, widget, **options):
+        """widget.config() solo con las opciones cuyo valor cambió"""
+        changed = {}
+        for option, value in options.items():
+            key = (id(widget), option)
+            if self.applied.get(key) != value:
+                self.applied[key] = value
+                changed[option] = value
+        if changed:
+            widget.config(**changed)
+            self.widget_updates += 1
+        else:
+            self.widget_skips += 1
+        return bool(changed)
+
+    def set_text(self, widget, text):
+        return self.configure(widget, text=text)
+
+    def forget(self, widget):
+        """Olvidar los valores aplicados de un widget destruido o recreado"""
+        wid = id(widget)
+        for key in [k for k in self.applied if k[0] == wid]:
+            del self.applied[key]
+
+    def report(self):
+        """Estadísticas por clave, más cuadros y widgets tocados u omitidos"""
+        return {
+            'frames': self.frames,
+            'widget_updates': self.widget_updates,
+            'widget_skips': self.widget_skips,
+            'keys': {key: stats.as_dict() for key, stats in self.stats.items()},
+        }